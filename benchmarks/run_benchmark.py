@@ -0,0 +1,175 @@
+"""
+run_benchmark.py
+
+基准测试：用合成表格测试每个校验规则及端到端 traverse_folder 的耗时，结果保存为JSON便于跨提交对比。
+
+用法（在项目根目录执行）：
+    python benchmarks/run_benchmark.py                              # 默认 1万/10万/100万行，csv/xlsx（不生成xls，见synthetic_data.write_table）
+    python benchmarks/run_benchmark.py --rows 10000 --formats csv   # 只测1万行csv
+    python benchmarks/run_benchmark.py --compare benchmarks/results/旧结果.json   # 与旧结果对比
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_data import generate_table, write_table
+from get_excel import read_table_file
+from checker import (TABLE_RULES, find_valid_header_row, get_skip_cols, check_cell_rules,
+                     load_check_rules, check_all_rules)
+from check_rules.check_null import check_header_null
+from error_budget import ErrorBudget
+from main import traverse_folder
+import utils
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def get_commit() -> str:
+    """当前git提交（无git时返回unknown）"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def timed(func: Callable, repeat: int) -> float:
+    """
+    执行repeat次，返回最短耗时（秒）
+    每次执行前清空utils中按表格缓存的列分解结果/跳过列（不计入耗时），各规则、各次执行都从冷缓存开始，
+    耗时包含该规则自己的列分解开销，不受先执行的规则影响
+    """
+    best = None
+    for _ in range(repeat):
+        utils._FACTORIZE_CACHE.clear()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_rules(df: pd.DataFrame, rows: int, repeat: int) -> List[Dict]:
+    """逐个测试规则（不设错误预算，保证完整扫描）"""
+    results = []
+    header_row = find_valid_header_row(df)
+    cells = rows * df.shape[1]
+
+    def add(target, seconds):
+        results.append({
+            "rows": rows, "format": "memory", "target": target, "seconds": round(seconds, 6),
+            "cells_per_sec": round(cells / seconds) if seconds > 0 else None,
+        })
+        print(f"  {target}：{seconds:.3f}s")
+
+    for rule_name, rule_func in TABLE_RULES:
+        add(f"rule:{rule_name}", timed(lambda: rule_func(df, header_row), repeat))
+    add("rule:check_null(表头)", timed(lambda: check_header_null(df, header_row), repeat))
+
+    skip_cols = get_skip_cols(df)
+    for rule_name, rule_func in load_check_rules().items():
+        add(f"cell_rule:{rule_name}",
+            timed(lambda: check_cell_rules(df, header_row, skip_cols, {rule_name: rule_func}), repeat))
+    add("check_all_rules", timed(lambda: check_all_rules(df, header_row, ErrorBudget(), sampling=False), repeat))
+    return results
+
+
+def bench_end_to_end(file_path: str, rows: int, file_format: str, repeat: int, work_dir: str) -> Dict:
+    """端到端测试：traverse_folder（含读取、所有规则、写入检查结果）"""
+    output_file = os.path.join(work_dir, f"result_{rows}_{file_format.strip('.')}.txt")
+    seconds = timed(lambda: traverse_folder(file_path, output_file), repeat)
+    print(f"  e2e:traverse_folder({file_format})：{seconds:.3f}s")
+    return {
+        "rows": rows, "format": file_format, "target": "e2e:traverse_folder", "seconds": round(seconds, 6),
+        "cells_per_sec": None,
+    }
+
+
+def compare(base_path: str, results: Dict) -> None:
+    """与旧结果对比，输出耗时变化（>1 表示变慢）"""
+    with open(base_path, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    base_cases = {(c["rows"], c["format"], c["target"]): c["seconds"] for c in base["cases"]}
+    print(f"\n与 {base.get('commit')} 对比（当前/基准）：")
+    for case in results["cases"]:
+        key = (case["rows"], case["format"], case["target"])
+        if key in base_cases and base_cases[key] > 0:
+            ratio = case["seconds"] / base_cases[key]
+            print(f"  {case['rows']}行 {case['format']} {case['target']}："
+                  f"{base_cases[key]:.3f}s → {case['seconds']:.3f}s（×{ratio:.2f}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校验规则基准测试")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000], help="数据行数")
+    parser.add_argument("--formats", nargs="+", default=["csv", "xlsx"], help="端到端测试的文件格式")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="每列注入不合规值的比例")
+    parser.add_argument("--sensitive-rate", type=float, default=0.001, help="备注列注入敏感词的比例")
+    parser.add_argument("--repeat", type=int, default=1, help="每项重复次数（取最短耗时）")
+    parser.add_argument("--skip-rules", action="store_true", help="不做逐规则测试")
+    parser.add_argument("--skip-e2e", action="store_true", help="不做端到端测试")
+    parser.add_argument("--output", help="结果JSON路径（默认benchmarks/results/提交_时间.json）")
+    parser.add_argument("--compare", help="与指定的旧结果JSON对比")
+    args = parser.parse_args()
+
+    commit = get_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "error_rate": args.error_rate,
+        "sensitive_rate": args.sensitive_rate,
+        "cache": "cold",  # 每次计时前清空列分解缓存
+        "cases": [],
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.rows:
+            print(f"生成{rows}行合成数据...")
+            df = generate_table(rows, args.error_rate, args.sensitive_rate)
+            csv_path = os.path.join(work_dir, f"bench_{rows}.csv")
+            write_table(df, csv_path)
+
+            if not args.skip_rules:
+                print(f"逐规则测试（{rows}行）：")
+                results["cases"].extend(bench_rules(read_table_file(csv_path), rows, args.repeat))
+
+            if not args.skip_e2e:
+                print(f"端到端测试（{rows}行）：")
+                for file_format in args.formats:
+                    file_path = os.path.join(work_dir, f"bench_{rows}.{file_format.strip('.')}")
+                    if not os.path.exists(file_path) and not write_table(df, file_path):
+                        continue
+                    results["cases"].append(
+                        bench_end_to_end(file_path, rows, file_format.strip('.'), args.repeat, work_dir)
+                    )
+
+    output_path = args.output or os.path.join(
+        RESULTS_DIR, f"{commit}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n基准测试结果已保存到 {os.path.abspath(output_path)}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+synthetic_data.py
+
+生成与config.py配置字段匹配的合成表格（身份证号、手机号、设备号、测试时间、容量等），用于基准测试。
+每列按 error_rate 注入不符合规则的值，备注列按 sensitive_rate 注入敏感词，随机种子固定保证可复现。
+"""
+import os
+import sys
+from typing import List
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from config import get_sensitive_file_path
+
+# 与config.py中各规则匹配的表头
+HEADERS = [
+    '单位名称', '单位内编号', '身份证号', '手机号', '邮编', '个人ID', '设备号', '容积(L)', '容量',
+    '性别', '状态', '测试时间', '监测点', '风速（单位:m/s）', '年龄', '温度', '机构名称', '备注',
+]
+
+_REGION_CODES = np.array(['110101', '120102', '130637', '310104', '320583', '440305', '510107', '650102'])
+_ID_WEIGHTS = np.array([7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2])
+_ID_CHECK_CODES = np.array(list("10X98765432"))
+_MOBILE_PREFIXES = np.array(['138', '139', '150', '153', '186', '177', '199'])
+_NULL_TOKENS = np.array(['', '-', 'null', '/', '、'])
+_REMARKS = np.array(['正常', '已检验', '待复查', '气瓶外观良好', '阀门更换', '用户已搬迁'])
+
+
+def _digits(rng: np.random.Generator, n: int, width: int) -> np.ndarray:
+    """生成n个定长数字串（不超过18位）"""
+    return np.char.zfill(rng.integers(0, 10 ** width, n, dtype=np.int64).astype(str), width)
+
+
+def _id_cards(rng: np.random.Generator, n: int) -> np.ndarray:
+    """生成校验码正确的18位身份证号"""
+    region = rng.choice(_REGION_CODES, n)
+    birth = pd.to_datetime('1950-01-01') + pd.to_timedelta(rng.integers(0, 365 * 55, n), unit='D')
+    seq = _digits(rng, n, 3)
+    body = np.char.add(np.char.add(region, birth.strftime('%Y%m%d').to_numpy().astype(str)), seq)
+    digit_matrix = np.frombuffer(''.join(body).encode('ascii'), dtype=np.uint8).reshape(n, 17) - ord('0')
+    check = _ID_CHECK_CODES[(digit_matrix @ _ID_WEIGHTS) % 11]
+    return np.char.add(body, check)
+
+
+def _inject(rng: np.random.Generator, values: np.ndarray, bad_values: np.ndarray, error_rate: float) -> np.ndarray:
+    """按error_rate将部分值替换为不合规值"""
+    values = values.astype(object)
+    mask = rng.random(len(values)) < error_rate
+    values[mask] = rng.choice(bad_values, mask.sum())
+    return values
+
+
+def load_sensitive_words(limit: int = 200) -> List[str]:
+    """从敏感词文件读取部分敏感词（用于注入备注列）"""
+    with open(get_sensitive_file_path(), 'r', encoding='utf-8') as f:
+        words = [line.strip() for line in f if line.strip()]
+    return words[:limit]
+
+
+def generate_table(rows: int, error_rate: float = 0.01, sensitive_rate: float = 0.001,
+                   seed: int = 42) -> pd.DataFrame:
+    """
+    生成合成表格（第0行为表头，与read_table_file的读取结果格式一致：header=None，全部为文本）
+    :param rows: 数据行数
+    :param error_rate: 每列注入不合规值的比例
+    :param sensitive_rate: 备注列注入敏感词的比例
+    :param seed: 随机种子
+    :return: DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    n = rows
+
+    id_cards = _id_cards(rng, n)
+    masked_ids = pd.Series(id_cards).str.slice_replace(6, 14, '********').to_numpy()
+    bad_ids = np.concatenate([id_cards[:50], np.array([v[:15] for v in id_cards[:50]])])
+
+    mobiles = np.char.add(rng.choice(_MOBILE_PREFIXES, n), _digits(rng, n, 8))
+    masked_mobiles = pd.Series(mobiles).str.slice_replace(3, 7, '****').to_numpy()
+
+    test_times = (pd.to_datetime('2025-01-01') + pd.to_timedelta(np.arange(n) * 600, unit='s')).strftime('%Y-%m-%d %H:%M:%S')
+
+    remarks = rng.choice(_REMARKS, n).astype(object)
+    sensitive_mask = rng.random(n) < sensitive_rate
+    if sensitive_mask.any():
+        words = np.array(load_sensitive_words())
+        remarks[sensitive_mask] = np.char.add(rng.choice(_REMARKS, sensitive_mask.sum()),
+                                              rng.choice(words, sensitive_mask.sum()))
+
+    columns = [
+        rng.choice(np.array(['甲燃气公司', '乙燃气公司', '丙燃气公司']), n),
+        np.char.add('A', np.char.zfill(np.arange(n).astype(str), 7)),
+        _inject(rng, masked_ids, bad_ids, error_rate),
+        _inject(rng, masked_mobiles, np.concatenate([mobiles[:50], np.array(['1380013800', '15350750002.0'])]), error_rate),
+        _inject(rng, _digits(rng, n, 6), np.array(['07100', '1000000', 'ABCDEF']), error_rate),
+        _inject(rng, _digits(rng, n, 13), np.array(['123456789012', '12345678901234']), error_rate),
+        _inject(rng, _digits(rng, n, 12), np.array(['123', '4', '5523']), error_rate),
+        _inject(rng, np.char.mod('%.1f', rng.uniform(10, 60, n)), np.array(['35.022', '35.11']), error_rate),
+        _inject(rng, np.char.mod('%.3f', rng.uniform(0, 10, n)), np.array(['1.23456', '0.00001']), error_rate),
+        _inject(rng, rng.choice(np.array(['男', '女', '保密']), n), np.array(['未知', 'M']), error_rate),
+        _inject(rng, rng.choice(np.array(['在用', '通气已点火', '通气未点火']), n), np.array(['坏', '停用']), error_rate),
+        _inject(rng, np.asarray(test_times).astype(str), np.array(['2025/13/01', 'bad', '2025-02-30']), error_rate),
+        np.char.add('P', np.char.zfill(rng.integers(1, 100, n).astype(str), 3)),
+        _inject(rng, np.char.mod('%.1f', rng.uniform(0, 30, n)), np.array(['150', '-5']), error_rate),
+        _inject(rng, rng.integers(0, 100, n).astype(str), np.array(['250', '-1']), error_rate),
+        _inject(rng, np.char.mod('%.1f', rng.uniform(-20, 40, n)), np.array(['60', '-40']), error_rate),
+        rng.choice(np.array([f'机构{i:02d}' for i in range(50)]), n),
+        _inject(rng, remarks, _NULL_TOKENS, error_rate),
+    ]
+    data = pd.DataFrame({idx: values for idx, values in enumerate(columns)})
+    header = pd.DataFrame([HEADERS])
+    return pd.concat([header, data], ignore_index=True)
+
+
+def write_table(df: pd.DataFrame, file_path: str) -> bool:
+    """
+    按扩展名写入 .csv/.xlsx（不写入pandas的行列索引，与原始交付文件一致）
+    不生成.xls：写入需要已停止维护的xlwt（不在requirements.txt中），且xls最多65536行，无法覆盖10万/100万行的测试规模
+    :return: False=该格式无法写入
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv':
+        df.to_csv(file_path, header=False, index=False, encoding='utf-8-sig')
+    elif file_ext == '.xlsx':
+        df.to_excel(file_path, header=False, index=False, engine='openpyxl')
+    elif file_ext == '.xls':
+        print("跳过xls：基准测试不生成xls文件（需要xlwt，且最多65536行）")
+        return False
+    else:
+        raise ValueError(f"不支持的文件格式：{file_ext}")
+    return True
+
+
+if __name__ == "__main__":
+    df = generate_table(20, error_rate=0.2, sensitive_rate=0.2)
+    print(df.to_string())
@@ -0,0 +1,122 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from config import CROSS_FIELD_RULES, FIELD_DATE_RULES
+from utils import (build_header_clean_map, match_config_col, factorize_column, get_column_text,
+                   column_numbers, column_datetimes)
+
+
+def check_value(cell_value, field_type):
+    """兼容插件化接口，无实际逻辑"""
+    return False, ""
+
+
+def id_birth_dates(df, col_idx, start_row, field_key=None):
+    """身份证号中的出生日期（第7~14位），非18位、含脱敏*或日期无效时为NaT，每个不同取值只解析一次"""
+    codes, uniques = factorize_column(df, col_idx, start_row)
+    texts = pd.Series(uniques, dtype=object)
+    birth = texts.str.slice(6, 14).where(texts.str.len() == 18)
+    parsed = pd.to_datetime(birth, format='%Y%m%d', errors='coerce')
+    return parsed.to_numpy(dtype='datetime64[ns]')[codes]
+
+
+def id_ages(df, col_idx, start_row, field_key=None):
+    """按身份证号出生日期计算的当前周岁（无法计算时为NaN）"""
+    birth = pd.DatetimeIndex(id_birth_dates(df, col_idx, start_row))
+    today = date.today()
+    not_yet = (birth.month > today.month) | ((birth.month == today.month) & (birth.day > today.day))
+    return (today.year - birth.year - not_yet).to_numpy(dtype=np.float64)
+
+
+def _texts(df, col_idx, start_row, field_key=None):
+    # 空文本转为None，按缺失处理
+    texts = get_column_text(df, col_idx, start_row).to_numpy(dtype=object)
+    texts[texts == ""] = None
+    return texts
+
+
+def _numbers(df, col_idx, start_row, field_key=None):
+    return column_numbers(df, col_idx, start_row)
+
+
+def _dates(df, col_idx, start_row, field_key=None):
+    # 按FIELD_DATE_RULES中该字段的格式解析，未配置时自动识别
+    return column_datetimes(df, col_idx, start_row, FIELD_DATE_RULES.get(field_key))
+
+
+# 字段类型 → 整列转换函数（无法转换的单元格为缺失值，该行不参与判断）
+FIELD_CONVERTERS = {
+    "text": _texts,
+    "number": _numbers,
+    "date": _dates,
+    "id_birth": id_birth_dates,
+    "id_age": id_ages,
+}
+
+
+def evaluate_rule(frame, expr):
+    """
+    对整张表按表达式一次计算（pandas eval，python引擎），返回违规行的位置
+    任一字段缺失的行不参与判断
+    """
+    result = frame.eval(expr, engine='python')
+    passed = np.asarray(result, dtype=bool)
+    present = frame.notna().all(axis=1).to_numpy()
+    return np.flatnonzero(present & ~passed)
+
+
+def check_cross_field(df, header_row, budget=None):
+    """
+    按CROSS_FIELD_RULES检查跨字段一致性：各字段按类型整列转换后，用表达式对整张表一次计算
+    违规行在参与规则的每个字段单元格上各报告一次
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    header_clean_to_col = build_header_clean_map(df, header_row)
+    start_row = header_row + 1
+    if df.shape[0] - start_row <= 0:
+        return errors
+    limit = budget.rule_limit("check_cross_field") if budget is not None else None
+
+    candidates = []
+    for rule_name, rule in CROSS_FIELD_RULES.items():
+        fields, expr = rule.get("fields", {}), rule.get("expr")
+        if not fields or not expr:
+            continue
+        # 字段匹配（模糊匹配），任一字段未匹配则跳过该规则
+        field_cols = {alias: match_config_col(header_clean_to_col, field_key)
+                      for alias, (field_key, _) in fields.items()}
+        if any(col_idx is None for col_idx in field_cols.values()):
+            continue
+        try:
+            frame = pd.DataFrame({alias: FIELD_CONVERTERS[kind](df, field_cols[alias], start_row, field_key)
+                                  for alias, (field_key, kind) in fields.items()})
+            bad = evaluate_rule(frame, expr)
+        except Exception as e:
+            print(f"跨字段规则「{rule_name}」配置无效：{e}")
+            continue
+        if limit is not None:
+            bad = bad[:limit + 1]
+
+        cols = sorted(set(field_cols.values()))
+        columns = {alias: factorize_column(df, col_idx, start_row) for alias, col_idx in field_cols.items()}
+        values_show = {idx: "，".join(f"{fields[alias][0]}={uniques[codes[idx]]}"
+                                      for alias, (codes, uniques) in columns.items())
+                       for idx in bad}
+        desc = rule.get("message") or expr
+        for idx in bad:
+            for col_idx in cols:
+                candidates.append((start_row + 1 + idx, col_idx + 1,
+                                   f"跨字段不一致：{rule_name}（{values_show[idx]}；要求：{desc}）"))
+
+    # 按行、列顺序登记错误预算
+    candidates.sort(key=lambda item: item[:2])
+    for original_row, original_col, error_desc in candidates:
+        if budget is not None and budget.file_exhausted():
+            break
+        if budget is None or budget.allow("check_cross_field", original_row, original_col):
+            errors.append((original_row, original_col, error_desc))
+    return errors
@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding:utf-8 -*-
+import re
+from itertools import groupby
+import numpy as np
 import pandas as pd
-from config import ENCRYPT_REQUIRED_FIELDS, ENCRYPT_CONFIG, EMPTY_PATTERN
+from config import ENCRYPT_REQUIRED_FIELDS, ENCRYPT_CONFIG, ENCRYPT_MASK_RULES, EMPTY_PATTERN
+from utils import factorize_column
+
+# 脱敏格式统计中列出的主要错误形态个数
+TOP_WRONG_SHAPES = 3
 
 
 def check_value(cell_value, field_type):
@@ -9,56 +16,130 @@ def check_value(cell_value, field_type):
     return False, ""
 
 
-def check_encrypt(df, header_row):
+def mask_template(template):
     """
-    检查指定字段是否添加*加密脱敏
-    :param df: 表格数据
-    :param header_row: 表头行索引
-    :return: 错误列表 [(行号, 列号, 错误描述)]
+    脱敏模板 → (完整匹配的正则, 模板说明)
+    模板：keep_head 保留前N位，keep_tail 保留后N位，中间全部为*；length 总长度（不写时不限制*的个数）
     """
-    errors = []
-    min_star_count = ENCRYPT_CONFIG.get("min_star_count", 1)
-    ignore_empty = ENCRYPT_CONFIG.get("ignore_empty", True)
+    head, tail = template.get("keep_head", 0), template.get("keep_tail", 0)
+    length = template.get("length")
+    if length:
+        stars = length - head - tail
+        pattern = re.compile(rf"[^*]{{{head}}}\*{{{stars}}}[^*]{{{tail}}}")
+        desc = f"共{length}位，保留前{head}位和后{tail}位，中间{stars}位为*"
+    else:
+        pattern = re.compile(rf"[^*]{{{head}}}\*+[^*]{{{tail}}}")
+        desc = f"保留前{head}位和后{tail}位，中间为*"
+    return pattern, desc
+
 
-    # 1. 获取表头名称与列索引的映射
-    header_map = {}  # {字段名: 列索引}
+def mask_shape(value: str) -> str:
+    """脱敏形态：连续的明文/ * 合并描述，如 138****8000 → 明文3位+*4位+明文4位"""
+    parts = []
+    for is_star, run in groupby(value, key=lambda c: c == "*"):
+        count = len(list(run))
+        parts.append(f"*{count}位" if is_star else f"明文{count}位")
+    return "+".join(parts) or "空"
+
+
+def encrypt_columns(df, header_row):
+    """需要检查脱敏的字段 {字段名: 列索引}（表头与ENCRYPT_REQUIRED_FIELDS完全一致）"""
+    header_map = {}
     for col_idx in range(df.shape[1]):
         header_val = df.iloc[header_row, col_idx] if header_row < df.shape[0] else f"列{col_idx + 1}"
         header_name = str(header_val).strip() if not pd.isna(header_val) else ""
         if header_name in ENCRYPT_REQUIRED_FIELDS:
             header_map[header_name] = col_idx
+    return header_map
+
+
+def classify_encrypt_column(df, header_row, field_name, col_idx):
+    """
+    按不同取值判断脱敏情况（每个不同取值只判断一次）
+    :return: (codes, uniques, 各取值的结果数组：0=合格，1=未加密，2=不符合模板, 模板说明)
+    """
+    min_star_count = ENCRYPT_CONFIG.get("min_star_count", 1)
+    ignore_empty = ENCRYPT_CONFIG.get("ignore_empty", True)
+    codes, uniques = factorize_column(df, col_idx, header_row + 1)
+    texts = pd.Series(uniques, dtype=object)
+    skip = np.array([bool(ignore_empty and EMPTY_PATTERN.match(v)) for v in uniques], dtype=bool)
+    star_bad = ~skip & (texts.str.count(r"\*").to_numpy() < min_star_count)
+    template = ENCRYPT_MASK_RULES.get(field_name)
+    template_bad = np.zeros(len(uniques), dtype=bool)
+    template_desc = ""
+    if template:
+        pattern, template_desc = mask_template(template)
+        template_bad = ~skip & ~star_bad & ~texts.str.fullmatch(pattern).to_numpy(dtype=bool)
+    return codes, uniques, np.where(star_bad, 1, np.where(template_bad, 2, 0)), template_desc
 
-    # 无需要检查的字段，直接返回
-    if not header_map:
-        return errors
-
-    # 2. 遍历数据行，检查指定字段
-    for row_idx in range(header_row + 1, df.shape[0]):
-        for field_name, col_idx in header_map.items():
-            # 提取单元格值
-            cell_val = df.iloc[row_idx, col_idx]
-            cell_str = str(cell_val).strip() if not pd.isna(cell_val) else ""
-
-            # 空值跳过（由空值规则处理）
-            if ignore_empty and EMPTY_PATTERN.match(cell_str):
-                continue
-
-            # 检查是否包含足够的*
-            star_count = cell_str.count("*")
-            if star_count < min_star_count:
-                # 转换为Excel风格的行列号（从1开始）
-                excel_row = row_idx + 1
-                excel_col = col_idx + 1
-                # 构造错误信息
+
+def check_encrypt(df, header_row, budget=None):
+    """
+    检查指定字段是否添加*加密脱敏：至少包含min_star_count个*；ENCRYPT_MASK_RULES中配置了模板的字段还需符合模板
+    按列检查（每个不同取值只判断一次）；不符合模板的主要错误形态由encrypt_mask_summary另行统计
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    min_star_count = ENCRYPT_CONFIG.get("min_star_count", 1)
+
+    # 按列检查：每个不同取值判断一次，得到各行的错误描述
+    candidates = []
+    for field_name, col_idx in encrypt_columns(df, header_row).items():
+        codes, uniques, unique_kind, template_desc = classify_encrypt_column(df, header_row, field_name, col_idx)
+        row_kind = unique_kind[codes]
+        for idx in np.flatnonzero(row_kind):
+            excel_row, excel_col = header_row + 2 + idx, col_idx + 1
+            cell_str = uniques[codes[idx]]
+            if row_kind[idx] == 1:
                 error_desc = (
                     f"字段加密检查：【{field_name}】列（行{excel_row}列{excel_col}）未加密，"
                     f"当前值='{cell_str}'（需包含至少{min_star_count}个*）"
                 )
-                errors.append((excel_row, excel_col, error_desc))
+            else:
+                error_desc = (
+                    f"字段加密检查：【{field_name}】列（行{excel_row}列{excel_col}）脱敏格式不符，"
+                    f"当前值='{cell_str}'（需{template_desc}）"
+                )
+            candidates.append((excel_row, excel_col, error_desc))
 
+    # 按行、列顺序登记错误预算（与逐单元格扫描的顺序一致）
+    candidates.sort(key=lambda item: item[:2])
+    for excel_row, excel_col, error_desc in candidates:
+        if budget is not None and budget.file_exhausted():
+            break
+        if budget is None or budget.allow("check_encrypt", excel_row, excel_col):
+            errors.append((excel_row, excel_col, error_desc))
     return errors
 
 
+def encrypt_mask_summary(df, header_row):
+    """
+    脱敏格式统计（统计信息，不计入错误）：配置了模板的字段中不符合模板的行数及主要错误形态（按行数降序）
+    :return: 统计行列表 [(表头行号, 列号, 描述)]
+    """
+    summaries = []
+    for field_name, col_idx in encrypt_columns(df, header_row).items():
+        if not ENCRYPT_MASK_RULES.get(field_name):
+            continue
+        codes, uniques, unique_kind, template_desc = classify_encrypt_column(df, header_row, field_name, col_idx)
+        template_bad = unique_kind == 2
+        if not template_bad.any():
+            continue
+        counts = np.bincount(codes, minlength=len(uniques))
+        shape_counts = {}
+        for i in np.flatnonzero(template_bad):
+            shape = mask_shape(uniques[i])
+            shape_counts[shape] = shape_counts.get(shape, 0) + int(counts[i])
+        top = sorted(shape_counts.items(), key=lambda item: (-item[1], item[0]))[:TOP_WRONG_SHAPES]
+        summaries.append((header_row + 1, col_idx + 1,
+                          f"脱敏格式统计：【{field_name}】列{int(counts[template_bad].sum())}行不符合模板（{template_desc}），"
+                          f"主要错误形态：{'、'.join(f'{shape}（{n}行）' for shape, n in top)}"))
+    return summaries
+
+
 # 测试代码（可选）
 if __name__ == "__main__":
     test_df = pd.DataFrame({
@@ -66,6 +147,6 @@ if __name__ == "__main__":
         "手机号": ["13800138000", "138****8000", "13800138000"],
         "姓名": ["张三", "李四", "王五"]
     })
-    errors = check_encrypt(test_df, header_row=0)
+    errors = check_encrypt(test_df, header_row=0) + encrypt_mask_summary(test_df, header_row=0)
     for err in errors:
-        print(f"行{err[0]} 列{err[1]}：{err[2]}")
\ No newline at end of file
+        print(f"行{err[0]} 列{err[1]}：{err[2]}")
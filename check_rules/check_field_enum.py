@@ -3,6 +3,7 @@ import os
 import sys
 import re
 from config import FIELD_ENUM_RULES, EMPTY_PATTERN
+from utils import factorize_column, flagged_rows
 
 def check_value(cell_value, field_type):
     """兼容插件化接口，无实际逻辑"""
@@ -23,11 +24,12 @@ def get_original_text_value(cell_val):
         return str(cell_val).strip()
 
 
-def check_field_enum(df, header_row):
+def check_field_enum(df, header_row, budget=None):
     """
     校验指定字段的枚举值是否合法（静默匹配失败，不修改全局读取逻辑）
     :param df: 表格数据（保持原有读取格式）
     :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
     :return: 错误列表 [(行号, 列号, 错误描述)]
     """
     errors = []
@@ -72,22 +74,20 @@ def check_field_enum(df, header_row):
 
         # 4. 遍历数据行，校验枚举值
         original_col = match_col_idx + 1  # Excel列号
-        for row_idx in range(header_row + 1, df.shape[0]):
-            # 提取单元格值并还原为原始文本形态
-            cell_val = df.iloc[row_idx, match_col_idx]
-            processed_val = get_original_text_value(cell_val)
-
-            # 处理空值/空白字符（跳过）
-            if EMPTY_PATTERN.match(processed_val):
-                continue
-
-            # 校验是否在枚举列表中（不区分大小写，兼容用户输入误差）
-            if processed_val not in enum_list:
-                original_row = row_idx + 1  # Excel行号
-                enum_str_show = "、".join(enum_list)
-                error_desc = (
-                    f"字段枚举值非法：{field_key}（允许值：{enum_str_show}，当前值='{processed_val}'）"
-                )
-                errors.append((original_row, original_col, error_desc))
+        if budget is not None and budget.is_exhausted("check_field_enum", original_col):
+            continue  # 该列预算已用尽 → 跳过
+        # 每个不同取值只校验一次，再映射回各行（空值/空白字符跳过）
+        codes, uniques = factorize_column(df, match_col_idx, header_row + 1)
+        unique_bad = [not EMPTY_PATTERN.match(v) and v not in enum_list for v in uniques]
+        enum_str_show = "、".join(enum_list)
+        for idx in flagged_rows(codes, unique_bad):
+            processed_val = uniques[codes[idx]]
+            original_row = header_row + 2 + idx  # Excel行号
+            error_desc = (
+                f"字段枚举值非法：{field_key}（允许值：{enum_str_show}，当前值='{processed_val}'）"
+            )
+            if budget is not None and not budget.allow("check_field_enum", original_row, original_col):
+                break
+            errors.append((original_row, original_col, error_desc))
 
     return errors
\ No newline at end of file
@@ -101,6 +101,7 @@ import os
 import sys
 import re
 from config import FIELD_LENGTH_RULES, EMPTY_PATTERN
+from utils import flagged_rows
 # EMPTY_PATTERN = re.compile(r'^\s*$')  # 匹配空值的正则
 
 
@@ -109,11 +110,12 @@ def check_value(cell_value, field_type):
     return False, ""
 
 
-def check_field_length(df, header_row):
+def check_field_length(df, header_row, budget=None):
     """
     校验指定字段的字符位数（支持两种配置：固定长度列表/长度范围）
     :param df: 表格数据
     :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
     :return: 错误列表 [(行号, 列号, 错误描述)]
     """
     errors = []
@@ -171,22 +173,26 @@ def check_field_length(df, header_row):
 
         # 6. 遍历数据行，校验长度
         original_col = match_col_idx + 1  # 转换为Excel列号（从1开始）
-        for row_idx in range(header_row + 1, df.shape[0]):
-            # 提取单元格值并处理空值
-            cell_val = df.iloc[row_idx, match_col_idx]
+        if budget is not None and budget.is_exhausted("check_field_length", original_col):
+            continue  # 该列预算已用尽 → 跳过
+        # 按不同取值处理（保留原始类型：文本"00123"与数值123.0是不同取值），再映射回各行
+        # 空单元格也作为一个取值（不使用-1哨兵），避免映射时取到最后一个取值的结果
+        codes, uniques = pd.factorize(df.iloc[header_row + 1:, match_col_idx], use_na_sentinel=False)
+        unique_errors = [None] * len(uniques)  # 各取值的错误描述（合法为None）
+        for unique_idx, cell_val in enumerate(uniques):
             if pd.isna(cell_val) or EMPTY_PATTERN.match(str(cell_val).strip()):
                 continue
 
-            # 7. 按文本语义处理值（修复数值型长度统计问题）
+            # 7. 按文本语义处理值：文本原样保留，仅对数值型值做规整（104.0 → "104"，1104.5 → "1104.5"）
             cell_str = str(cell_val).strip()
             processed_val = cell_str
-            # 处理数值型值：104.0 → "104"，1104.5 → "1104.5"
-            try:
-                num = float(cell_str)
-                if num.is_integer():
-                    processed_val = str(int(num))
-            except (ValueError, TypeError):
-                pass  # 非数值型值，保留原样
+            if not isinstance(cell_val, str):
+                try:
+                    num = float(cell_str)
+                    if num.is_integer():
+                        processed_val = str(int(num))
+                except (ValueError, TypeError, OverflowError):
+                    pass  # 非数值型值，保留原样
 
             # 8. 核心校验：根据配置类型判断是否符合要求
             actual_length = len(processed_val)
@@ -211,11 +217,16 @@ def check_field_length(df, header_row):
 
             # 9. 生成错误信息
             if is_invalid:
-                original_row = row_idx + 1  # 转换为Excel行号（从1开始）
-                error_desc = (
+                unique_errors[unique_idx] = (
                     f"字段位数不符合要求：{field_key}（要求{allowed_str}，原始值='{cell_str}'，处理后值='{processed_val}'，实际{actual_length}位）"
                 )
-                errors.append((original_row, original_col, error_desc))
+
+        # 10. 映射回各行（该取值出现的每一行各记录一次）
+        for idx in flagged_rows(codes, [error_desc is not None for error_desc in unique_errors]):
+            original_row = header_row + 2 + idx  # 转换为Excel行号（从1开始）
+            if budget is not None and not budget.allow("check_field_length", original_row, original_col):
+                break
+            errors.append((original_row, original_col, unique_errors[codes[idx]]))
 
     return errors
 
@@ -232,4 +243,11 @@ if __name__ == "__main__":
     errors = check_field_length(df, 0)
     # 打印错误结果
     for err in errors:
-        print(f"行{err[0]}, 列{err[1]}: {err[2]}")
\ No newline at end of file
+        print(f"行{err[0]}, 列{err[1]}: {err[2]}")
+
+    # 空单元格不应继承其他取值的校验结果（按文本读取，空值为pd.NA）
+    from get_excel import to_string_frame
+    na_df = to_string_frame(pd.DataFrame({"个人ID": ["个人ID", None, "ok", None, "x" * 40]}))
+    na_errors = check_field_length(na_df, 0)
+    assert [err[0] for err in na_errors] == [3, 5], na_errors
+    print("空单元格检查通过")
\ No newline at end of file
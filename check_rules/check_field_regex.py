@@ -0,0 +1,74 @@
+import re
+from config import FIELD_REGEX_RULES
+from utils import build_header_clean_map, match_config_col, factorize_column, flagged_rows
+
+# 已编译的合并正则缓存 {字段关键词: (合并正则, 正则列表)}，同一进程内每个字段只编译一次
+_COMPILED_RULES = {}
+
+
+def check_value(cell_value, field_type):
+    """兼容插件化接口，无实际逻辑"""
+    return False, ""
+
+
+def compile_field_patterns(field_key, patterns):
+    """
+    将字段配置的一个或多个正则合并为一个「任一匹配」的正则（每个正则作为非捕获分组）
+    :param field_key: 字段关键词
+    :param patterns: 正则字符串或正则列表
+    :return: (合并后的正则, 正则列表)；配置为空或正则无效时返回(None, 正则列表)
+    """
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    patterns = [p for p in patterns if p]
+    cache_key = (field_key, tuple(patterns))
+    if cache_key in _COMPILED_RULES:
+        return _COMPILED_RULES[cache_key]
+
+    combined = None
+    if patterns:
+        try:
+            combined = re.compile("|".join(f"(?:{p})" for p in patterns))
+        except re.error as e:
+            print(f"字段{field_key}的正则配置无效：{e}")
+    _COMPILED_RULES[cache_key] = (combined, patterns)
+    return combined, patterns
+
+
+def check_field_regex(df, header_row, budget=None):
+    """
+    按FIELD_REGEX_RULES校验字段格式：单元格需完整匹配该字段配置的任一正则（空值跳过）
+    每列只扫描一次，每个不同取值只匹配一次
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    header_clean_to_col = build_header_clean_map(df, header_row)
+
+    for field_key, patterns in FIELD_REGEX_RULES.items():
+        if not field_key:
+            continue
+        combined, pattern_list = compile_field_patterns(field_key, patterns)
+        if combined is None:
+            continue
+        # 匹配字段列（模糊匹配）
+        col_idx = match_config_col(header_clean_to_col, field_key)
+        if col_idx is None:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_field_regex", original_col):
+            continue
+
+        # 按不同取值匹配，再映射回各行
+        codes, uniques = factorize_column(df, col_idx, header_row + 1)
+        unique_bad = [bool(v) and combined.fullmatch(v) is None for v in uniques]
+        pattern_show = " 或 ".join(pattern_list)
+        for idx in flagged_rows(codes, unique_bad):
+            original_row = header_row + 2 + idx
+            if budget is not None and not budget.allow("check_field_regex", original_row, original_col):
+                break
+            errors.append((original_row, original_col,
+                           f"字段格式不符：{field_key}（需匹配：{pattern_show}，当前值='{uniques[codes[idx]]}'）"))
+    return errors
@@ -1,51 +1,84 @@
-import os
-import sys
+import re
+import numpy as np
+import pandas as pd
 from config import DECIMAL_PRECISION_RULES, EMPTY_PATTERN
-from utils import match_field_type
+from utils import match_field_type, factorize_column, flagged_rows, get_skip_cols
+
+# 普通小数写法（可带正负号，整数部分或小数部分可省略），分组为小数部分
+DECIMAL_TEXT_PATTERN = re.compile(r'^[+-]?(?=\.?\d)\d*(?:\.(\d*))?$')
+
 
 def check_value(cell_value, field_type):
-    """校验小数精度"""
-    # 1. 先把根目录（SetExcelRule）加入Python搜索路径
+    """兼容插件化接口，小数精度校验在check_float_precision中按列执行"""
+    return False, ""
 
-    # 获取当前规则文件的目录（check_rules）
-    RULE_DIR = os.path.dirname(os.path.abspath(__file__))
-    # 向上一级就是根目录（SetExcelRule）
-    ROOT_DIR = os.path.dirname(RULE_DIR)
-    # 把根目录加入Python路径，让Python能找到config、utils等模块
-    sys.path.append(ROOT_DIR)
 
-    # 2. 绝对导入需要的模块（不再用from .. import）
+def get_target_precision(field_type):
+    """按字段类型（match_field_type的结果）查找配置的小数位数，未配置返回None"""
+    for keyword, precision in DECIMAL_PRECISION_RULES.items():
+        if keyword in field_type:
+            return precision
+    return None
 
 
-    # 3. 原有业务逻辑（不动）
-    if EMPTY_PATTERN.match(str(cell_value).strip()):
-        return False, ""
+def count_decimal_places(texts):
+    """
+    按文本统计小数位数（忽略末尾的0），非数值返回-1
+    普通小数写法用一次正则提取计算；科学计数法等其他数值写法转为定点表示后再计算（避免str(float)的1e-05等形式）
+    :param texts: 单元格文本数组
+    :return: 小数位数数组
+    """
+    cleaned = pd.Series(texts, dtype=object).str.replace(',', '', regex=False).str.replace(' ', '', regex=False)
+    decimals = cleaned.str.extract(DECIMAL_TEXT_PATTERN, expand=False)
+    matched = cleaned.str.match(DECIMAL_TEXT_PATTERN).to_numpy(dtype=bool)
+    places = decimals.fillna('').str.rstrip('0').str.len().to_numpy(dtype=np.int64)
+    places[~matched] = -1
 
-    target_precision = None
-    col_name = field_type
-    for keyword, precision in DECIMAL_PRECISION_RULES.items():
-        if keyword in col_name:
-            target_precision = precision
-            break
-    if target_precision is None:
-        return False, ""
-
-    try:
-        clean_value = str(cell_value).strip().replace(',', '').replace(' ', '')
-        num = float(clean_value)
-    except (ValueError, TypeError):
-        return False, ""
-
-    num_str = str(num)
-    if '.' in num_str:
-        decimal_part = num_str.split('.')[1]
-        decimal_part_stripped = decimal_part.rstrip('0')
-        actual_decimal_digits = len(decimal_part_stripped) if decimal_part_stripped else 0
-    else:
-        actual_decimal_digits = 0
-
-    if actual_decimal_digits > target_precision:
-        error_desc = f"小数精度错误：{col_name}列需保留{target_precision}位小数（当前值{cell_value}，实际{actual_decimal_digits}位）"
-        return True, error_desc
-
-    return False, ""
\ No newline at end of file
+    for idx in np.flatnonzero(~matched):
+        try:
+            num = float(cleaned.iloc[idx])
+        except (ValueError, TypeError):
+            continue
+        if not np.isfinite(num):
+            continue
+        positional = np.format_float_positional(num, trim='-')
+        places[idx] = len(positional.split('.')[1]) if '.' in positional else 0
+    return places
+
+
+def check_float_precision(df, header_row, budget=None):
+    """
+    按列校验小数精度（表头匹配DECIMAL_PRECISION_RULES的列）：小数位数不能超过配置的位数
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    # 与逐单元格检查相同，按配置跳过第一列/全空列
+    skip_cols = get_skip_cols(df)
+    for col_idx in range(df.shape[1]):
+        if col_idx in skip_cols:
+            continue
+        header_val = df.iloc[header_row, col_idx]
+        col_name = match_field_type(str(header_val).strip() if not pd.isna(header_val) else "")
+        target_precision = get_target_precision(col_name)
+        if target_precision is None:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_float", original_col):
+            continue
+
+        # 每个不同取值只计算一次（空值跳过，非数值跳过）
+        codes, uniques = factorize_column(df, col_idx, header_row + 1)
+        non_empty = np.array([not EMPTY_PATTERN.match(v) for v in uniques], dtype=bool)
+        places = count_decimal_places(uniques)
+        for idx in flagged_rows(codes, non_empty & (places > target_precision)):
+            cell_value = uniques[codes[idx]]
+            original_row = header_row + 2 + idx
+            error_desc = (f"小数精度错误：{col_name}列需保留{target_precision}位小数"
+                          f"（当前值{cell_value}，实际{places[codes[idx]]}位）")
+            if budget is not None and not budget.allow("check_float", original_row, original_col):
+                break
+            errors.append((original_row, original_col, error_desc))
+    return errors
@@ -12,11 +12,12 @@ def check_value(cell_value, field_type):
 
 
 # 新增独立函数：供checker_core调用的表头重复校验
-def check_duplicate_header(df, header_row):
+def check_duplicate_header(df, header_row, budget=None):
     """
     检查表头行是否有重复字段
     :param df: 表格数据
     :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
     :return: 错误信息列表 [(行号, 列号, 错误描述)]
     """
     errors = []
@@ -40,6 +41,8 @@ def check_duplicate_header(df, header_row):
             original_row = header_row + 1
             original_col = col_idx + 1
             prev_col = seen[clean_val] + 1
+            if budget is not None and not budget.allow("check_header", original_row, original_col):
+                continue
             errors.append(
                 (original_row, original_col,
                  f"表头字段重复：'{original_val}' 与第{prev_col}列的'{original_val}'重复")
@@ -1,32 +1,127 @@
+from datetime import date
+import numpy as np
+from utils import get_field_type_cols, get_column_text, get_skip_cols
+
+# GB 11643 校验码：前17位加权求和后对11取模（ISO 7064 MOD 11-2）
+ID_WEIGHTS = np.array([7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2])
+ID_CHECK_CODES = np.frombuffer(b"10X98765432", dtype=np.uint8).astype(np.int64)
+
+# 省级行政区划代码（GB/T 2260 前两位，含港澳台居民居住证的81/82/83）
+PROVINCE_CODES = {
+    11, 12, 13, 14, 15, 21, 22, 23, 31, 32, 33, 34, 35, 36, 37, 41, 42, 43, 44, 45, 46,
+    50, 51, 52, 53, 54, 61, 62, 63, 64, 65, 71, 81, 82, 83,
+}
+
+_STAR = ord('*')
+_ZERO = ord('0')
+
+
 def check_value(cell_value, field_type):
-    """校验身份证号（仅当字段类型为身份证号时触发）"""
-    if field_type != '身份证号':
-        return False, ""
-    # 空值已由special_value规则检查，此处无需重复
-    if not cell_value:
-        return False, ""
+    """兼容插件化接口，身份证号校验在check_id_card_column中按列执行"""
+    return False, ""
+
+
+def _digits_to_int(digits: np.ndarray) -> np.ndarray:
+    """数字矩阵（每行若干位）按十进制拼成整数"""
+    result = np.zeros(digits.shape[0], dtype=np.int64)
+    for i in range(digits.shape[1]):
+        result = result * 10 + digits[:, i]
+    return result
+
+
+def validate_id_cards(values: np.ndarray) -> np.ndarray:
+    """
+    批量校验18位身份证号（长度已为18位），返回每个值的错误描述（合法为""）
+    校验顺序：前17位数字 → 最后一位 → 行政区划 → 出生日期 → 校验码
+    含*的脱敏值只校验未脱敏的部分：被脱敏覆盖的行政区划/出生日期不校验，含*时不校验校验码
+    """
+    n = len(values)
+    errors = np.full(n, "", dtype=object)
+    if n == 0:
+        return errors
+
+    # 1. 构建字符矩阵（n×18，Unicode码点）与数字矩阵
+    codes = np.asarray(values, dtype='<U18').view(np.uint32).reshape(n, 18).astype(np.int64)
+    masked = codes == _STAR
+    digits = codes - _ZERO
+    is_digit = (digits >= 0) & (digits <= 9)
+    digits = np.where(is_digit, digits, 0)
+    last_upper = np.where(codes[:, 17] == ord('x'), ord('X'), codes[:, 17])
+
+    prefix_bad = ~(is_digit[:, :17] | masked[:, :17]).all(axis=1)
+    suffix_bad = ~(is_digit[:, 17] | masked[:, 17] | (last_upper == ord('X')))
+
+    # 2. 行政区划（前两位未脱敏时校验省级代码）
+    region_visible = ~masked[:, :2].any(axis=1)
+    province = digits[:, 0] * 10 + digits[:, 1]
+    region_bad = region_visible & ~np.isin(province, list(PROVINCE_CODES))
 
-    # 统一转为字符串（避免非字符串类型导致len报错）
-    cell_value = str(cell_value).strip()
+    # 3. 出生日期（第7~14位未脱敏时校验：1900年至今的真实日期）
+    birth_visible = ~masked[:, 6:14].any(axis=1)
+    year = _digits_to_int(digits[:, 6:10])
+    month = _digits_to_int(digits[:, 10:12])
+    day = _digits_to_int(digits[:, 12:14])
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    month_days = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[np.clip(month, 0, 12)]
+    month_days = month_days + ((month == 2) & leap)
+    today = date.today()
+    birth_int = year * 10000 + month * 100 + day
+    birth_bad = birth_visible & ~(
+        (year >= 1900) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+        & (birth_int <= today.year * 10000 + today.month * 100 + today.day)
+    )
 
-    # 校验长度+脱敏格式（支持18位原始/脱敏身份证号）
-    if len(cell_value) != 18:
-        return True, f"身份证号：长度需为18位（当前{len(cell_value)}位）"
+    # 4. 校验码（无脱敏时校验）：前17位加权求和对11取模
+    expected = ID_CHECK_CODES[(digits[:, :17] @ ID_WEIGHTS) % 11]
+    check_bad = ~masked.any(axis=1) & (expected != last_upper)
 
-    # 步骤1：处理脱敏符*（保留X/x，仅移除*）
-    clean_value = cell_value.replace('*', '')
+    # 5. 每个值只报告第一个错误
+    for idx in np.flatnonzero(prefix_bad | suffix_bad | region_bad | birth_bad | check_bad):
+        value = values[idx]
+        if prefix_bad[idx]:
+            errors[idx] = f"身份证号：前17位需为数字（当前值：{value}）"
+        elif suffix_bad[idx]:
+            errors[idx] = f"身份证号：最后一位需为数字或X（当前值：{value}）"
+        elif region_bad[idx]:
+            errors[idx] = f"身份证号：行政区划代码无效（当前值：{value}）"
+        elif birth_bad[idx]:
+            errors[idx] = f"身份证号：出生日期无效（当前值：{value}）"
+        else:
+            errors[idx] = f"身份证号：校验码错误，应为{chr(expected[idx])}（当前值：{value}）"
+    return errors
 
-    # 步骤2：校验身份证号格式（最后一位允许X/x，其余位必须是数字）
-    # 前17位必须是数字
-    prefix = clean_value[:17]
-    suffix = clean_value[-1].upper()  # 最后一位统一转大写（x→X）
 
-    # 校验前17位是否为数字
-    if not prefix.isdigit():
-        return True, f"身份证号：前17位需为数字（当前值：{cell_value}）"
+def check_id_card_column(df, header_row, budget=None):
+    """
+    按列校验身份证号（表头匹配为身份证号类型的列）：长度、行政区划、出生日期、GB 11643校验码
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    # 与逐单元格检查相同，按配置跳过第一列/全空列
+    skip_cols = get_skip_cols(df)
+    for col_idx in get_field_type_cols(df, header_row, '身份证号'):
+        if col_idx in skip_cols:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_id_card", original_col):
+            continue
 
-    # 校验最后一位是否为数字或X
-    if suffix not in ('X',) and not suffix.isdigit():
-        return True, f"身份证号：最后一位需为数字或X（当前值：{cell_value}）"
+        # 空值已由special_value规则检查，此处无需重复
+        texts = get_column_text(df, col_idx, header_row + 1).to_numpy(dtype=object)
+        lengths = np.array([len(v) for v in texts])
+        col_errors = np.full(len(texts), "", dtype=object)
+        length_bad = (lengths > 0) & (lengths != 18)
+        for idx in np.flatnonzero(length_bad):
+            col_errors[idx] = f"身份证号：长度需为18位（当前{lengths[idx]}位）"
+        full_length = np.flatnonzero(lengths == 18)
+        col_errors[full_length] = validate_id_cards(texts[full_length])
 
-    return False, ""
\ No newline at end of file
+        for idx in np.flatnonzero(col_errors != ""):
+            original_row = header_row + 2 + idx
+            if budget is not None and not budget.allow("check_id_card", original_row, original_col):
+                break
+            errors.append((original_row, original_col, col_errors[idx]))
+    return errors
@@ -3,17 +3,19 @@ import os
 import sys
 import re
 from config import FIELD_RANGE_RULES, EMPTY_PATTERN
+from utils import factorize_column, flagged_rows
 
 
 def check_value(cell_value, field_type):
     """兼容插件化接口，无实际逻辑"""
     return False, ""
 
-def check_field_range(df, header_row):
+def check_field_range(df, header_row, budget=None):
     """
     校验字段数值是否在配置的范围内（静默匹配失败，无冗余错误）
     :param df: 表格数据
     :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
     :return: 错误列表 [(行号, 列号, 错误描述)]
     """
     errors = []
@@ -49,25 +51,31 @@ def check_field_range(df, header_row):
 
         # 4. 遍历数据行，校验数值范围
         original_col = match_col_idx + 1  # Excel列号
-        for row_idx in range(header_row + 1, df.shape[0]):
-            # 提取单元格值并清理
-            cell_val = df.iloc[row_idx, match_col_idx]
-            cell_str = str(cell_val).strip() if not pd.isna(cell_val) else ""
+        if budget is not None and budget.is_exhausted("check_key_scope", original_col):
+            continue  # 该列预算已用尽 → 跳过
+        # 每个不同取值只解析一次，再映射回各行
+        codes, uniques = factorize_column(df, match_col_idx, header_row + 1)
+        unique_nums = []
+        for cell_str in uniques:
             if EMPTY_PATTERN.match(cell_str):
-                continue  # 空值跳过
-
+                unique_nums.append(None)  # 空值跳过
+                continue
             # 尝试转换为数值（支持整数/小数）
             try:
-                num = float(cell_str.replace(',', ''))  # 去除千分位逗号
+                unique_nums.append(float(cell_str.replace(',', '')))  # 去除千分位逗号
             except (ValueError, TypeError):
-                continue  # 非数值 → 跳过
+                unique_nums.append(None)  # 非数值 → 跳过
 
-            # 校验范围
-            if num < min_val or num > max_val:
-                original_row = row_idx + 1  # Excel行号
-                error_desc = (
-                    f"字段数值超出范围：{field_key}（允许{min_val}~{max_val}），当前值={num}"
-                )
-                errors.append((original_row, original_col, error_desc))
+        # 校验范围
+        unique_bad = [num is not None and (num < min_val or num > max_val) for num in unique_nums]
+        for idx in flagged_rows(codes, unique_bad):
+            num = unique_nums[codes[idx]]
+            original_row = header_row + 2 + idx  # Excel行号
+            error_desc = (
+                f"字段数值超出范围：{field_key}（允许{min_val}~{max_val}），当前值={num}"
+            )
+            if budget is not None and not budget.allow("check_key_scope", original_row, original_col):
+                break
+            errors.append((original_row, original_col, error_desc))
 
     return errors
\ No newline at end of file
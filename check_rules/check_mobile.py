@@ -1,14 +1,67 @@
+import re
 from typing import Tuple
+import numpy as np
+from utils import get_field_type_cols, get_column_text, get_skip_cols
+
+# 格式：11位，非脱敏部分为数字（预编译，按列一次fullmatch）
+MOBILE_PATTERN = re.compile(r'[0-9*]{11}')
+PREFIX_PATTERN = re.compile(r'[0-9]{3}')
+
+# 号段表（1[3-9]x中已分配的号段，含物联网/虚拟运营商号段）
+MOBILE_PREFIXES = frozenset(
+    [f"13{d}" for d in range(10)]
+    + ["145", "146", "147", "148", "149"]
+    + [f"15{d}" for d in range(10) if d != 4]
+    + ["162", "165", "166", "167"]
+    + [f"17{d}" for d in range(9)]
+    + [f"18{d}" for d in range(10)]
+    + [f"19{d}" for d in range(10) if d != 4]
+)
+
 
 def check_value(cell_value: str, field_type: str) -> Tuple[bool, str]:
-    """校验手机号（仅当字段类型为手机号时触发）"""
-    if field_type != '手机号':
-        return False, ""
-    if not cell_value:
-        return False, ""
-    if len(cell_value) != 11:
-        return True, f"手机号：长度需为11位（当前{len(cell_value)}位）"
-    clean_value = cell_value.replace('*', '')
-    if clean_value and not clean_value.isdigit():
-        return True, f"手机号：非脱敏部分需为数字（当前值：{cell_value}）"
-    return False, ""
\ No newline at end of file
+    """兼容插件化接口，手机号校验在check_mobile_column中按列执行"""
+    return False, ""
+
+
+def check_mobile_column(df, header_row, budget=None):
+    """
+    按列校验手机号（表头匹配为手机号类型的列）：长度11位、非脱敏部分为数字、号段有效（前3位未脱敏时）
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    # 与逐单元格检查相同，按配置跳过第一列/全空列
+    skip_cols = get_skip_cols(df)
+    for col_idx in get_field_type_cols(df, header_row, '手机号'):
+        if col_idx in skip_cols:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_mobile", original_col):
+            continue
+
+        texts = get_column_text(df, col_idx, header_row + 1)
+        lengths = texts.str.len().to_numpy()
+        non_empty = lengths > 0
+        length_bad = non_empty & (lengths != 11)
+        format_bad = non_empty & ~length_bad & ~texts.str.fullmatch(MOBILE_PATTERN).to_numpy(dtype=bool)
+        prefixes = texts.str.slice(0, 3)
+        prefix_bad = (non_empty & ~length_bad & ~format_bad
+                      & prefixes.str.fullmatch(PREFIX_PATTERN).to_numpy(dtype=bool)
+                      & ~prefixes.isin(MOBILE_PREFIXES).to_numpy(dtype=bool))
+
+        values = texts.to_numpy(dtype=object)
+        for idx in np.flatnonzero(length_bad | format_bad | prefix_bad):
+            original_row = header_row + 2 + idx
+            if budget is not None and not budget.allow("check_mobile", original_row, original_col):
+                break
+            if length_bad[idx]:
+                desc = f"手机号：长度需为11位（当前{lengths[idx]}位）"
+            elif format_bad[idx]:
+                desc = f"手机号：非脱敏部分需为数字（当前值：{values[idx]}）"
+            else:
+                desc = f"手机号：号段{values[idx][:3]}无效（当前值：{values[idx]}）"
+            errors.append((original_row, original_col, desc))
+    return errors
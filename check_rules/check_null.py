@@ -1,41 +1,97 @@
 from typing import Tuple, List
-import re
+import numpy as np
 import pandas as pd  # 新增导入，处理NaN
-
-EMPTY_PATTERN = re.compile(r'^\s*$')
+from config import EMPTY_PATTERN
+from utils import SPECIAL_VALUE_TOKENS, special_value_desc, factorize_column, flagged_rows, get_skip_cols
 
 
 def check_value(cell_value: str, field_type: str) -> Tuple[bool, str]:
-    """校验空值/特殊字符（原有逻辑，供数据行调用）"""
-    if EMPTY_PATTERN.match(cell_value):
-        return True, "空值(空白字符)"
-    cell_lower = cell_value.lower()
-    if cell_lower == 'null':
-        return True, "特殊字符：null"
-    elif cell_value == '-':
-        return True, "特殊字符：-"
-    elif cell_value == '_':
-        return True, "特殊字符：_"
-    elif cell_value == '\\':
-        return True, "特殊字符：\\"
-    elif cell_value == '、':
-        return True, "特殊字符：、"
-    elif cell_value == '~':
-        return True, "特殊字符：~"
-    elif cell_value == '/':
-        return True, "特殊字符：/"
-    elif cell_value == '--':
-        return True, "特殊字符：--"
-    elif cell_value == '__':
-        return True, "特殊字符：__"
-    return False, ""
-
-
-def check_header_null(df: pd.DataFrame, header_row: int) -> List[Tuple[int, int, str]]:
+    """校验空值/特殊字符（供表头行调用，数据行在check_null_column中按列执行）"""
+    error_desc = special_value_desc(cell_value)
+    return bool(error_desc), error_desc
+
+
+def classify_column(df: pd.DataFrame, col_idx: int, start_row: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按不同取值判断空值/特殊字符（空值集合一次isin，不逐行比较）
+    :return: (codes, 各取值的错误描述数组，正常值为"")
+    """
+    codes, uniques = factorize_column(df, col_idx, start_row)
+    lowered = pd.Series(uniques, dtype=object).str.lower()
+    descs = np.full(len(uniques), "", dtype=object)
+    is_special = lowered.isin(SPECIAL_VALUE_TOKENS).to_numpy(dtype=bool)
+    descs[is_special] = "特殊字符：" + lowered[is_special].astype(str)
+    descs[np.asarray([EMPTY_PATTERN.match(v) is not None for v in uniques], dtype=bool)] = "空值(空白字符)"
+    return codes, descs
+
+
+def check_null_column(df: pd.DataFrame, header_row: int, budget=None) -> List[Tuple[int, int, str]]:
+    """
+    按列检查数据行的空值/特殊字符（跳过config中配置的第一列/全空列），结果按行列顺序输出
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    skip_cols = get_skip_cols(df)
+    candidates = []  # (行号, 列号, 错误描述)
+    for col_idx in range(df.shape[1]):
+        if col_idx in skip_cols:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_null", original_col):
+            continue
+        codes, descs = classify_column(df, col_idx, header_row + 1)
+        positions = flagged_rows(codes, descs != "")
+        # 超出单列预算的异常不会被记录，只保留到触发超限的那一条
+        limit = budget.rule_limit("check_null") if budget is not None else None
+        if limit is not None:
+            positions = positions[:limit + 1]
+        candidates.extend((header_row + 2 + idx, original_col, descs[codes[idx]]) for idx in positions)
+
+    errors = []
+    for excel_row, excel_col, error_desc in sorted(candidates, key=lambda item: (item[0], item[1])):
+        if budget is not None and budget.file_exhausted():
+            break
+        if budget is None or budget.allow("check_null", excel_row, excel_col):
+            errors.append((excel_row, excel_col, error_desc))
+    return errors
+
+
+def null_profile(df: pd.DataFrame, header_row: int, min_rate: float = 0.0) -> List[Tuple[int, int, str]]:
+    """
+    各列空值率统计（按不同取值计数，不生成逐单元格的错误），只输出空值率大于0且不低于min_rate的列
+    :return: 统计行列表 [(表头行号, 列号, 描述)]
+    """
+    profile = []
+    data_rows = df.shape[0] - header_row - 1
+    if data_rows <= 0:
+        return profile
+    skip_cols = get_skip_cols(df)
+    for col_idx in range(df.shape[1]):
+        if col_idx in skip_cols:
+            continue
+        codes, descs = classify_column(df, col_idx, header_row + 1)
+        counts = np.bincount(codes, minlength=len(descs))
+        blank = int(counts[descs == "空值(空白字符)"].sum())
+        special = int(counts[(descs != "") & (descs != "空值(空白字符)")].sum())
+        rate = (blank + special) / data_rows
+        if blank + special == 0 or rate < min_rate:
+            continue
+        header_val = df.iloc[header_row, col_idx]
+        header_name = str(header_val).strip() if not pd.isna(header_val) else f"列{col_idx + 1}"
+        profile.append((header_row + 1, col_idx + 1,
+                        f"空值率统计：【{header_name}】列空值率{rate:.2%}（{blank + special}/{data_rows}行，"
+                        f"空白{blank}行，特殊字符{special}行）"))
+    return profile
+
+
+def check_header_null(df: pd.DataFrame, header_row: int, budget=None) -> List[Tuple[int, int, str]]:
     """
     新增：专门检查表头行的空值/特殊字符
     :param df: 表格数据
     :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
     :return: 错误列表 [(行号, 列号, 错误描述)]
     """
     errors = []
@@ -43,6 +99,8 @@ def check_header_null(df: pd.DataFrame, header_row: int) -> List[Tuple[int, int,
     header_values = df.iloc[header_row]
 
     for col_idx in range(len(header_values)):
+        if budget is not None and budget.file_exhausted():
+            break
         # 提取表头单元格值，兼容NaN
         cell_val = header_values.iloc[col_idx]
 
@@ -50,6 +108,8 @@ def check_header_null(df: pd.DataFrame, header_row: int) -> List[Tuple[int, int,
         if pd.isna(cell_val):
             excel_row = header_row + 1
             excel_col = col_idx + 1
+            if budget is not None and not budget.allow("check_null", excel_row, excel_col):
+                continue
             errors.append((excel_row, excel_col, "表头空值：NaN（空白单元格）"))
             continue
 
@@ -61,6 +121,8 @@ def check_header_null(df: pd.DataFrame, header_row: int) -> List[Tuple[int, int,
         if is_error:
             excel_row = header_row + 1
             excel_col = col_idx + 1
+            if budget is not None and not budget.allow("check_null", excel_row, excel_col):
+                continue
             errors.append((excel_row, excel_col, f"表头{error_desc}"))
 
     return errors
\ No newline at end of file
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from config import OUTLIER_RULES
+from utils import build_header_clean_map, match_config_col, factorize_column, column_numbers
+
+# MAD换算为标准差的系数（正态分布下 σ ≈ MAD / 0.6745）
+MAD_SCALE = 0.6745
+# MAD为0时（一半以上取值相同）改用平均绝对偏差，σ ≈ 1.2533 × 平均绝对偏差
+MEAN_AD_SCALE = 1.2533
+
+METHOD_NAMES = {"mad": "稳健Z分数", "iqr": "四分位距"}
+
+
+def check_value(cell_value, field_type):
+    """兼容插件化接口，无实际逻辑"""
+    return False, ""
+
+
+def group_bounds(values, group_codes, method, threshold, min_group_size):
+    """
+    按分组计算稳健统计量（一次groupby），返回每行对应分组的中位数及允许的上下限（不参与判断的行为NaN）
+    :param values: 数值数组（NaN为空值/非数值）
+    :param group_codes: 分组编号数组（-1表示不参与统计）
+    :param method: "mad"=中位数±threshold倍稳健标准差，"iqr"=[Q1-threshold×IQR, Q3+threshold×IQR]
+    :param min_group_size: 分组内有效数值少于该数时不判断
+    :return: (中位数, 下限, 上限) 三个与values等长的数组
+    """
+    valid = ~np.isnan(values) & (group_codes >= 0)
+    data = pd.DataFrame({"group": group_codes[valid], "value": values[valid]})
+    grouped = data.groupby("group")["value"]
+    stats = pd.DataFrame({"size": grouped.size(), "median": grouped.median()})
+    if method == "iqr":
+        quartiles = grouped.quantile([0.25, 0.75]).unstack()
+        spread = quartiles[0.75] - quartiles[0.25]
+        stats["low"] = quartiles[0.25] - threshold * spread
+        stats["high"] = quartiles[0.75] + threshold * spread
+    else:
+        deviation = (data["value"] - stats["median"].reindex(data["group"]).to_numpy()).abs()
+        by_group = deviation.groupby(data["group"])
+        sigma = by_group.median() / MAD_SCALE
+        sigma = sigma.where(sigma > 0, by_group.mean() * MEAN_AD_SCALE)
+        stats["low"] = stats["median"] - threshold * sigma
+        stats["high"] = stats["median"] + threshold * sigma
+        spread = sigma
+    # 样本过少或离散程度为0（取值全部相同等）的分组不判断
+    stats.loc[(stats["size"] < min_group_size) | ~(spread > 0), ["low", "high"]] = np.nan
+
+    row_stats = np.full((len(values), 3), np.nan)
+    if len(stats):
+        lookup = stats[["median", "low", "high"]].reindex(np.arange(stats.index.max() + 1)).to_numpy()
+        row_stats[valid] = lookup[group_codes[valid]]
+    return row_stats[:, 0], row_stats[:, 1], row_stats[:, 2]
+
+
+def check_outlier(df, header_row, budget=None):
+    """
+    按OUTLIER_RULES检查数值字段的统计离群值：按分组字段（如监测点）分组，组内用稳健Z分数（MAD）或四分位距判断
+    每列只解析一次数值，所有分组的统计量在一次groupby中算出
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    header_clean_to_col = build_header_clean_map(df, header_row)
+    start_row = header_row + 1
+    data_rows = df.shape[0] - start_row
+    if data_rows <= 0:
+        return errors
+
+    for field_key, rule in OUTLIER_RULES.items():
+        if not field_key or not rule:
+            continue
+        col_idx = match_config_col(header_clean_to_col, field_key)
+        if col_idx is None:
+            continue  # 字段未匹配 → 静默跳过
+        group_key = rule.get("group_by")
+        group_idx = match_config_col(header_clean_to_col, group_key) if group_key else None
+        if group_key and group_idx is None:
+            continue  # 分组字段未匹配 → 静默跳过
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_outlier", original_col):
+            continue
+
+        method = rule.get("method", "mad")
+        threshold = rule.get("threshold", 3.5 if method == "mad" else 1.5)
+        values = column_numbers(df, col_idx, start_row)
+        if group_idx is None:
+            group_codes, group_names = np.zeros(data_rows, dtype=np.int64), np.array(["全部"], dtype=object)
+        else:
+            group_codes, group_names = factorize_column(df, group_idx, start_row)
+            # 分组字段为空的行不参与统计
+            empty_groups = np.array([not name for name in group_names], dtype=bool)
+            group_codes = np.where(empty_groups[group_codes], -1, group_codes) if empty_groups.any() else group_codes
+        medians, lows, highs = group_bounds(values, group_codes, method, threshold, rule.get("min_group_size", 10))
+
+        with np.errstate(invalid='ignore'):
+            outliers = (values < lows) | (values > highs)
+        group_show = f"{group_key}=" if group_idx is not None else ""
+        for idx in np.flatnonzero(outliers):
+            original_row = start_row + 1 + idx
+            if budget is not None and not budget.allow("check_outlier", original_row, original_col):
+                break
+            errors.append((original_row, original_col,
+                           f"统计离群值：{field_key}（{group_show}{group_names[group_codes[idx]]}组内"
+                           f"{METHOD_NAMES.get(method, method)}判断，当前值={values[idx]:g}，"
+                           f"组中位数={medians[idx]:g}，正常范围{lows[idx]:g}~{highs[idx]:g}）"))
+    return errors
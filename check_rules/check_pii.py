@@ -0,0 +1,111 @@
+import re
+import numpy as np
+import pandas as pd
+from config import PII_SCAN_CONFIG, ENCRYPT_REQUIRED_FIELDS
+from utils import get_skip_cols, factorize_column, flagged_rows
+from check_rules.check_id_card import validate_id_cards
+
+# 个人信息类型 → (名称, 正则)；前后不能紧邻数字/字母，避免从更长的编号中截取
+PII_PATTERNS = {
+    "id_card": ("身份证号", r'(?<![0-9A-Za-z])[1-9][0-9]{5}(?:18|19|20)[0-9]{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12][0-9]|3[01])[0-9]{3}[0-9Xx](?![0-9A-Za-z])'),
+    "mobile": ("手机号", r'(?<![0-9A-Za-z])1[3-9][0-9]{9}(?![0-9A-Za-z])'),
+    "bank_card": ("银行卡号", r'(?<![0-9A-Za-z])(?:62|4[0-9]|5[1-5])[0-9]{14,17}(?![0-9A-Za-z])'),
+    "email": ("邮箱", r'[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}'),
+}
+# 触发条件：所有类型都包含连续11位以上数字或@，不满足的取值无需执行合并正则
+_TRIGGER_PATTERNS = (re.compile(r'[0-9]{11}'), re.compile('@'))
+# 已编译的合并正则缓存 {类型元组: 正则}
+_COMBINED_PATTERNS = {}
+
+
+def check_value(cell_value, field_type):
+    """兼容插件化接口，无实际逻辑"""
+    return False, ""
+
+
+def combined_pattern(types):
+    """将启用的个人信息类型合并为一个正则（每种类型一个命名分组），同一进程内只编译一次"""
+    key = tuple(t for t in types if t in PII_PATTERNS)
+    if key not in _COMBINED_PATTERNS:
+        _COMBINED_PATTERNS[key] = re.compile("|".join(f"(?P<{t}>{PII_PATTERNS[t][1]})" for t in key)) if key else None
+    return _COMBINED_PATTERNS[key]
+
+
+def luhn_valid(number: str) -> bool:
+    """银行卡号Luhn校验"""
+    digits = [int(c) for c in reversed(number)]
+    total = sum(digits[0::2]) + sum(d * 2 - 9 if d > 4 else d * 2 for d in digits[1::2])
+    return total % 10 == 0
+
+
+def mask_hit(hit: str) -> str:
+    """错误描述中展示的命中内容做脱敏处理（保留前3位和后4位），避免检查结果再次泄露"""
+    if "@" in hit:
+        name, domain = hit.split("@", 1)
+        return f"{name[:1]}***@{domain}"
+    return hit[:3] + "*" * max(len(hit) - 7, 1) + hit[-4:]
+
+
+def find_pii(values, pattern):
+    """
+    在一组不同取值中查找未脱敏的个人信息
+    先把所有取值以换行拼接，整体查找一遍触发条件（连续11位数字或@），只对命中触发条件的取值执行合并正则
+    身份证号需通过校验码校验，银行卡号需通过Luhn校验
+    :return: 每个取值的命中 (类型, 命中内容)，未命中为None
+    """
+    hits = [None] * len(values)
+    if len(values) == 0:
+        return hits
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    starts = np.r_[0, np.cumsum(lengths + 1)[:-1]]
+    joined = "\n".join(values)
+    positions = [found.start() for trigger in _TRIGGER_PATTERNS for found in trigger.finditer(joined)]
+    candidates = np.unique(np.searchsorted(starts, positions, side='right') - 1)
+    for i in candidates:
+        for found in pattern.finditer(values[i]):
+            kind, hit = found.lastgroup, found.group()
+            if kind == "id_card" and validate_id_cards(np.array([hit.upper()]))[0]:
+                continue
+            if kind == "bank_card" and not luhn_valid(hit):
+                continue
+            hits[i] = (kind, hit)
+            break
+    return hits
+
+
+def check_pii(df, header_row, budget=None):
+    """
+    个人信息发现：扫描未配置脱敏检查的各列（ENCRYPT_REQUIRED_FIELDS以外），查找未脱敏的身份证号、手机号、银行卡号、邮箱
+    每列使用一个合并正则，只扫描不同取值
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    pattern = combined_pattern(PII_SCAN_CONFIG.get("types", list(PII_PATTERNS)))
+    if pattern is None:
+        return errors
+    exclude = set(ENCRYPT_REQUIRED_FIELDS) | set(PII_SCAN_CONFIG.get("exclude_fields", []))
+    skip_cols = get_skip_cols(df)
+
+    for col_idx in range(df.shape[1]):
+        header_val = df.iloc[header_row, col_idx]
+        header_name = str(header_val).strip() if not pd.isna(header_val) else ""
+        if col_idx in skip_cols or header_name in exclude:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_pii", original_col):
+            continue
+
+        codes, uniques = factorize_column(df, col_idx, header_row + 1)
+        unique_hits = find_pii(uniques, pattern)
+        for idx in flagged_rows(codes, [hit is not None for hit in unique_hits]):
+            kind, hit = unique_hits[codes[idx]]
+            original_row = header_row + 2 + idx
+            if budget is not None and not budget.allow("check_pii", original_row, original_col):
+                break
+            errors.append((original_row, original_col,
+                           f"疑似未脱敏个人信息：【{header_name or f'列{original_col}'}】列包含"
+                           f"{PII_PATTERNS[kind][0]}（{mask_hit(hit)}）"))
+    return errors
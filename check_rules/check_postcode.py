@@ -1,13 +1,48 @@
+import re
 from typing import Tuple
+import numpy as np
+from utils import get_field_type_cols, get_column_text, get_skip_cols
+
+# 6位纯数字（预编译，按列一次fullmatch）
+POSTCODE_PATTERN = re.compile(r'[0-9]{6}')
+
 
 def check_value(cell_value: str, field_type: str) -> Tuple[bool, str]:
-    """校验邮政编码（仅当字段类型为邮政编码时触发）"""
-    if field_type != '邮政编码':
-        return False, ""
-    if not cell_value:
-        return False, ""
-    if len(cell_value) != 6:
-        return True, f"邮政编码：长度需为6位（当前{len(cell_value)}位）"
-    if not cell_value.isdigit():
-        return True, f"邮政编码：需为6位纯数字（当前值：{cell_value}）"
-    return False, ""
\ No newline at end of file
+    """兼容插件化接口，邮政编码校验在check_postcode_column中按列执行"""
+    return False, ""
+
+
+def check_postcode_column(df, header_row, budget=None):
+    """
+    按列校验邮政编码（表头匹配为邮政编码类型的列）：长度6位、纯数字
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    # 与逐单元格检查相同，按配置跳过第一列/全空列
+    skip_cols = get_skip_cols(df)
+    for col_idx in get_field_type_cols(df, header_row, '邮政编码'):
+        if col_idx in skip_cols:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_postcode", original_col):
+            continue
+
+        texts = get_column_text(df, col_idx, header_row + 1)
+        lengths = texts.str.len().to_numpy()
+        length_bad = (lengths > 0) & (lengths != 6)
+        format_bad = (lengths == 6) & ~texts.str.fullmatch(POSTCODE_PATTERN).to_numpy(dtype=bool)
+
+        values = texts.to_numpy(dtype=object)
+        for idx in np.flatnonzero(length_bad | format_bad):
+            original_row = header_row + 2 + idx
+            if budget is not None and not budget.allow("check_postcode", original_row, original_col):
+                break
+            if length_bad[idx]:
+                desc = f"邮政编码：长度需为6位（当前{lengths[idx]}位）"
+            else:
+                desc = f"邮政编码：需为6位纯数字（当前值：{values[idx]}）"
+            errors.append((original_row, original_col, desc))
+    return errors
@@ -9,11 +9,12 @@ def check_value(cell_value, field_type):
     return False, ""
 
 
-def check_primary_slave_duplicate(df, header_row):
+def check_primary_slave_duplicate(df, header_row, budget=None):
     """
     多主键-从键组合重复校验（支持按配置控制主键是否允许重复，静默匹配失败，支持联合主键）
     :param df: 表格数据
     :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
     :return: 错误列表 [(行号, 列号, 错误描述)]
     """
     errors = []
@@ -36,6 +37,8 @@ def check_primary_slave_duplicate(df, header_row):
 
     # 3. 遍历所有主键-从键规则（支持多组+联合主键）
     for primary_keys_str, rule_config in PRIMARY_SLAVE_KEY_RULES.items():
+        if budget is not None and budget.is_exhausted("check_primary_slave", 1):
+            break
         # ===== 解析新格式配置 =====
         # 规则配置：[从键字符串, 是否允许主键重复(字符串True/False)]
         slave_keys_str = rule_config[0] if len(rule_config) >= 1 else ""
@@ -122,11 +125,15 @@ def check_primary_slave_duplicate(df, header_row):
                         f"重复行：{','.join(map(str, row_nums))}"
                     )
                     # 列号标为1（行级错误），错误行号取第二个重复行
+                    if budget is not None and not budget.allow("check_primary_slave", row_nums[1], 1):
+                        break
                     errors.append((row_nums[1], 1, error_desc))
 
         # ===== 原有：主键+从键组合重复校验（仅当从键匹配成功时执行）=====
         if not slave_col_idxs:
             continue  # 有从键未匹配 → 跳过组合校验
+        if budget is not None and budget.is_exhausted("check_primary_slave", 1):
+            break
 
         combo_dict = {}  # 组合值 → (主键描述, 从键描述, 行号列表)
         # 遍历数据行（仅处理表头后的行）
@@ -175,6 +182,8 @@ def check_primary_slave_duplicate(df, header_row):
                     f"重复行：{','.join(map(str, row_nums))}"
                 )
                 # 列号标为1（行级错误），错误行号取第二个重复行
+                if budget is not None and not budget.allow("check_primary_slave", row_nums[1], 1):
+                    break
                 errors.append((row_nums[1], 1, error_desc))
 
     return errors
\ No newline at end of file
@@ -0,0 +1,52 @@
+from config import REFERENCE_RULES
+from utils import build_header_clean_map, match_config_col, factorize_column, flagged_rows
+from reference_index import load_reference
+
+# 已提示过的参照数据读取失败（同一次运行中每个字段只提示一次）
+_REPORTED_FAILURES = set()
+
+
+def check_value(cell_value, field_type):
+    """兼容插件化接口，无实际逻辑"""
+    return False, ""
+
+
+def check_reference(df, header_row, budget=None):
+    """
+    按REFERENCE_RULES检查引用完整性：字段取值需存在于参照数据（其他表格文件的某列、txt名单或配置的取值列表）中
+    参照数据只加载一次并建立哈希索引（跨文件、跨运行缓存），每列的不同取值一次批量查询
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    header_clean_to_col = build_header_clean_map(df, header_row)
+
+    for field_key, rule in REFERENCE_RULES.items():
+        if not field_key or not rule:
+            continue
+        col_idx = match_config_col(header_clean_to_col, field_key)
+        if col_idx is None:
+            continue  # 字段未匹配 → 静默跳过
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_reference", original_col):
+            continue
+        try:
+            reference = load_reference(rule, field_key)
+        except Exception as e:
+            if field_key not in _REPORTED_FAILURES:
+                _REPORTED_FAILURES.add(field_key)
+                print(f"参照数据读取失败：{field_key}（{rule.get('source', '')}：{e}），跳过该字段的引用检查")
+            continue
+
+        # 空值跳过，其余不同取值一次批量查询哈希索引
+        codes, uniques = factorize_column(df, col_idx, header_row + 1)
+        unique_bad = (uniques != "") & ~reference.contains(uniques)
+        for idx in flagged_rows(codes, unique_bad):
+            original_row = header_row + 2 + idx
+            if budget is not None and not budget.allow("check_reference", original_row, original_col):
+                break
+            errors.append((original_row, original_col,
+                           f"引用不存在：{field_key}（当前值='{uniques[codes[idx]]}'，不在{reference.description}中）"))
+    return errors
@@ -7,31 +7,29 @@ def check_value(cell_value, field_type):
     return False, ""
 
 
-def check_duplicate_row(df, header_row):
-    """检查数据行是否完全重复"""
+def check_duplicate_row(df, header_row, budget=None):
+    """检查数据行是否完全重复（budget为错误预算，用尽后停止扫描）"""
     errors = []
     # 只检查表头后的行
     data_rows = df.iloc[header_row + 1:]
-    # 清理每行数据（去空格、转字符串）
-    row_clean = []
-    row_original_idx = []
+    # 清理每行数据（去空格、转字符串），边清理边查找重复行，预算用尽时可提前结束
+    seen = {}
     for row_idx, (_, row) in enumerate(data_rows.iterrows()):
         clean_row = []
         for val in row:
             # 修复：pd.isna() 需要先导入pandas
             val_str = str(val).strip() if not pd.isna(val) else ""
             clean_row.append(val_str)
-        row_clean.append(tuple(clean_row))  # 转元组用于哈希
-        row_original_idx.append(row_idx + header_row + 2)  # 转换为Excel实际行号
+        clean_row = tuple(clean_row)  # 转元组用于哈希
+        original_row = row_idx + header_row + 2  # 转换为Excel实际行号
 
-    # 查找重复行
-    seen = {}
-    for row_idx, (clean_row, original_row) in enumerate(zip(row_clean, row_original_idx)):
         # 全空行跳过
         if all(not val for val in clean_row):
             continue
         if clean_row in seen:
             prev_row = seen[clean_row]
+            if budget is not None and not budget.allow("check_row", original_row, 1):
+                break
             errors.append(
                 (original_row, 1,  # 列号标为1，代表整行重复
                  f"数据行重复：第{original_row}行与第{prev_row}行完全重复")
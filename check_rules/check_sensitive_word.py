@@ -2,52 +2,147 @@
 # -*- coding:utf-8 -*-
 import pandas as pd
 import os
-import sys
-import re
-from datetime import datetime
+from collections import deque
+from config import SENSITIVE_CONFIG, EMPTY_PATTERN, get_sensitive_file_path
+from utils import factorize_column, flagged_rows, infer_column_kind
+
+# 常用繁体字 → 简体字（未安装opencc时使用的内置对照表，每两个字符为一组：繁体、简体）
+_T2S_PAIRS = (
+    "國国鐵铁誌志輪轮東东車车馬马門门們们這这來来時时對对說说會会為为學学個个後后麼么過过還还進进"
+    "動动長长開开關关與与從从點点陽阳陰阴電电話话語语讀读書书記记錢钱銀银黨党軍军獨独屬属區区歲岁"
+    "體体員员頭头臉脸愛爱戀恋戰战亂乱殺杀槍枪彈弹藥药賣卖買买貨货價价費费資资產产業业務务辦办聯联"
+    "網网絡络兒儿傳传報报紙纸視视聽听廣广場场邊边氣气華华專专發发現现實实際际總总統统領领導导議议"
+    "興兴義义權权歐欧亞亚樂乐滅灭難难題题輸输偽伪證证據据處处罰罚賭赌獄狱鬥斗漢汉臺台灣湾澤泽濤涛"
+    "溫温錦锦幣币鈔钞詐诈騙骗顛颠韓韩習习鄧邓濕湿癮瘾嗎吗"
+)
+# 噪声字符在归一化文本中的占位符（归一化前后长度一致，命中位置可直接对应原文）
+NOISE_MARK = '\x00'
+
+
+def load_t2s_converter():
+    """可选依赖opencc：已安装且启用时返回繁简转换器，否则返回None（只使用内置对照表）"""
+    if not SENSITIVE_CONFIG.get("use_opencc", True):
+        return None
+    try:
+        import opencc
+    except ImportError:
+        return None
+    for config_name in ("t2s", "t2s.json"):
+        try:
+            return opencc.OpenCC(config_name)
+        except Exception:
+            continue
+    return None
+
+
+class CharNormalizer(dict):
+    """逐字符归一化映射表（供str.translate使用，按需计算并缓存）
+    全角→半角、大写→小写、繁体→简体，噪声字符映射为NOISE_MARK；每个字符只映射为一个字符
+    """
+
+    def __init__(self, noise_chars="", t2s_converter=None):
+        super().__init__()
+        self.noise_chars = set(noise_chars)
+        self.t2s_converter = t2s_converter
+        self.t2s = dict(zip(_T2S_PAIRS[0::2], _T2S_PAIRS[1::2]))
+
+    def __missing__(self, code):
+        char = chr(code)
+        if 0xFF01 <= code <= 0xFF5E:
+            # 全角ASCII → 半角
+            char = chr(code - 0xFEE0)
+        elif code == 0x3000:
+            char = ' '
+        lower = char.lower()
+        if len(lower) == 1:
+            char = lower
+        if char in self.t2s:
+            char = self.t2s[char]
+        elif self.t2s_converter is not None and ord(char) > 0x2E7F:
+            converted = self.t2s_converter.convert(char)
+            if len(converted) == 1:
+                char = converted
+        if char in self.noise_chars:
+            char = NOISE_MARK
+        self[code] = char
+        return char
+
 
 # ===================== 内嵌DFA敏感词检测器 =====================
 class DFAFilter:
-    """基于确定性有限自动机（DFA）的敏感词检测器
+    """基于确定性有限自动机（Aho-Corasick多模式自动机）的敏感词检测器
     核心：仅检测文本中的敏感词，不做替换，返回检测结果
+    文本和敏感词做相同的逐字符归一化（全角→半角、大写→小写、繁体→简体），匹配时跳过噪声字符，
+    如“法*轮*功”“法 轮 功”“法輪功”均可命中“法轮功”；噪声字符两侧均为英文字母/数字时不跨越匹配（分开的单词/数字不拼成敏感词）
+    每个单元格只从左到右扫描一遍
     """
 
-    def __init__(self):
-        # 敏感词字典树（核心数据结构）
-        self.keyword_chains = {}
-        # 字典树终止符（标记敏感词结束）
-        self.delimit = '\x00'
-        # 已加载的敏感词集合（用于快速查询）
+    def __init__(self, noise_chars=None, t2s_converter=None):
+        if noise_chars is None:
+            noise_chars = SENSITIVE_CONFIG.get("noise_chars", "")
+        # 逐字符归一化映射表（跨单元格缓存）
+        self.normalizer = CharNormalizer(noise_chars, t2s_converter)
+        # 自动机：goto[状态]={字符: 下一状态}，fail为失败跳转，terminal为在该状态结束的敏感词
+        self.goto = [{}]
+        self.fail = [0]
+        self.terminal = [None]
+        # outputs[状态]：在该状态结束的全部敏感词（含后缀状态的敏感词），build时计算
+        self.outputs = [()]
+        # 敏感词首字符集合：不含任何首字符的文本直接跳过
+        self.first_chars = set()
+        self._built = True
+        # 已加载的敏感词集合（归一化后，用于快速查询）
         self.sensitive_words = set()
 
+    def normalize(self, text):
+        """逐字符归一化，噪声字符替换为NOISE_MARK（长度不变）"""
+        return text.translate(self.normalizer)
+
     def add(self, keyword):
         """添加单个敏感词到字典树
-        :param keyword: 敏感词（字符串）
+        :param keyword: 敏感词（字符串），与待检测文本做相同的归一化并去掉噪声字符（如“臺”→“台”、“6。4”→“64”）
         """
         if not isinstance(keyword, str):
             keyword = str(keyword)
-        # 统一转为小写，实现大小写不敏感匹配
-        keyword = keyword.lower().strip()
+        keyword = self.normalize(keyword.strip()).replace(NOISE_MARK, "")
         if not keyword or keyword in self.sensitive_words:
             return
 
         self.sensitive_words.add(keyword)
-        level = self.keyword_chains
+        state = 0
         for char in keyword:
-            if char in level:
-                level = level[char]
-            else:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
                 # 为未存在的字符创建新节点
-                for new_char in [char] + list(keyword[keyword.index(char) + 1:]):
-                    level[new_char] = {}
-                    last_level, last_char = level, new_char
-                    level = level[new_char]
-                # 标记敏感词结束
-                last_level[last_char] = {self.delimit: 0}
-                break
-        # 若敏感词已存在，补充终止符
-        if self.delimit not in level:
-            level[self.delimit] = 0
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.terminal.append(None)
+                self.outputs.append(())
+                self.goto[state][char] = next_state
+            state = next_state
+        self.terminal[state] = keyword
+        self.first_chars.add(keyword[0])
+        self._built = False
+
+    def build(self):
+        """按广度优先计算失败跳转，并把后缀状态的敏感词合并到当前状态（支持重叠、包含关系的敏感词）"""
+        queue = deque()
+        for state in self.goto[0].values():
+            self.fail[state] = 0
+            queue.append(state)
+        self.outputs[0] = ()
+        while queue:
+            state = queue.popleft()
+            own = (self.terminal[state],) if self.terminal[state] else ()
+            self.outputs[state] = own + self.outputs[self.fail[state]]
+            for char, next_state in self.goto[state].items():
+                fail_state = self.fail[state]
+                while fail_state and char not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(char, 0)
+                queue.append(next_state)
+        self._built = True
 
     def parse(self, path):
         """从文件加载敏感词列表（每行一个敏感词）
@@ -55,14 +150,25 @@ class DFAFilter:
         """
         # 解析绝对路径（兼容相对路径）
         abs_path = os.path.abspath(path)
+        # 显式配置的不检测敏感词（按归一化后的形式比较），跳过时输出提示
+        ignore_words = {self.normalize(str(word).strip()).replace(NOISE_MARK, "")
+                        for word in SENSITIVE_CONFIG.get("ignore_words", [])}
+        ignored = []
         try:
             with open(abs_path, 'r', encoding='utf-8') as f:
                 for line in f:
-                    self.add(line.strip())
+                    word = line.strip()
+                    if word and self.normalize(word).replace(NOISE_MARK, "") in ignore_words:
+                        ignored.append(word)
+                        continue
+                    self.add(word)
         except FileNotFoundError:
             raise FileNotFoundError(f"敏感词文件 {abs_path} 不存在，请检查路径！")
         except Exception as e:
             raise Exception(f"加载敏感词文件失败：{e}")
+        if ignored:
+            print(f"⚠️  按SENSITIVE_CONFIG['ignore_words']跳过{len(ignored)}个敏感词：{'、'.join(ignored)}")
+        self.build()
 
     def detect(self, message):
         """检测文本中的敏感词
@@ -70,40 +176,46 @@ class DFAFilter:
         :return: dict - 检测结果
                 {
                     'has_sensitive': bool,  # 是否包含敏感词
-                    'sensitive_words': list  # 检测到的敏感词列表（去重）
+                    'sensitive_words': list,  # 检测到的敏感词列表（归一化后的敏感词，去重，按出现顺序）
+                    'matches': list  # 每次命中 {'word': 敏感词, 'start': 原文起始位置, 'end': 原文结束位置（不含）, 'text': 原文片段}
                 }
         """
+        if not self._built:
+            self.build()
         if not isinstance(message, str):
             message = str(message)
-        # 统一转为小写匹配，不修改原文本
-        message_lower = message.lower()
-        detected_words = set()  # 存储检测到的敏感词（去重）
-        start = 0
-
-        while start < len(message_lower):
-            level = self.keyword_chains
-            step_ins = 0  # 记录匹配到的字符长度
-            current_word = ""  # 存储当前匹配的敏感词
-            # 从start位置开始遍历文本字符
-            for char in message_lower[start:]:
-                if char in level:
-                    step_ins += 1
-                    current_word += char
-                    if self.delimit in level[char]:
-                        # 匹配到完整敏感词，加入结果集
-                        detected_words.add(current_word)
-                        # 继续向后匹配（支持重叠敏感词）
-                        level = level[char]
-                    else:
-                        level = level[char]
-                else:
-                    break
-            start += 1
+        # 归一化文本与原文等长，位置一一对应，不修改原文本
+        normalized = message.translate(self.normalizer)
+        matches = []
+        if not self.first_chars.isdisjoint(normalized):
+            goto, fail, outputs = self.goto, self.fail, self.outputs
+            positions = []  # 非噪声字符在原文中的位置
+            state = 0
+            skipped = False  # 上一个非噪声字符之后是否跳过了噪声字符
+            prev_ascii = False  # 上一个非噪声字符是否为英文字母/数字
+            for pos, char in enumerate(normalized):
+                if char == NOISE_MARK:
+                    skipped = True
+                    continue
+                is_ascii = char.isascii() and char.isalnum()
+                if skipped and prev_ascii and is_ascii:
+                    # 两侧均为英文字母/数字时不跨越空格/标点匹配（“His book”不命中“sb”，“1.3 g 8 盒”不命中“g8”）
+                    state = 0
+                skipped = False
+                prev_ascii = is_ascii
+                positions.append(pos)
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                for word in outputs[state]:
+                    start = positions[-len(word)]
+                    matches.append({'word': word, 'start': start, 'end': pos + 1, 'text': message[start:pos + 1]})
 
         # 整理检测结果
         result = {
-            'has_sensitive': len(detected_words) > 0,
-            'sensitive_words': list(detected_words)
+            'has_sensitive': len(matches) > 0,
+            'sensitive_words': list(dict.fromkeys(match['word'] for match in matches)),
+            'matches': matches
         }
         return result
 
@@ -117,7 +229,7 @@ def get_sensitive_detector(sensitive_file_path):
     """
     global _global_detector
     if _global_detector is None:
-        detector = DFAFilter()
+        detector = DFAFilter(t2s_converter=load_t2s_converter())
         # 加载敏感词文件
         detector.parse(sensitive_file_path)
         _global_detector = detector
@@ -139,71 +251,94 @@ def get_original_text_value(cell_val):
     else:
         return str(cell_val).strip()
 
-def check_sensitive_word(df, header_row):
+def describe_matches(matches):
+    """命中结果 → 错误描述中的敏感词列表（每个敏感词取首次命中）；原文经过变形时附上原文片段及位置"""
+    described = {}
+    for match in matches:
+        word = match['word']
+        if word in described:
+            continue
+        if match['text'] == word:
+            described[word] = word
+        else:
+            described[word] = f"{word}（原文第{match['start'] + 1}~{match['end']}字'{match['text']}'）"
+    return list(described.values())
+
+def sensitive_scan_cols(df, header_row):
+    """
+    需要检测敏感词的列：exclude_fields中的字段不检测，include_fields中的字段始终检测，
+    其余列按列类型推断跳过数值/日期/编号列（skip_typed_columns为False时全部检测）
+    :return: [(列索引, 表头名称)]
+    """
+    include = set(SENSITIVE_CONFIG.get("include_fields", []))
+    exclude = set(SENSITIVE_CONFIG.get("exclude_fields", []))
+    skip_typed = SENSITIVE_CONFIG.get("skip_typed_columns", True)
+    scan_cols = []
+    for col_idx in range(df.shape[1]):
+        header_val = df.iloc[header_row, col_idx] if header_row < df.shape[0] else None
+        header_name = str(header_val).strip() if not pd.isna(header_val) else ""
+        if header_name in exclude:
+            continue
+        if header_name not in include:
+            kind = infer_column_kind(df, col_idx, header_row + 1)
+            if kind == "empty" or (skip_typed and kind != "text"):
+                continue
+        scan_cols.append((col_idx, header_name or f"列{col_idx + 1}"))
+    return scan_cols
+
+def check_sensitive_word(df, header_row, budget=None):
     """
-    全表格敏感词检测（遍历所有单元格，不限制字段）
+    全表格敏感词检测（不限制字段，按列类型只检测含自由文本的列）
     :param df: 表格数据（保持原有读取格式）
     :param header_row: 表头行索引（仅用于区分表头/数据行，表头不检测）
+    :param budget: 错误预算（ErrorBudget），为None时不限制
     :return: 错误列表 [(行号, 列号, 错误描述)]
     """
     errors = []
-    # 1. 添加项目根目录到Python路径，导入配置
-    RULE_DIR = os.path.dirname(os.path.abspath(__file__))  # check_rules目录
-    ROOT_DIR = os.path.dirname(RULE_DIR)  # 项目根目录（SetExcelRule）
-    sys.path.append(ROOT_DIR)
-
-    # 导入配置中的关键参数
-    try:
-        from config import EMPTY_PATTERN, get_sensitive_file_path
-    except ImportError as e:
-        print(f"导入配置文件失败：{e}")
-        return errors
-
-    # 2. 初始化敏感词检测器
+    # 1. 初始化敏感词检测器（全局只加载一次）
     try:
-        # 获取敏感词文件绝对路径（基于配置的相对路径）
-        sensitive_file_path = get_sensitive_file_path()
-        print(f"敏感词文件路径：{sensitive_file_path}")  # 调试用，可删除
-        detector = get_sensitive_detector(sensitive_file_path)
+        detector = get_sensitive_detector(get_sensitive_file_path())
     except Exception as e:
         print(f"敏感词检测器初始化失败：{e}")
         return errors
 
-    # 3. 获取表头名称（用于错误提示）
-    header_names = []
-    for col_idx in range(df.shape[1]):
-        if header_row < df.shape[0]:
-            header_val = df.iloc[header_row, col_idx]
-            header_name = str(header_val).strip() if not pd.isna(header_val) else f"列{col_idx+1}"
-        else:
-            header_name = f"列{col_idx+1}"
-        header_names.append(header_name)
-
-    # 4. 遍历所有数据行和列（跳过表头行）
-    for row_idx in range(header_row + 1, df.shape[0]):
-        for col_idx in range(df.shape[1]):
-            # 提取并处理单元格值
-            cell_val = df.iloc[row_idx, col_idx]
-            processed_val = get_original_text_value(cell_val)
-
+    # 2. 逐列检测：每个不同取值只检测一次，再映射回各行（跳过表头行）
+    candidates = []  # (行号, 列号, 错误描述)
+    for col_idx, header_name in sensitive_scan_cols(df, header_row):
+        # 该列预算已用尽 → 跳过
+        if budget is not None and budget.is_exhausted("check_sensitive_word", col_idx + 1):
+            continue
+        codes, uniques = factorize_column(df, col_idx, header_row + 1)
+        unique_words = []
+        for processed_val in uniques:
             # 空值/空白字符跳过检测
             if EMPTY_PATTERN.match(processed_val):
+                unique_words.append(None)
                 continue
-
-            # 检测敏感词
             detect_result = detector.detect(processed_val)
-            if detect_result['has_sensitive']:
-                # 转换为Excel风格的行列号（从1开始）
-                excel_row = row_idx + 1
-                excel_col = col_idx + 1
-                # 整理敏感词列表
-                sensitive_words = "、".join(detect_result['sensitive_words'])
-                # 构造错误信息
-                error_desc = (
-                    f"内容包含敏感词：【{header_names[col_idx]}】列（行{excel_row}列{excel_col}），"
-                    f"当前值='{processed_val}'，检测到敏感词：{sensitive_words}"
-                )
-                errors.append((excel_row, excel_col, error_desc))
+            unique_words.append(describe_matches(detect_result['matches']) if detect_result['has_sensitive'] else None)
+
+        for idx in flagged_rows(codes, [words is not None for words in unique_words]):
+            # 转换为Excel风格的行列号（从1开始）
+            excel_row = header_row + 2 + idx
+            excel_col = col_idx + 1
+            processed_val = uniques[codes[idx]]
+            # 整理敏感词列表
+            sensitive_words = "、".join(unique_words[codes[idx]])
+            # 构造错误信息
+            error_desc = (
+                f"内容包含敏感词：【{header_name}】列（行{excel_row}列{excel_col}），"
+                f"当前值='{processed_val}'，检测到敏感词：{sensitive_words}"
+            )
+            candidates.append((excel_row, excel_col, error_desc))
+
+    # 3. 按行列顺序登记错误预算
+    for excel_row, excel_col, error_desc in sorted(candidates, key=lambda item: (item[0], item[1])):
+        if budget is not None and budget.file_exhausted():
+            break
+        if budget is not None and not budget.allow("check_sensitive_word", excel_row, excel_col):
+            continue
+        errors.append((excel_row, excel_col, error_desc))
 
     return errors
 
@@ -223,4 +358,16 @@ if __name__ == "__main__":
         for err in errors:
             print(f"行{err[0]} 列{err[1]}：{err[2]}")
     else:
-        print("未检测到敏感词")
\ No newline at end of file
+        print("未检测到敏感词")
+
+    # 噪声字符：中文之间跳过，英文单词/数字之间不跨越
+    test_detector = DFAFilter(noise_chars=SENSITIVE_CONFIG.get("noise_chars", ""))
+    for word in ("sb", "3p", "g8", "法轮功", "法轮", "輪"):
+        test_detector.add(word)
+    for text, expected in (("His book", []), ("this is big", []), ("pass 3 points", []), ("1.3 g 8 盒", []),
+                           ("法 轮", ["法轮", "轮"]), ("SB", ["sb"]), ("1.3g8盒", ["g8"])):
+        found = test_detector.detect(text)['sensitive_words']
+        assert found == expected, (text, found)
+    # 繁体敏感词按归一化后的形式加入（“輪”→“轮”）
+    assert "轮" in test_detector.sensitive_words
+    print("噪声字符匹配测试通过")
@@ -4,22 +4,86 @@ import sys
 import re
 from datetime import datetime
 from config import FIELD_DATE_RULES, EMPTY_PATTERN
+from utils import factorize_column, flagged_rows
 
 def check_value(cell_value, field_type):
     """兼容插件化接口，无实际逻辑"""
     return False, ""
 
 
-def get_original_text_value(cell_val):
-    """还原单元格值为原始文本形态"""
-    if pd.isna(cell_val):
-        return ""
-    if isinstance(cell_val, str):
-        return cell_val.strip()
-    elif isinstance(cell_val, (int, float)):
-        return str(cell_val).strip()
+# strptime指令 → 正则（与datetime.strptime的匹配规则一致）
+_DIRECTIVE_PATTERNS = {
+    'Y': r'(?P<Y>\d\d\d\d)',
+    'y': r'(?P<y>\d\d)',
+    'm': r'(?P<m>1[0-2]|0[1-9]|[1-9])',
+    'd': r'(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    'H': r'(?P<H>2[0-3]|[0-1]\d|\d)',
+    'M': r'(?P<M>[0-5]\d|\d)',
+    'S': r'(?P<S>6[0-1]|[0-5]\d|\d)',
+    'f': r'(?P<f>[0-9]{1,6})',
+    '%': '%',
+}
+# 已编译的日期格式缓存 {格式: 正则}，值为None表示含不支持的指令，回退到strptime
+_COMPILED_FORMATS = {}
+
+
+def compile_date_format(fmt):
+    """
+    将日期格式（如%Y-%m-%d）编译为正则（与strptime一致从开头匹配），不支持的指令返回None
+    """
+    if fmt in _COMPILED_FORMATS:
+        return _COMPILED_FORMATS[fmt]
+    parts = []
+    i = 0
+    compiled = None
+    try:
+        while i < len(fmt):
+            if fmt[i] == '%' and i + 1 < len(fmt):
+                parts.append(_DIRECTIVE_PATTERNS[fmt[i + 1]])
+                i += 2
+            elif fmt[i].isspace():
+                # strptime中格式里的空白匹配一个或多个空白字符
+                while i < len(fmt) and fmt[i].isspace():
+                    i += 1
+                parts.append(r'\s+')
+            else:
+                parts.append(re.escape(fmt[i]))
+                i += 1
+        compiled = re.compile(''.join(parts))
+    except (KeyError, re.error):
+        compiled = None
+    _COMPILED_FORMATS[fmt] = compiled
+    return compiled
+
+
+def _match_date(date_str, fmt):
+    """按编译后的正则匹配，并校验是否为真实日期（如2月30日无效）"""
+    pattern = compile_date_format(fmt)
+    if pattern is None:
+        try:
+            datetime.strptime(date_str, fmt)
+            return True
+        except ValueError:
+            return False
+    # 与strptime相同：从开头匹配（不为整串匹配而回溯），匹配后仍有剩余字符（unconverted data remains）即不合法
+    # 不含分隔符的格式（如%m%d）用fullmatch会回溯出strptime不接受的拆分
+    found = pattern.match(date_str)
+    if found is None or found.end() != len(date_str):
+        return False
+    parts = found.groupdict()
+    if parts.get('Y') is not None:
+        year = int(parts['Y'])
+    elif parts.get('y') is not None:
+        year = int(parts['y'])
+        year += 2000 if year <= 68 else 1900
     else:
-        return str(cell_val).strip()
+        year = 1900
+    try:
+        datetime(year, int(parts.get('m') or 1), int(parts.get('d') or 1),
+                 int(parts.get('H') or 0), int(parts.get('M') or 0), int(parts.get('S') or 0))
+    except ValueError:
+        return False
+    return True
 
 
 def is_valid_date(date_str, allowed_formats):
@@ -28,11 +92,8 @@ def is_valid_date(date_str, allowed_formats):
         return True, ""
 
     for fmt in allowed_formats:
-        try:
-            datetime.strptime(date_str, fmt)
+        if _match_date(date_str, fmt):
             return True, ""
-        except ValueError:
-            continue
 
     readable_formats = [
         fmt.replace("%Y", "YYYY").replace("%m", "MM").replace("%d", "DD")
@@ -43,8 +104,8 @@ def is_valid_date(date_str, allowed_formats):
     return False, error_desc
 
 
-def check_field_date(df, header_row):
-    """校验指定字段的日期格式（改为全量匹配，避免字段错配）"""
+def check_field_date(df, header_row, budget=None):
+    """校验指定字段的日期格式（改为全量匹配，避免字段错配，budget为错误预算）"""
     errors = []
     RULE_DIR = os.path.dirname(os.path.abspath(__file__))
     ROOT_DIR = os.path.dirname(RULE_DIR)
@@ -78,19 +139,25 @@ def check_field_date(df, header_row):
 
         # 后续校验逻辑（不变）
         original_col = match_col_idx + 1
-        for row_idx in range(header_row + 1, df.shape[0]):
-            cell_val = df.iloc[row_idx, match_col_idx]
-            processed_val = get_original_text_value(cell_val)
-
+        if budget is not None and budget.is_exhausted("check_time_rule", original_col):
+            continue  # 该列预算已用尽 → 跳过
+        # 每个不同取值只校验一次，再映射回各行
+        codes, uniques = factorize_column(df, match_col_idx, header_row + 1)
+        unique_errors = []
+        for processed_val in uniques:
             if EMPTY_PATTERN.match(processed_val):
+                unique_errors.append("")
                 continue
-
             valid, error_msg = is_valid_date(processed_val, allowed_formats)
-            if not valid:
-                original_row = row_idx + 1
-                error_desc = (
-                    f"日期格式非法：{field_key}（当前值='{processed_val}'，{error_msg}）"
-                )
-                errors.append((original_row, original_col, error_desc))
+            unique_errors.append("" if valid else error_msg)
+        for idx in flagged_rows(codes, [bool(msg) for msg in unique_errors]):
+            processed_val = uniques[codes[idx]]
+            original_row = header_row + 2 + idx
+            error_desc = (
+                f"日期格式非法：{field_key}（当前值='{processed_val}'，{unique_errors[codes[idx]]}）"
+            )
+            if budget is not None and not budget.allow("check_time_rule", original_row, original_col):
+                break
+            errors.append((original_row, original_col, error_desc))
 
     return errors
\ No newline at end of file
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from config import TIME_SERIES_RULES, FIELD_DATE_RULES
+from utils import build_header_clean_map, match_config_col, factorize_column, column_datetimes
+
+
+def check_value(cell_value, field_type):
+    """兼容插件化接口，无实际逻辑"""
+    return False, ""
+
+
+def format_timedelta(delta) -> str:
+    """时间间隔转为可读文本，如 1天2小时、30分钟"""
+    seconds = int(pd.Timedelta(delta).total_seconds())
+    parts = []
+    for unit, size in (("天", 86400), ("小时", 3600), ("分钟", 60), ("秒", 1)):
+        if seconds >= size:
+            parts.append(f"{seconds // size}{unit}")
+            seconds %= size
+    return "".join(parts) or "0秒"
+
+
+def format_time(value) -> str:
+    ts = pd.Timestamp(value)
+    return ts.strftime('%Y-%m-%d') if ts == ts.normalize() else ts.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def series_issues(times, group_codes, max_gap=None, check_order=True, check_duplicate=True, limit=None):
+    """
+    按分组检查时间序列：一次按（分组, 时间）的稳定排序，乱序/重复/缺口均由排序结果向量化得到
+    :param times: datetime64数组（NaT不参与检查）
+    :param group_codes: 分组编号数组（-1不参与检查）
+    :param max_gap: 允许的最大间隔（pd.Timedelta），为None时不检查缺口
+    :param limit: 每类问题最多返回行号最小的limit+1条（错误预算上限，None=不限制）
+    :return: 问题列表 [(行位置, 类型, 参照行位置, 参照时间或间隔)]，类型为 乱序/重复/缺口
+    """
+    times = np.asarray(times, dtype='datetime64[ns]')
+    positions = np.flatnonzero(~np.isnat(times) & (group_codes >= 0))
+    issues = []
+    if len(positions) == 0:
+        return issues
+    groups, valid_times = group_codes[positions], times[positions]
+
+    def first_rows(indices, row_positions):
+        """按行位置排序后只保留前limit+1条"""
+        indices = indices[np.argsort(row_positions[indices], kind='mergesort')]
+        return indices if limit is None else indices[:limit + 1]
+
+    # 按（分组, 时间）稳定排序：同组相邻，相同时间保持文件中的行顺序
+    order = np.lexsort((valid_times.view(np.int64), groups))
+    pos, ordered_times = positions[order], valid_times[order]
+    same_group = groups[order][1:] == groups[order][:-1]
+    deltas = ordered_times[1:] - ordered_times[:-1]
+
+    if check_order:
+        # 排序名次按文件行顺序（组内）排列后求前缀最大值：名次小于前面各行最大名次的行，其时间早于前面某行，即为乱序
+        # 各分组名次区间递增，前缀最大值跨组时不会误判
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        by_group = np.argsort(groups, kind='stable')
+        ranks = rank[by_group]
+        prev_max = np.r_[-1, np.maximum.accumulate(ranks)[:-1]]
+        flagged = np.flatnonzero(ranks < prev_max)
+        for i in first_rows(flagged, positions[by_group]):
+            issues.append((int(positions[by_group[i]]), "乱序", int(pos[prev_max[i]]), ordered_times[prev_max[i]]))
+
+    if check_duplicate:
+        # 与排序后前一条时间相同的为重复，参照行为该时间第一次出现的行（相同时间段的起点）
+        duplicated = np.r_[False, same_group & (deltas == np.timedelta64(0))]
+        run_start = np.maximum.accumulate(np.where(duplicated, 0, np.arange(len(order))))
+        for i in first_rows(np.flatnonzero(duplicated), pos):
+            issues.append((int(pos[i]), "重复", int(pos[run_start[i]]), ordered_times[i]))
+
+    if max_gap is not None:
+        for i in first_rows(np.flatnonzero(same_group & (deltas > max_gap.to_timedelta64())), pos[1:]):
+            issues.append((int(pos[i + 1]), "缺口", int(pos[i]), (ordered_times[i], deltas[i])))
+    return issues
+
+
+def check_time_series(df, header_row, budget=None):
+    """
+    按TIME_SERIES_RULES检查时间序列连续性：按分组字段（如监测点）分组，检查时间乱序、重复时间、超过允许间隔的缺口
+    时间列只解析一次（按不同取值），分组排序与差分为向量化计算
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（ErrorBudget），为None时不限制
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
+    header_clean_to_col = build_header_clean_map(df, header_row)
+    start_row = header_row + 1
+    data_rows = df.shape[0] - start_row
+    if data_rows <= 0:
+        return errors
+
+    for field_key, rule in TIME_SERIES_RULES.items():
+        if not field_key or not rule:
+            continue
+        # 时间字段与日期格式规则一致，全量匹配
+        col_idx = match_config_col(header_clean_to_col, field_key, exact=True)
+        if col_idx is None:
+            continue
+        group_key = rule.get("group_by")
+        group_idx = match_config_col(header_clean_to_col, group_key) if group_key else None
+        if group_key and group_idx is None:
+            continue
+        original_col = col_idx + 1
+        if budget is not None and budget.is_exhausted("check_time_series", original_col):
+            continue
+
+        times = column_datetimes(df, col_idx, start_row, rule.get("formats") or FIELD_DATE_RULES.get(field_key))
+        if group_idx is None:
+            group_codes, group_names = np.zeros(data_rows, dtype=np.int64), None
+        else:
+            group_codes, group_names = factorize_column(df, group_idx, start_row)
+            empty_groups = np.array([not name for name in group_names], dtype=bool)
+            group_codes = np.where(empty_groups[group_codes], -1, group_codes) if empty_groups.any() else group_codes
+        max_gap = pd.Timedelta(rule["max_gap"]) if rule.get("max_gap") else None
+        limit = budget.rule_limit("check_time_series") if budget is not None else None
+        issues = series_issues(times, group_codes, max_gap,
+                               rule.get("check_order", True), rule.get("check_duplicate", True), limit)
+
+        # 按行号顺序登记错误预算
+        issues.sort(key=lambda item: item[0])
+        for pos, kind, ref_pos, ref in issues:
+            original_row = start_row + 1 + pos
+            group_show = f"{group_key}={group_names[group_codes[pos]]}，" if group_names is not None else ""
+            current = format_time(times[pos])
+            if kind == "乱序":
+                detail = f"当前时间{current}早于行{start_row + 1 + ref_pos}的时间{format_time(ref)}"
+            elif kind == "重复":
+                detail = f"与行{start_row + 1 + ref_pos}的时间相同：{current}"
+            else:
+                prev_time, delta = ref
+                detail = (f"与上一时间{format_time(prev_time)}（行{start_row + 1 + ref_pos}）间隔{format_timedelta(delta)}，"
+                          f"超过允许的{format_timedelta(max_gap)}")
+            if budget is not None and not budget.allow("check_time_series", original_row, original_col):
+                break
+            errors.append((original_row, original_col, f"时间序列{kind}：{field_key}（{group_show}{detail}）"))
+    return errors
@@ -1,10 +1,17 @@
+import numpy as np
 import pandas as pd
 import importlib
 import os
 import sys
+import time
 from typing import List, Tuple, Dict, Callable
-from config import MIN_HEADER_COLS, SKIP_FIRST_COL, SKIP_ALL_EMPTY_COLS, ENABLED_RULES
-from utils import count_non_empty_cols, is_col_all_empty, match_field_type
+from config import (MIN_HEADER_COLS, ENABLED_RULES, SAMPLING_CONFIG, NULL_PROFILE_CONFIG, COLUMN_PROFILE_CONFIG,
+                    PRIMARY_SLAVE_KEY_RULES, FIELD_RANGE_RULES, FIELD_LENGTH_RULES, FIELD_ENUM_RULES,
+                    FIELD_DATE_RULES, ENCRYPT_REQUIRED_FIELDS, ENCRYPT_MASK_RULES, FIELD_REGEX_RULES, OUTLIER_RULES,
+                    TIME_SERIES_RULES, CROSS_FIELD_RULES, REFERENCE_RULES)
+from utils import (non_empty_mask, match_field_type, get_skip_cols,
+                   build_header_clean_map, match_config_col, get_field_type_cols,
+                   factorize_column, flagged_rows)
 
 # 确保根目录在Python路径中
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -18,12 +25,62 @@ from check_rules.check_field_length import check_field_length
 from check_rules.check_field_enum import check_field_enum
 from check_rules.check_time_rule import check_field_date
 from check_rules.check_sensitive_word import check_sensitive_word
-from check_rules.check_encrypt import check_encrypt
-from check_rules.check_null import check_header_null
+from check_rules.check_encrypt import check_encrypt, encrypt_mask_summary
+from check_rules.check_id_card import check_id_card_column
+from check_rules.check_mobile import check_mobile_column
+from check_rules.check_postcode import check_postcode_column
+from check_rules.check_field_regex import check_field_regex
+from check_rules.check_float import check_float_precision, get_target_precision
+from check_rules.check_null import check_header_null, check_null_column, null_profile
+from check_rules.check_outlier import check_outlier
+from check_rules.check_time_series import check_time_series
+from check_rules.check_cross_field import check_cross_field
+from check_rules.check_reference import check_reference
+from check_rules.check_pii import check_pii
+from error_budget import ErrorBudget
+from sampling import select_sample_rows, wilson_interval
+from metrics import FileMetrics, measure, CELL_LOOP_NAME
+from column_profile import TableProfile
+
+# 表级校验规则（规则名, 校验函数），按顺序执行，规则名用于错误预算统计
+TABLE_RULES = [
+    ("check_header", check_duplicate_header),          # 1. 表头重复检查
+    ("check_row", check_duplicate_row),                # 2. 数据行重复检查
+    ("check_primary_slave", check_primary_slave_duplicate),  # 3. 主键从键唯一性检查
+    ("check_key_scope", check_field_range),            # 4. 关键字范围检查
+    ("check_field_length", check_field_length),        # 5. 字段长度检查
+    ("check_field_enum", check_field_enum),            # 6. 枚举类型检查
+    ("check_time_rule", check_field_date),             # 7. 时间格式检查
+    ("check_sensitive_word", check_sensitive_word),    # 8. 敏感词检测
+    ("check_encrypt", check_encrypt),                  # 9. 字段加密检查
+    ("check_id_card", check_id_card_column),           # 10. 身份证号校验（按列向量化）
+    ("check_mobile", check_mobile_column),             # 11. 手机号校验（按列向量化）
+    ("check_postcode", check_postcode_column),         # 12. 邮政编码校验（按列向量化）
+    ("check_field_regex", check_field_regex),          # 13. 字段正则校验
+    ("check_float", check_float_precision),            # 14. 小数精度校验（按列向量化）
+    ("check_null", check_null_column),                 # 15. 数据行空值/特殊字符检查（按列向量化）
+    ("check_outlier", check_outlier),                  # 16. 分组统计离群值检查
+    ("check_time_series", check_time_series),          # 17. 时间序列乱序/重复/缺口检查
+    ("check_cross_field", check_cross_field),          # 18. 跨字段一致性检查
+    ("check_reference", check_reference),              # 19. 引用完整性检查
+    ("check_pii", check_pii),                          # 20. 个人信息发现（未配置脱敏的列）
+]
+# 表级规则名（这些规则的check_value仅为兼容插件化接口，不参与逐单元格循环）
+TABLE_RULE_NAMES = {rule_name for rule_name, _ in TABLE_RULES}
+# 仅检查表头行的规则（抽样模式下仍全量执行）
+HEADER_RULES = {"check_header"}
+# 需要比较全表数据行的规则（抽样模式下按配置全量执行或跳过）
+WHOLE_TABLE_RULES = {"check_row", "check_primary_slave"}
+# 需要读取全部列的规则（整行比较/全部单元格扫描），启用时不做按列读取
+FULL_READ_RULES = {"check_row", "check_sensitive_word", "check_null", "check_pii"}
+# 查找表头行时检查的前N行
+HEADER_SEARCH_ROWS = 10
 
 def load_check_rules() -> Dict[str, Callable]:
     rule_functions = {}
     for rule_name in ENABLED_RULES:
+        if rule_name in TABLE_RULE_NAMES:
+            continue
         try:
             module = importlib.import_module(f"check_rules.{rule_name}")
             rule_functions[rule_name] = module.check_value
@@ -33,13 +90,10 @@ def load_check_rules() -> Dict[str, Callable]:
 
 
 def find_valid_header_row(df: pd.DataFrame) -> int:
-    max_check_rows = min(10, df.shape[0])
-    for row_idx in range(max_check_rows):
-        row_values = df.iloc[row_idx]
-        non_empty_cols = count_non_empty_cols(row_values)
-        if non_empty_cols >= MIN_HEADER_COLS:
-            return row_idx
-    return 0
+    # 前N行各行的非空列数（一次向量化计算）
+    non_empty_counts = non_empty_mask(df, 0, HEADER_SEARCH_ROWS).sum(axis=1)
+    valid_rows = np.flatnonzero(non_empty_counts >= MIN_HEADER_COLS)
+    return int(valid_rows[0]) if len(valid_rows) else 0
 
 
 def get_header_mapping(df: pd.DataFrame, header_row: int) -> Dict[int, str]:
@@ -53,83 +107,323 @@ def get_header_mapping(df: pd.DataFrame, header_row: int) -> Dict[int, str]:
     return header_mapping
 
 
-def check_all_rules(df: pd.DataFrame, header_row: int) -> List[Tuple[int, int, str]]:
-    errors = []
-    skip_cols = set()
-
-    # 跳过列配置（不动）
-    if SKIP_FIRST_COL and df.shape[1] >= 1:
-        skip_cols.add(0)
-    if SKIP_ALL_EMPTY_COLS:
-        for col_idx in range(df.shape[1]):
-            if is_col_all_empty(df, col_idx):
-                skip_cols.add(col_idx)
+def resolve_rule_columns(df: pd.DataFrame, header_row: int) -> Dict[str, List[int]]:
+    """
+    解析各表级规则实际需要扫描的列（与各规则的字段匹配方式一致：日期规则全量匹配，其余模糊匹配）
+    :param df: 表格数据（只用到表头行）
+    :param header_row: 表头行索引
+    :return: {规则名: 列索引列表}
+    """
+    all_cols = list(range(df.shape[1]))
+    header_clean_to_col = build_header_clean_map(df, header_row)
 
-    # 1. 表头重复检查
-    header_duplicate_errors = check_duplicate_header(df, header_row)
-    errors.extend(header_duplicate_errors)
+    def match_keys(keys, exact=False):
+        cols = [match_config_col(header_clean_to_col, key, exact) for key in keys if key]
+        return sorted({col for col in cols if col is not None})
 
-    # 2. 数据行重复检查
-    row_duplicate_errors = check_duplicate_row(df, header_row)
-    errors.extend(row_duplicate_errors)
+    primary_slave_keys = []
+    for primary_keys_str, rule_config in PRIMARY_SLAVE_KEY_RULES.items():
+        primary_slave_keys.extend(primary_keys_str.split('|'))
+        if rule_config:
+            primary_slave_keys.extend(rule_config[0].replace('，', ',').split(','))
 
-    # 3. 主键从键唯一性检查
-    primary_slave_errors = check_primary_slave_duplicate(df, header_row)
-    errors.extend(primary_slave_errors)
+    encrypt_cols = []
+    for col_idx in all_cols:
+        header_val = df.iloc[header_row, col_idx]
+        if not pd.isna(header_val) and str(header_val).strip() in ENCRYPT_REQUIRED_FIELDS:
+            encrypt_cols.append(col_idx)
 
-    # 4. 关键字范围检查
-    field_range_errors = check_field_range(df, header_row)
-    errors.extend(field_range_errors)
+    return {
+        "check_header": all_cols,
+        "check_row": all_cols,
+        "check_primary_slave": match_keys(k.strip() for k in primary_slave_keys),
+        "check_key_scope": match_keys(FIELD_RANGE_RULES.keys()),
+        "check_field_length": match_keys(FIELD_LENGTH_RULES.keys()),
+        "check_field_enum": match_keys(k for k, v in FIELD_ENUM_RULES.items() if v),
+        "check_time_rule": match_keys((k for k, v in FIELD_DATE_RULES.items() if v), exact=True),
+        "check_sensitive_word": all_cols,
+        "check_encrypt": encrypt_cols,
+        "check_id_card": get_field_type_cols(df, header_row, '身份证号'),
+        "check_mobile": get_field_type_cols(df, header_row, '手机号'),
+        "check_postcode": get_field_type_cols(df, header_row, '邮政编码'),
+        "check_field_regex": match_keys(k for k, v in FIELD_REGEX_RULES.items() if v),
+        "check_float": sorted(col for col, field_type in get_header_mapping(df, header_row).items()
+                              if get_target_precision(field_type) is not None),
+        "check_null": all_cols,
+        "check_outlier": match_keys([k for k, v in OUTLIER_RULES.items() if v]
+                                    + [v.get("group_by") for v in OUTLIER_RULES.values() if v and v.get("group_by")]),
+        "check_time_series": sorted(set(match_keys((k for k, v in TIME_SERIES_RULES.items() if v), exact=True))
+                                    | set(match_keys(v.get("group_by") for v in TIME_SERIES_RULES.values()
+                                                     if v and v.get("group_by")))),
+        "check_cross_field": match_keys(field_key for rule in CROSS_FIELD_RULES.values()
+                                        for field_key, _ in rule.get("fields", {}).values()),
+        "check_reference": match_keys(k for k, v in REFERENCE_RULES.items() if v),
+        "check_pii": [col for col in all_cols if col not in encrypt_cols],
+    }
 
-    # 5. 字段长度检查
-    field_length_errors = check_field_length(df, header_row)
-    errors.extend(field_length_errors)
 
-    # 6. 枚举类型检查
-    field_enum_errors = check_field_enum(df, header_row)
-    errors.extend(field_enum_errors)
+def needs_full_read() -> bool:
+    """按配置判断是否必须完整读取（不需要读取文件）：启用了需要全部列的规则、未知的插件规则或开启列统计时为True"""
+    enabled = set(ENABLED_RULES)
+    return bool(enabled & FULL_READ_RULES) or not enabled <= TABLE_RULE_NAMES \
+        or COLUMN_PROFILE_CONFIG.get("enabled", False)
 
-    # 7. 时间格式检查
-    field_date_errors = check_field_date(df, header_row)
-    errors.extend(field_date_errors)
 
-    # 8. 敏感词检测
-    sensitive_errors = check_sensitive_word(df, header_row)
-    errors.extend(sensitive_errors)
+def plan_read_columns(header_df: pd.DataFrame, header_row: int):
+    """
+    按已启用的规则确定需要读取的列（表头规则只用到表头区域，不需要读取数据）
+    :param header_df: 表头区域（前HEADER_SEARCH_ROWS行）
+    :param header_row: 表头行索引
+    :return: 需要读取的列索引列表；必须完整读取时（见needs_full_read）返回None
+    """
+    if needs_full_read():
+        return None
+    enabled = set(ENABLED_RULES)
+    rule_cols = resolve_rule_columns(header_df, header_row)
+    cols = set()
+    for rule_name in enabled - HEADER_RULES:
+        cols.update(rule_cols.get(rule_name, []))
+    # 没有需要数据的列时仍读取第一列，保证行数与完整读取一致
+    return sorted(cols) or [0]
 
-    # 9. 字段加密检查
-    encrypt_errors = check_encrypt(df, header_row)
-    errors.extend(encrypt_errors)
 
-    # 10. 加载并执行其他规则（check_null/check_id_card/check_mobile等）
+def check_cell_rules(df: pd.DataFrame, header_row: int, skip_cols: set,
+                     rule_functions: Dict[str, Callable], budget: ErrorBudget = None,
+                     rule_seconds: Dict[str, float] = None) -> List[Tuple[int, int, str]]:
+    """
+    执行check_value插件规则（自定义规则）：每列的不同取值只校验一次，结果按行列顺序输出
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param skip_cols: 跳过检查的列索引
+    :param rule_functions: {规则名: check_value函数}
+    :param budget: 错误预算，为None时不限制
+    :param rule_seconds: 传入dict时按规则累计耗时（性能统计用），为None时不计时
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    errors = []
     header_mapping = get_header_mapping(df, header_row)
+    candidates = []  # (行号, 列号, 规则顺序, 规则名, 错误描述)
+    for col_idx in range(df.shape[1]):
+        if col_idx in skip_cols:
+            continue
+        # 表头匹配到字段类型的列按类型校验，其余列仅做通用校验
+        field_type = header_mapping.get(col_idx, "")
+        original_col = col_idx + 1
+        # 每个不同取值只校验一次，再映射回各行
+        codes, uniques = factorize_column(df, col_idx, header_row + 1)
+        for rule_order, (rule_name, rule_func) in enumerate(rule_functions.items()):
+            # 该规则在该列预算已用尽 → 跳过
+            if budget is not None and budget.is_exhausted(rule_name, original_col):
+                continue
+            start = time.perf_counter()
+            unique_results = [rule_func(cell_value, field_type) for cell_value in uniques]
+            if rule_seconds is not None:
+                rule_seconds[rule_name] = rule_seconds.get(rule_name, 0.0) + time.perf_counter() - start
+            positions = flagged_rows(codes, [is_error for is_error, _ in unique_results])
+            # 超出单列预算的异常不会被记录，只保留到触发超限的那一条
+            limit = budget.rule_limit(rule_name) if budget is not None else None
+            if limit is not None:
+                positions = positions[:limit + 1]
+            for idx in positions:
+                candidates.append((header_row + 2 + idx, original_col, rule_order, rule_name,
+                                   unique_results[codes[idx]][1]))
+
+    # 按行、列、规则顺序登记错误预算（与逐单元格扫描的顺序一致）
+    candidates.sort(key=lambda item: item[:3])
+    for original_row, original_col, _, rule_name, error_desc in candidates:
+        if budget is not None and budget.file_exhausted():
+            break
+        if budget is None or budget.allow(rule_name, original_row, original_col):
+            errors.append((original_row, original_col, error_desc))
+    return errors
+
+
+def check_all_rules(df: pd.DataFrame, header_row: int, budget: ErrorBudget = None,
+                    sampling: bool = None, metrics: FileMetrics = None,
+                    profile: TableProfile = None, summaries: list = None) -> List[Tuple[int, int, str]]:
+    """
+    执行所有校验规则
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算，为None时按config中的ERROR_BUDGET_CONFIG创建
+    :param sampling: 是否使用抽样模式，为None时按config中的SAMPLING_CONFIG决定
+    :param metrics: 性能统计（FileMetrics），传入时记录各规则耗时/扫描单元格数/内存峰值增量
+    :param profile: 列统计（TableProfile），传入时统计全表各列（抽样模式下也统计全部行），与规则共用分解结果
+    :param summaries: 传入list时追加统计信息（空值率、抽样估计等，格式同错误列表），统计信息不是异常，不计入错误列表和错误预算
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    if budget is None:
+        budget = ErrorBudget.from_config()
+    if sampling is None:
+        sampling = SAMPLING_CONFIG.get("enabled", False)
+    data_rows = df.shape[0] - header_row - 1
+    if profile is not None:
+        with measure(metrics, "column_profile(列统计)", max(data_rows, 0) * df.shape[1]):
+            profile.update(df, header_row)
+    if sampling and data_rows > SAMPLING_CONFIG.get("sample_size", 10000):
+        return check_all_rules_sampled(df, header_row, budget, metrics, summaries)
+
+    errors = []
+    rule_cols = resolve_rule_columns(df, header_row) if metrics is not None else {}
+
+    # 1~20. 表头重复、数据行重复、主键从键、关键字范围、字段长度、枚举、时间格式、敏感词、字段加密、身份证号、手机号、邮编、字段正则、小数精度、空值检查、统计离群值、时间序列、跨字段一致性、引用完整性、个人信息发现
+    for rule_name, rule_func in TABLE_RULES:
+        if rule_name not in ENABLED_RULES:
+            continue
+        if budget.file_exhausted():
+            break
+        with measure(metrics, rule_name, _scanned_cells(rule_name, rule_cols, data_rows)) as record:
+            rule_errors = rule_func(df, header_row, budget)
+            record["errors"] = len(rule_errors)
+        errors.extend(rule_errors)
+
+    # 21.字段为空检查
+    if not budget.file_exhausted():
+        with measure(metrics, "check_null(表头)", df.shape[1]) as record:
+            header_null_errors = check_header_null(df, header_row, budget)
+            record["errors"] = len(header_null_errors)
+        errors.extend(header_null_errors)
+
+    # 22. 各列空值率统计、脱敏格式统计（统计信息，不计入错误列表和错误预算）
+    if summaries is not None:
+        summaries.extend(collect_summaries(df, header_row, metrics))
+
+    # 23. 加载并执行其他插件规则（自定义的check_value规则）：整体记录一次（含内存），各规则累计耗时另行记录
     rule_functions = load_check_rules()
+    if rule_functions:
+        skip_cols = get_skip_cols(df)
+        cell_count = max(data_rows, 0) * (df.shape[1] - len(skip_cols))
+        rule_seconds = {} if metrics is not None else None
+        with measure(metrics, CELL_LOOP_NAME, cell_count) as record:
+            cell_errors = check_cell_rules(df, header_row, skip_cols, rule_functions, budget, rule_seconds)
+            record["errors"] = len(cell_errors)
+        errors.extend(cell_errors)
+        if metrics is not None:
+            for rule_name, seconds in rule_seconds.items():
+                metrics.add_rule(rule_name, seconds, cell_count)
 
-    # 11.字段为空检查
-    header_null_errors = check_header_null(df, header_row)
+    # 24. 预算超限提示
+    errors.extend(budget.summary_errors())
+    return errors
+
+
+def collect_summaries(df: pd.DataFrame, header_row: int, metrics: FileMetrics = None) -> List[Tuple[int, int, str]]:
+    """
+    全表统计信息：各列空值率（check_null启用时）、脱敏格式统计（check_encrypt启用且配置了ENCRYPT_MASK_RULES时）
+    抽样模式下同样按全部行统计
+    :return: 统计信息列表 [(行号, 列号, 描述)]
+    """
+    summaries = []
+    data_rows = max(df.shape[0] - header_row - 1, 0)
+    if "check_null" in ENABLED_RULES and NULL_PROFILE_CONFIG.get("enabled", True):
+        with measure(metrics, "check_null(空值率统计)", data_rows * df.shape[1]):
+            summaries.extend(null_profile(df, header_row, NULL_PROFILE_CONFIG.get("min_rate", 0.0)))
+    # 脱敏格式统计（配置了ENCRYPT_MASK_RULES模板的字段）
+    if "check_encrypt" in ENABLED_RULES and ENCRYPT_MASK_RULES:
+        with measure(metrics, "check_encrypt(脱敏格式统计)", data_rows * len(ENCRYPT_MASK_RULES)):
+            summaries.extend(encrypt_mask_summary(df, header_row))
+    return summaries
+
+
+def _scanned_cells(rule_name: str, rule_cols: Dict[str, List[int]], data_rows: int) -> int:
+    """估算规则扫描的单元格数：表头规则只扫描表头行，其余规则扫描匹配列的全部数据行"""
+    col_count = len(rule_cols.get(rule_name, []))
+    if rule_name in HEADER_RULES:
+        return col_count
+    return max(data_rows, 0) * col_count
+
+
+def check_all_rules_sampled(df: pd.DataFrame, header_row: int, budget: ErrorBudget = None,
+                            metrics: FileMetrics = None, summaries: list = None) -> List[Tuple[int, int, str]]:
+    """
+    抽样模式：表头规则全量执行，单元格级/列级规则仅在抽中的数据行上执行，输出各规则各列的违规率估计及置信区间
+    全表规则（重复行、主键从键）按SAMPLING_CONFIG["whole_table_rules"]全量精确执行或跳过，并在结果中标明
+    :param df: 表格数据
+    :param header_row: 表头行索引
+    :param budget: 错误预算（仅作用于全量执行的规则），为None时按config创建
+    :param metrics: 性能统计（FileMetrics），传入时记录抽样行数及各规则耗时（抽样执行的规则按样本行数计扫描单元格）
+    :param summaries: 传入list时，抽样说明、违规率估计及全表统计信息（空值率等）追加到其中，不计入错误列表；
+                      为None时抽样说明与违规率估计仍放在错误列表中
+    :return: 错误列表 [(行号, 列号, 错误描述)]
+    """
+    if budget is None:
+        budget = ErrorBudget.from_config()
+    errors = []
+    # 抽样说明与违规率估计（位置为表头下一行，不是具体单元格）
+    estimates = summaries if summaries is not None else errors
+    method = SAMPLING_CONFIG.get("method", "random")
+    confidence = SAMPLING_CONFIG.get("confidence", 0.95)
+    seed = SAMPLING_CONFIG.get("seed", 42)
+    run_whole_table = SAMPLING_CONFIG.get("whole_table_rules", "skip") == "exact"
+    summary_row = header_row + 1
+
+    # 1. 抽取数据行，构造抽样表格（保留表头及以上的行，行号在抽样表格中重新编号）
+    data_rows = df.shape[0] - header_row - 1
+    positions = select_sample_rows(
+        data_rows, SAMPLING_CONFIG.get("sample_size", 10000), method,
+        SAMPLING_CONFIG.get("chunk_size", 10000), seed,
+    )
+    sample_size = len(positions)
+    sample_df = df.iloc[np.r_[0:header_row + 1, positions + header_row + 1]].reset_index(drop=True)
+    method_desc = "分层抽样" if method == "stratified" else "随机抽样"
+    estimates.append((summary_row, 1,
+                      f"抽样模式：共{data_rows}行数据，{method_desc}{sample_size}行（随机种子{seed}），以下为违规率估计"))
+    if metrics is not None:
+        metrics.sampled = True
+        metrics.sample_size = sample_size
+    rule_cols = resolve_rule_columns(df, header_row) if metrics is not None else {}
+
+    # 2. 表头规则与全表规则（全量执行，结果精确）
+    rule_results = {}  # 规则名 → 抽样表格上的错误列表
+    for rule_name, rule_func in TABLE_RULES:
+        if rule_name not in ENABLED_RULES:
+            continue
+        if rule_name in HEADER_RULES or (rule_name in WHOLE_TABLE_RULES and run_whole_table):
+            if rule_name in WHOLE_TABLE_RULES:
+                estimates.append((summary_row, 1, f"抽样模式：{rule_name}为全表规则，已全量精确执行"))
+            with measure(metrics, rule_name, _scanned_cells(rule_name, rule_cols, data_rows)) as record:
+                rule_errors = rule_func(df, header_row, budget)
+                record["errors"] = len(rule_errors)
+            errors.extend(rule_errors)
+        elif rule_name in WHOLE_TABLE_RULES:
+            estimates.append((summary_row, 1, f"抽样模式：{rule_name}为全表规则，已跳过"))
+        else:
+            with measure(metrics, rule_name, _scanned_cells(rule_name, rule_cols, sample_size)) as record:
+                rule_results[rule_name] = rule_func(sample_df, header_row)
+                record["errors"] = len(rule_results[rule_name])
+    with measure(metrics, "check_null(表头)", df.shape[1]) as record:
+        header_null_errors = check_header_null(df, header_row, budget)
+        record["errors"] = len(header_null_errors)
     errors.extend(header_null_errors)
 
-    for row_idx in range(header_row + 1, df.shape[0]):
-        row_values = df.iloc[row_idx]
-        for col_idx in range(df.shape[1]):
-            if col_idx in skip_cols:
-                continue
+    # 3. 单元格级规则逐条执行，便于按规则统计
+    rule_functions = load_check_rules()
+    skip_cols = get_skip_cols(df) if rule_functions else set()
+    cell_count = sample_size * (df.shape[1] - len(skip_cols))
+    for rule_name, rule_func in rule_functions.items():
+        with measure(metrics, rule_name, cell_count) as record:
+            cell_errors = check_cell_rules(sample_df, header_row, skip_cols, {rule_name: rule_func})
+            record["errors"] = len(cell_errors)
+        rule_results.setdefault(rule_name, []).extend(cell_errors)
 
-            cell_value = str(row_values.iloc[col_idx]).strip() if not pd.isna(row_values.iloc[col_idx]) else ""
-            if col_idx in header_mapping:
-                field_type = header_mapping[col_idx]
-                for rule_name, rule_func in rule_functions.items():
-                    is_error, error_desc = rule_func(cell_value, field_type)
-                    if is_error:
-                        original_row = row_idx + 1
-                        original_col = col_idx + 1
-                        errors.append((original_row, original_col, error_desc))
-                continue
+    # 4. 按规则、列统计违规率，输出Wilson置信区间及全表违规数估计
+    for rule_name, rule_errors in rule_results.items():
+        col_counts = {}
+        for _, col, _ in rule_errors:
+            col_counts[col] = col_counts.get(col, 0) + 1
+        for col, count in sorted(col_counts.items()):
+            rate = count / sample_size
+            low, high = wilson_interval(count, sample_size, confidence)
+            estimates.append((summary_row, col,
+                              f"抽样估计：{rule_name}违规率{rate:.2%}（{confidence:.0%}置信区间{low:.2%}~{high:.2%}，"
+                              f"样本违规{count}/{sample_size}行，全表约{round(rate * data_rows)}处）"))
+    _, zero_high = wilson_interval(0, sample_size, confidence)
+    estimates.append((summary_row, 1,
+                      f"抽样模式：未列出的规则/列在样本中未发现违规，违规率上限约{zero_high:.2%}（{confidence:.0%}置信水平）"))
+
+    # 5. 全表统计信息（空值率、脱敏格式统计）
+    if summaries is not None:
+        summaries.extend(collect_summaries(df, header_row, metrics))
 
-            for rule_name, rule_func in rule_functions.items():
-                is_error, error_desc = rule_func(cell_value, "")
-                if is_error:
-                    original_row = row_idx + 1
-                    original_col = col_idx + 1
-                    errors.append((original_row, original_col, error_desc))
-    return errors
\ No newline at end of file
+    errors.extend(budget.summary_errors())
+    return errors
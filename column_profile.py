@@ -0,0 +1,188 @@
+import json
+import os
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from config import COLUMN_PROFILE_CONFIG
+from sketches import HyperLogLog, SpaceSaving, TDigest
+from utils import factorize_column, special_value_desc
+
+# 长度分布：0~MAX_EXACT_LENGTH逐个长度计数，更长的合并为一档，内存固定
+MAX_EXACT_LENGTH = 64
+
+
+class ColumnProfile:
+    """
+    单列统计：空值率、近似不同取值数（HyperLogLog）、高频取值（Space-Saving）、文本最小/最大值、长度分布、
+    数值分位数（t-digest）。所有状态大小固定，同名列的统计可跨文件合并
+    """
+
+    def __init__(self, name: str, precision: int = 12, capacity: int = 50, compression: int = 100):
+        self.name = name
+        self.rows = 0
+        self.null_count = 0
+        self.text_min = None
+        self.text_max = None
+        self.lengths = np.zeros(MAX_EXACT_LENGTH + 2, dtype=np.int64)
+        self.distinct = HyperLogLog(precision)
+        self.top_values = SpaceSaving(capacity)
+        self.numeric = TDigest(compression)
+
+    def update(self, codes: np.ndarray, uniques: np.ndarray) -> None:
+        """加入一列数据（factorize结果：不同取值及每行对应的下标），每个不同取值只处理一次"""
+        counts = np.bincount(codes, minlength=len(uniques))
+        self.rows += int(counts.sum())
+        is_null = np.fromiter((bool(special_value_desc(v)) for v in uniques), dtype=bool, count=len(uniques))
+        self.null_count += int(counts[is_null].sum())
+        values, counts = uniques[~is_null], counts[~is_null]
+        if len(values) == 0:
+            return
+
+        self.distinct.add_many(values)
+        self.top_values.add_counts(values, counts)
+        text_min, text_max = min(values), max(values)
+        self.text_min = text_min if self.text_min is None else min(self.text_min, text_min)
+        self.text_max = text_max if self.text_max is None else max(self.text_max, text_max)
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+        self.lengths += np.bincount(np.minimum(lengths, MAX_EXACT_LENGTH + 1), weights=counts,
+                                    minlength=len(self.lengths)).astype(np.int64)
+        numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+        is_number = ~np.isnan(numbers)
+        if is_number.any():
+            self.numeric.add_many(numbers[is_number], counts[is_number])
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self.rows += other.rows
+        self.null_count += other.null_count
+        for attr, pick in (("text_min", min), ("text_max", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        self.lengths += other.lengths
+        self.distinct.merge(other.distinct)
+        self.top_values.merge(other.top_values)
+        self.numeric.merge(other.numeric)
+
+    def to_dict(self, top_k: int = 10, quantiles: List[float] = (0.01, 0.25, 0.5, 0.75, 0.99),
+                include_sketch: bool = True) -> Dict:
+        """统计结果（便于阅读的部分）+ sketch状态（用于后续合并，include_sketch为False时不输出）"""
+        length_histogram = {str(length): int(n) for length, n in enumerate(self.lengths[:-1]) if n}
+        if self.lengths[-1]:
+            length_histogram[f">{MAX_EXACT_LENGTH}"] = int(self.lengths[-1])
+        numeric_count = int(self.numeric.count())
+        numeric = None
+        if numeric_count:
+            numeric = {
+                "count": numeric_count,
+                "min": self.numeric.min,
+                "max": self.numeric.max,
+                "quantiles": {f"p{round(q * 100):02d}": self.numeric.quantile(q) for q in quantiles},
+            }
+        result = {
+            "rows": self.rows,
+            "null_count": self.null_count,
+            "null_rate": round(self.null_count / self.rows, 6) if self.rows else 0.0,
+            "distinct_estimate": self.distinct.estimate() if self.rows > self.null_count else 0,
+            "top_values": [[value, count] for value, count in self.top_values.top(top_k)],
+            "min": self.text_min,
+            "max": self.text_max,
+            "length_histogram": length_histogram,
+            "numeric": numeric,
+        }
+        if include_sketch:
+            result["sketch"] = {
+                "lengths": self.lengths.tolist(),
+                "hll": self.distinct.to_dict(),
+                "top_values": self.top_values.to_dict(),
+                "tdigest": self.numeric.to_dict(),
+            }
+        return result
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict) -> "ColumnProfile":
+        sketch = data["sketch"]
+        profile = cls(name)
+        profile.rows = data["rows"]
+        profile.null_count = data["null_count"]
+        profile.text_min, profile.text_max = data["min"], data["max"]
+        profile.lengths = np.asarray(sketch["lengths"], dtype=np.int64)
+        profile.distinct = HyperLogLog.from_dict(sketch["hll"])
+        profile.top_values = SpaceSaving.from_dict(sketch["top_values"])
+        profile.numeric = TDigest.from_dict(sketch["tdigest"])
+        return profile
+
+
+class TableProfile:
+    """一个或多个文件的列统计，按表头名称对应各列（多个文件合并时同名列合并）"""
+
+    def __init__(self, files: List[str] = None, config: Dict = None):
+        self.config = dict(COLUMN_PROFILE_CONFIG, **(config or {}))
+        self.files = list(files or [])
+        self.columns = {}  # 表头名称 → ColumnProfile
+
+    def new_column(self, name: str) -> ColumnProfile:
+        return ColumnProfile(name, self.config.get("hll_precision", 12), self.config.get("capacity", 50),
+                             self.config.get("compression", 100))
+
+    def update(self, df: pd.DataFrame, header_row: int) -> None:
+        """统计表格各列（表头为空的列跳过，重名列加列号区分），与规则共用同一份factorize结果"""
+        for col_idx in range(df.shape[1]):
+            header_val = df.iloc[header_row, col_idx]
+            name = str(header_val).strip() if not pd.isna(header_val) else ""
+            if not name:
+                continue
+            if name in self.columns:
+                name = f"{name}（列{col_idx + 1}）"
+            column = self.columns.setdefault(name, self.new_column(name))
+            column.update(*factorize_column(df, col_idx, header_row + 1))
+
+    def merge(self, other: "TableProfile") -> None:
+        self.files.extend(other.files)
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                merged = self.new_column(name)
+                merged.merge(column)
+                self.columns[name] = merged
+
+    def to_dict(self, include_sketch: bool = True) -> Dict:
+        top_k = self.config.get("top_k", 10)
+        quantiles = self.config.get("quantiles", [0.01, 0.25, 0.5, 0.75, 0.99])
+        return {
+            "files": self.files,
+            "columns": {name: column.to_dict(top_k, quantiles, include_sketch)
+                        for name, column in self.columns.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, config: Dict = None) -> "TableProfile":
+        profile = cls(data["files"], config)
+        profile.columns = {name: ColumnProfile.from_dict(name, column) for name, column in data["columns"].items()}
+        return profile
+
+
+class ProfileCollector:
+    """
+    一次运行的列统计：每个文件检查完成后立即并入所在文件夹的统计，文件只保留统计结果（不保留摘要状态），
+    内存占用与文件夹数相关而与文件数无关
+    """
+
+    def __init__(self):
+        self.files = {}    # 文件路径 → 统计结果（不含sketch）
+        self.folders = {}  # 文件夹 → 合并后的TableProfile
+
+    def add(self, file_path: str, profile: TableProfile) -> None:
+        self.files[file_path] = profile.to_dict(include_sketch=False)
+        folder = os.path.dirname(file_path)
+        self.folders.setdefault(folder, TableProfile(config=profile.config)).merge(profile)
+
+    def __len__(self):
+        return len(self.files)
+
+    def write(self, output_file: str) -> None:
+        """写入列统计文件：每个文件一份统计结果，每个文件夹一份合并后的统计（含sketch，可继续合并）"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "files": self.files,
+                "folders": {folder: profile.to_dict() for folder, profile in self.folders.items()},
+            }, f, ensure_ascii=False, indent=2, default=str)
@@ -36,6 +36,12 @@ ENABLED_RULES = [
     "check_field_enum",     # 检查枚举类型字段内容，值域范围，如性别  男或女或保密
     "check_time_rule",      # 检查时间类型字段是符合内容 （准确性-数据格式合规性）
     "check_encrypt",        # 检查字段是否进行脱敏 （规范性-安全规范性）
+    "check_field_regex",    # 按正则检查字段格式 （准确性-数据格式合规性）
+    "check_outlier",        # 数值字段按分组检查统计离群值，如各监测点的风速 （准确性-脏数据）
+    "check_time_series",    # 按分组检查时间序列乱序、重复时间、时间缺口 （完整性-数据记录完整性）
+    "check_cross_field",    # 跨字段一致性检查，如年龄与身份证号出生日期 （准确性-数据一致性）
+    "check_reference",      # 引用完整性检查，如设备号需存在于设备档案中 （准确性-数据一致性）
+    "check_pii",            # 个人信息发现，备注等未配置脱敏的列中出现未脱敏的身份证号/手机号等 （规范性-安全规范性）
 
 ]
 
@@ -89,20 +95,160 @@ FIELD_DATE_RULES = {
     "时间": ["%Y-%m-%d"],               # 仅支持YYYY-MM-DD年-月-日
 }
 
+# 字段正则校验规则（字段关键词: 正则或正则列表），单元格需完整匹配其中任一正则，空值跳过
+# 新增格式检查只需在此添加配置，无需新建规则文件
+FIELD_REGEX_RULES = {
+    # "单位内编号": [r"[A-Z][0-9]{7}"],             # 1位大写字母+7位数字，如A0000001
+    # "车牌号": [r"[\u4e00-\u9fa5][A-Z][A-Z0-9]{5}", r"[\u4e00-\u9fa5][A-Z][A-Z0-9]{6}"],  # 普通/新能源车牌
+}
+
+# 统计离群值检查（字段关键词: 配置），按分组字段分组后在组内判断，不需要事先确定固定范围
+# method: "mad" 稳健Z分数，偏离组中位数超过 threshold 倍稳健标准差（MAD/0.6745）为离群，常用3.5
+#         "iqr" 四分位距，小于 Q1-threshold×IQR 或大于 Q3+threshold×IQR 为离群，常用1.5（极端值用3）
+# group_by 为空时整列作为一组；组内有效数值少于 min_group_size 时不判断
+OUTLIER_RULES = {
+    '风速（单位:m/s）': {"group_by": "监测点", "method": "mad", "threshold": 3.5, "min_group_size": 10},
+    '温度': {"group_by": "监测点", "method": "iqr", "threshold": 1.5, "min_group_size": 10},
+}
+
+# 时间序列连续性检查（时间字段: 配置），时间字段全量匹配，按分组字段（如监测点）分组后检查
+# formats 时间格式列表，不写时使用FIELD_DATE_RULES中该字段的格式，都没有时自动识别；无法解析的时间不参与检查
+# check_order 组内时间早于前面行的时间为乱序；check_duplicate 组内时间相同为重复
+# max_gap 组内按时间排序后相邻两条间隔超过该值为缺口，如 "1h"、"30min"、"1D"，None=不检查
+TIME_SERIES_RULES = {
+    '测试时间': {"group_by": "监测点", "check_order": True, "check_duplicate": True, "max_gap": None},
+}
+
+# 跨字段一致性检查（规则名: 配置），表达式对整张表一次计算，结果为False的行在每个字段单元格上报告
+# fields: {表达式中的名称: (字段关键词, 字段类型)}，字段模糊匹配，任一字段未匹配时跳过该规则
+#   字段类型：text 文本，number 数值，date 日期（按FIELD_DATE_RULES中的格式解析），
+#            id_birth 身份证号中的出生日期，id_age 按身份证号出生日期计算的当前周岁
+# expr: 需要成立的条件（pandas表达式），可用 比较运算、+ - * /、abs()、&（且）、|（或）、~（非）
+# 任一字段为空或无法转换的行不参与判断
+CROSS_FIELD_RULES = {
+    "年龄与身份证号一致": {
+        "fields": {"年龄": ("年龄", "number"), "身份证年龄": ("身份证号", "id_age")},
+        "expr": "abs(年龄 - 身份证年龄) <= 1",
+        "message": "年龄与身份证号出生日期推算的周岁相差不超过1岁",
+    },
+    "测试时间不晚于检定时间": {
+        "fields": {"测试时间": ("测试时间", "date"), "检定时间": ("检定时间", "date")},
+        "expr": "测试时间 <= 检定时间",
+    },
+}
+
+# 引用完整性检查（字段关键词: 参照数据），字段取值需存在于参照数据中，空值跳过
+# source: 参照文件（相对路径按项目根目录），txt每行一个值；表格文件读取 column 列（模糊匹配，不写时与字段关键词相同）
+# values: 直接列出允许的取值（与source二选一）
+REFERENCE_RULES = {
+    # "设备号": {"source": os.path.join("data", "设备档案.xlsx"), "column": "设备号"},
+    # "机构名称": {"source": os.path.join("data", "机构名单.txt")},
+    # "监测点": {"values": ["P1", "P2"]},
+}
+
+# 参照数据缓存：同一次运行中每个参照文件只读取一次；persist=True时同时保存到cache_dir，
+# 下次运行时参照文件的修改时间和大小都未变化则直接使用缓存
+REFERENCE_CACHE_CONFIG = {
+    "persist": True,
+    "cache_dir": ".reference_cache",
+}
+
 # 检查字段是否进行脱敏 （规范性-安全规范性）
 ENCRYPT_REQUIRED_FIELDS = [
     "身份证号",    # 需要加密的字段名1
     "手机号"       # 需要加密的字段名2
 ]
 
+# 个人信息发现：扫描ENCRYPT_REQUIRED_FIELDS以外的列，查找未脱敏的个人信息
+# types: id_card 身份证号（需通过校验码校验），mobile 手机号，bank_card 银行卡号（需通过Luhn校验），email 邮箱
+# exclude_fields: 不扫描的字段（表头完全一致），如允许出现联系方式的列
+PII_SCAN_CONFIG = {
+    "types": ["id_card", "mobile", "bank_card", "email"],
+    "exclude_fields": [],
+}
+
 #脱敏规则
 ENCRYPT_CONFIG = {
     "min_star_count": 1,  # 至少包含1个 *
     "ignore_empty": True  # 空值跳过检查，无需修改
 }
 
+# 脱敏模板（字段名: 模板），字段名与ENCRYPT_REQUIRED_FIELDS一致；未配置模板的字段只检查*的个数
+# keep_head 保留前N位明文，keep_tail 保留后N位明文，中间全部为*；length 总长度（不写时不限制*的个数）
+ENCRYPT_MASK_RULES = {
+    "身份证号": {"keep_head": 6, "keep_tail": 4, "length": 18},   # 如 110101********001X
+    "手机号": {"keep_head": 3, "keep_tail": 4, "length": 11},     # 3-4-4，如 138****8000
+}
+
 SENSITIVE_CONFIG = {
-    "sensitive_file_rel_path": "data\keywords.txt"  # 敏感词文件相对路径
+    "sensitive_file_rel_path": os.path.join("data", "keywords.txt"),  # 敏感词文件相对路径（兼容Windows/Linux）
+    # 匹配时跳过的噪声字符（如“法*轮*功”“法 轮 功”），为空时不跳过；全角字符先转为半角再判断；两侧均为英文字母/数字时不跨越
+    "noise_chars": " \t\r\n*_-.,·、。…|/\\~!?#$%^&+=\"'`\u200b\u200c\u200d\ufeff",
+    "ignore_words": [],  # 敏感词文件中不检测的词（按归一化后的形式比较，如"Ｂ"与"b"相同），加载时输出跳过的词
+    "use_opencc": True,  # 已安装opencc（pip install opencc-python-reimplemented）时用其做繁体→简体转换，未安装时使用内置常用字对照表
+    "skip_typed_columns": True,  # 按列类型推断跳过数值/日期/编号列（全部取值为数字、日期或不含中文的编号），只检测含自由文本的列
+    "include_fields": [],  # 始终检测的字段（表头完全一致），不按列类型跳过
+    "exclude_fields": [],  # 不检测的字段（表头完全一致）
+}
+
+# 读取方式：raw_text=全部单元格按文本读取（手机号不会变成15350750002.0，日期按显示形态），infer=由pandas推断类型（原有方式）
+READ_CONFIG = {
+    "mode": "raw_text",
+    "string_storage": "python",  # 文本列存储：python=string[python]（默认），pyarrow=string[pyarrow]（可选，需pip install pyarrow，内存明显减小，未安装时提示并使用python），object=普通object列
+    "column_projection": True,    # 按列读取（仅raw_text）：先读表头区域，只读取已启用规则需要的列；启用重复行/敏感词/空值等需要全部列的规则时自动完整读取
+}
+
+# 空值率统计：检查结果中为每列输出空值/特殊字符占比（check_null启用时）
+NULL_PROFILE_CONFIG = {
+    "enabled": True,
+    "min_rate": 0.0,              # 只输出空值率不低于该值的列（0=有空值的列都输出）
+}
+
+# 列统计（与规则检查共用同一次读取和分解结果）：每列的空值率、近似不同取值数、高频取值、最小/最大值、长度分布、数值分位数
+# 结果保存到检查结果旁的「检查结果名_column_profile.json」：每个文件一份，每个文件夹一份合并后的统计
+COLUMN_PROFILE_CONFIG = {
+    "enabled": False,             # 开启后需要完整读取（按列读取不生效），按需开启
+    "hll_precision": 12,          # 不同取值数估计的寄存器位数（12=4096个寄存器，误差约1.6%）
+    "capacity": 50,               # 高频取值摘要保留的计数器个数
+    "top_k": 10,                  # 输出前N个高频取值
+    "compression": 100,           # 数值分位数摘要的压缩参数（质心数约为该值）
+    "quantiles": [0.01, 0.25, 0.5, 0.75, 0.99],
+}
+
+# 错误预算：表头识别错误等情况下避免每个单元格都报错，超出上限后停止扫描（None=不限制）
+ERROR_BUDGET_CONFIG = {
+    "per_rule": 1000,      # 单个规则在单列上最多记录的异常数，超出后停止扫描该列
+    "per_file": 20000,     # 单个文件最多记录的异常数，超出后停止该文件的后续检查
+    "rule_overrides": {    # 按规则单独配置单列上限（规则名: 上限）
+        # "check_sensitive_word": 200,
+    },
+}
+
+# 抽样模式：超大表格初筛时只抽取部分数据行检查，输出各规则各列的违规率估计（enabled=False 时全量检查）
+SAMPLING_CONFIG = {
+    "enabled": False,
+    "method": "random",           # random=简单随机抽样，stratified=按数据块分层抽样
+    "sample_size": 10000,         # 抽样行数（数据行不超过该值时仍全量检查）
+    "chunk_size": 10000,          # 分层抽样时每块行数
+    "seed": 42,                   # 随机种子，保证结果可复现
+    "confidence": 0.95,           # 置信区间的置信水平
+    "whole_table_rules": "skip",  # 全表规则（重复行/主键从键）：skip=跳过，exact=全量精确执行
+}
+
+# 性能统计：记录每个文件的读取耗时及各规则耗时、扫描单元格数、吞吐量，写入检查结果同名的_metrics.json
+METRICS_CONFIG = {
+    "enabled": True,
+    "trace_memory": False,        # 统计各规则内存峰值增量（使用tracemalloc，开启后检查耗时明显增加）
+    "report_summary": False,      # 是否在检查结果txt中为每个文件输出性能统计块
+}
+
+# 性能分析（cProfile，可选tracemalloc）：也可通过命令行 --profile / --profile-threshold 开启
+# 分析结果保存到检查结果旁的「检查结果名_profiles」文件夹：每个文件一个 .pstats 和 _alloc.txt
+PROFILE_CONFIG = {
+    "enabled": False,
+    "threshold_seconds": 0,       # 只保留处理耗时超过该秒数的文件的分析结果（0=全部保留）
+    "top_n": 20,                  # 内存分配统计输出前N项
+    "trace_memory": None,         # 是否同时用tracemalloc做内存分析（明显拖慢检查）；None=未设阈值时开启，设置阈值时关闭
 }
 
 # 辅助：获取项目根目录（用于解析相对路径）
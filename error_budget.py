@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional, Tuple
+from config import ERROR_BUDGET_CONFIG
+
+
+class ErrorBudget:
+    """
+    单文件错误预算：限制单个规则在单列上、以及整个文件累计记录的异常数
+    预算用尽后，对应规则停止扫描该列（或整个文件停止后续检查），并记录"预算超限"提示
+    """
+
+    def __init__(self, per_rule: Optional[int] = None, per_file: Optional[int] = None,
+                 rule_overrides: Optional[Dict[str, int]] = None):
+        self.per_rule = per_rule
+        self.per_file = per_file
+        self.rule_overrides = rule_overrides or {}
+        self.rule_counts = {}        # (规则名, 列号) → 已记录异常数
+        self.file_count = 0          # 本文件已记录异常数
+        self.exceeded_rules = {}     # (规则名, 列号) → 触发超限的行号
+        self.exceeded_file_row = None  # 触发文件级超限的行号
+
+    @classmethod
+    def from_config(cls) -> "ErrorBudget":
+        """按config中的ERROR_BUDGET_CONFIG创建预算"""
+        return cls(
+            per_rule=ERROR_BUDGET_CONFIG.get("per_rule"),
+            per_file=ERROR_BUDGET_CONFIG.get("per_file"),
+            rule_overrides=ERROR_BUDGET_CONFIG.get("rule_overrides"),
+        )
+
+    def rule_limit(self, rule_name: str) -> Optional[int]:
+        """获取规则的单列上限（优先使用按规则单独配置的值）"""
+        return self.rule_overrides.get(rule_name, self.per_rule)
+
+    def file_exhausted(self) -> bool:
+        """整个文件的预算是否已用尽"""
+        return self.exceeded_file_row is not None
+
+    def is_exhausted(self, rule_name: str, col: int) -> bool:
+        """规则在该列（Excel列号）的预算是否已用尽（文件预算用尽时同样返回True）"""
+        return self.file_exhausted() or (rule_name, col) in self.exceeded_rules
+
+    def allow(self, rule_name: str, row: int, col: int) -> bool:
+        """
+        登记一条异常，判断是否仍在预算内
+        :param rule_name: 规则名（与ENABLED_RULES中的名称一致）
+        :param row: Excel行号
+        :param col: Excel列号
+        :return: True=在预算内，应记录该异常；False=预算已超限，调用方应丢弃该异常并停止扫描该列（或整个文件）
+        """
+        if self.is_exhausted(rule_name, col):
+            return False
+        key = (rule_name, col)
+        limit = self.rule_limit(rule_name)
+        if limit is not None and self.rule_counts.get(key, 0) >= limit:
+            self.exceeded_rules[key] = row
+            return False
+        if self.per_file is not None and self.file_count >= self.per_file:
+            self.exceeded_file_row = row
+            return False
+        self.rule_counts[key] = self.rule_counts.get(key, 0) + 1
+        self.file_count += 1
+        return True
+
+    def summary_errors(self) -> List[Tuple[int, int, str]]:
+        """
+        生成预算超限提示（与其他规则相同的错误格式）
+        :return: 错误列表 [(行号, 列号, 错误描述)]
+        """
+        errors = []
+        for (rule_name, col), row in self.exceeded_rules.items():
+            count = self.rule_counts.get((rule_name, col), 0)  # 上限为0时该列没有登记过异常
+            errors.append(
+                (row, col, f"错误预算超限：{rule_name}在该列已发现{count}+处异常，已停止扫描该列")
+            )
+        if self.exceeded_file_row is not None:
+            errors.append(
+                (self.exceeded_file_row, 1,
+                 f"错误预算超限：本文件已发现{self.file_count}+处异常，已停止后续检查")
+            )
+        return errors
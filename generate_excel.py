@@ -6,10 +6,16 @@ import pandas as pd
 def txt_to_excel(txt_path):
     """
     自动识别所有类型的错误标识，将txt文件内容按错误类型分类写入Excel
+    「ℹ️ 统计信息」部分（空值率、脱敏格式等）不是错误类型，单独写入「统计信息」工作表
     :param txt_path: txt文件的路径
     """
     # 初始化字典存储不同错误类型的内容
     error_data = {}
+    # 统计信息：[(文件路径, 统计行)]
+    summary_rows = []
+    current_file = ""
+    in_summary = False
+    file_pattern = re.compile(r'^=+ \S+：(.*?) =+$')
 
     # 正则表达式：匹配"行X 列X："之后、第一个"："之前的错误类型
     # 匹配规则：
@@ -35,6 +41,21 @@ def txt_to_excel(txt_path):
         if not clean_line:  # 跳过空行
             continue
 
+        # 文件标题行结束上一个文件的统计信息部分；统计信息部分的行不按错误类型分类
+        file_match = file_pattern.match(clean_line)
+        if file_match:
+            current_file = file_match.group(1)
+            in_summary = False
+            continue
+        if clean_line.startswith("ℹ️ 统计信息"):
+            in_summary = True
+            continue
+        if in_summary:
+            if pattern.search(clean_line):
+                summary_rows.append((current_file, clean_line))
+                continue
+            in_summary = False
+
         # 使用正则表达式提取错误类型
         match = pattern.search(clean_line)
         if match:
@@ -46,13 +67,13 @@ def txt_to_excel(txt_path):
             # 将当前行添加到对应错误类型的列表中
             error_data[error_type].append(clean_line)
 
-    # 若未识别到任何错误类型，给出提示并退出
-    if not error_data:
+    # 若未识别到任何错误类型和统计信息，给出提示并退出
+    if not error_data and not summary_rows:
         print("未识别到任何错误类型，请检查txt文件内容格式")
         return
 
     # 找出最长的列表长度，用于补全其他列表（保证Excel列长度一致）
-    max_len = max(len(v) for v in error_data.values())
+    max_len = max((len(v) for v in error_data.values()), default=0)
 
     # 补全每个列表到相同长度（空值填充）
     for key in error_data:
@@ -65,9 +86,12 @@ def txt_to_excel(txt_path):
     # 生成Excel文件名（与txt同名，后缀改为xlsx）
     excel_path = os.path.splitext(txt_path)[0] + '.xlsx'
 
-    # 写入Excel文件
+    # 写入Excel文件（错误在第一个工作表，统计信息在「统计信息」工作表）
     try:
-        df.to_excel(excel_path, index=False, engine='openpyxl')
+        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False)
+            if summary_rows:
+                pd.DataFrame(summary_rows, columns=["文件", "统计信息"]).to_excel(writer, sheet_name="统计信息", index=False)
         print(f"Excel文件已生成：{excel_path}")
         print(f"自动识别的错误类型（表头）：{list(error_data.keys())}")
     except Exception as e:
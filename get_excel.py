@@ -1,7 +1,9 @@
 import pandas as pd
 import xlrd  # 直接用xlrd原生接口
 import os
-from config import SUPPORTED_FORMATS
+from datetime import datetime, date, time, timedelta
+from typing import List, Optional
+from config import SUPPORTED_FORMATS, READ_CONFIG
 
 def read_xls_file_raw(file_path: str) -> pd.DataFrame:
     """用xlrd原生接口读取.xls文件，绕过pandas的版本校验（新增HTML伪Excel兼容）"""
@@ -37,11 +39,215 @@ def read_xls_file_raw(file_path: str) -> pd.DataFrame:
             raise Exception(f"xlrd原生读取失败：{str(e)}")
 
 
+def format_cell_text(value):
+    """
+    将openpyxl/xlrd读出的单元格存储值转为文本（不套用单元格的number_format，如0.5不会显示为50%、1234不会显示为1,234）
+    整数值的数字不带.0（手机号15350750002而非15350750002.0），其余浮点数为repr（最短的可还原表示，如0.1），
+    日期无时间部分时只保留日期，空单元格返回None
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return repr(value)
+    if isinstance(value, datetime):
+        if value.time() == time(0, 0):
+            return value.strftime('%Y-%m-%d')
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, time):
+        return value.strftime('%H:%M:%S')
+    if isinstance(value, timedelta):
+        return str(value)
+    return str(value)
+
+
+# 已提示过pyarrow未安装（每次运行只提示一次）
+_PYARROW_FALLBACK_WARNED = False
+
+
+def to_string_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将全部为文本（或None/NaN）的DataFrame转为pandas字符串类型存储（缺失值为pd.NA）
+    READ_CONFIG中string_storage为pyarrow且已安装pyarrow时使用string[pyarrow]（内存更小），否则使用string[python]
+    配置了pyarrow但未安装时只提示一次
+    """
+    global _PYARROW_FALLBACK_WARNED
+    storage = READ_CONFIG.get("string_storage", "python")
+    if storage == "object":
+        return df
+    if storage == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            if not _PYARROW_FALLBACK_WARNED:
+                print("⚠️  READ_CONFIG['string_storage']为pyarrow但未安装pyarrow（pip install pyarrow），"
+                      "文本列改用string[python]存储，内存不会减小")
+                _PYARROW_FALLBACK_WARNED = True
+            storage = "python"
+    return df.astype(pd.StringDtype(storage))
+
+
+def read_xlsx_file_text(file_path: str, usecols: Optional[List[int]] = None,
+                        nrows: Optional[int] = None) -> pd.DataFrame:
+    """
+    用openpyxl只读模式按文本读取.xlsx文件（公式取计算结果，流式读取）
+    :param usecols: 只读取的列索引（从0开始），为None时读取全部列，结果的列名为原始列索引
+    :param nrows: 只读取前nrows行，为None时读取全部行
+    """
+    import openpyxl
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        if usecols is None:
+            rows = sheet.iter_rows(max_row=nrows, values_only=True)
+            data = [[format_cell_text(value) for value in row] for row in rows]
+        else:
+            # 只解析所需列的范围，再取出所需列
+            min_col = min(usecols)
+            rows = sheet.iter_rows(min_col=min_col + 1, max_col=max(usecols) + 1, max_row=nrows, values_only=True)
+            offsets = [col - min_col for col in usecols]
+            data = [[format_cell_text(row[i]) if i < len(row) else None for i in offsets] for row in rows]
+    finally:
+        workbook.close()
+    if usecols is not None:
+        return pd.DataFrame(data, columns=usecols)
+    # 只读模式下各行长度可能不同，按最长行补齐
+    width = max((len(row) for row in data), default=0)
+    return pd.DataFrame([row + [None] * (width - len(row)) for row in data])
+
+
+def _xls_cell_text(cell_type, cell_value, datemode):
+    """按xlrd单元格类型转为文本（空单元格返回None）"""
+    if cell_type in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return None
+    if cell_type == xlrd.XL_CELL_DATE:
+        try:
+            return format_cell_text(xlrd.xldate_as_datetime(cell_value, datemode))
+        except Exception:
+            return format_cell_text(cell_value)
+    if cell_type == xlrd.XL_CELL_BOOLEAN:
+        return format_cell_text(bool(cell_value))
+    if cell_type == xlrd.XL_CELL_ERROR:
+        return xlrd.error_text_from_code.get(cell_value, str(cell_value))
+    return format_cell_text(cell_value)
+
+
+def read_xls_file_text(file_path: str, usecols: Optional[List[int]] = None,
+                       nrows: Optional[int] = None) -> pd.DataFrame:
+    """
+    用xlrd原生接口按文本读取.xls文件（HTML伪Excel同样按文本读取）
+    :param usecols: 只读取的列索引（按列读取），为None时读取全部列，结果的列名为原始列索引
+    :param nrows: 只读取前nrows行，为None时读取全部行
+    """
+    try:
+        workbook = xlrd.open_workbook(file_path, on_demand=True)
+    except Exception as e:
+        if "Expected BOF record" in str(e):
+            # 复用原有的HTML伪Excel兼容逻辑
+            df = read_xls_file_raw(file_path).apply(lambda col: col.map(format_cell_text))
+            if nrows is not None:
+                df = df.iloc[:nrows]
+            return df if usecols is None else df.reindex(columns=usecols)
+        raise Exception(f"xlrd原生读取失败：{str(e)}")
+
+    try:
+        sheet = workbook.sheet_by_index(0)
+        row_count = sheet.nrows if nrows is None else min(nrows, sheet.nrows)
+        cols = range(sheet.ncols) if usecols is None else usecols
+        columns = {}
+        for col_idx in cols:
+            if col_idx >= sheet.ncols:
+                columns[col_idx] = [None] * row_count
+                continue
+            types = sheet.col_types(col_idx, end_rowx=row_count)
+            values = sheet.col_values(col_idx, end_rowx=row_count)
+            columns[col_idx] = [_xls_cell_text(t, v, workbook.datemode) for t, v in zip(types, values)]
+    finally:
+        workbook.release_resources()
+    return pd.DataFrame(columns, index=range(row_count), columns=list(cols))
+
+
+def read_csv_file_text(file_path: str, usecols: Optional[List[int]] = None,
+                       nrows: Optional[int] = None) -> pd.DataFrame:
+    """按文本读取.csv文件：不做类型推断，只有空单元格视为缺失值（null、NA等保留为文本）"""
+    options = dict(header=None, dtype=str, keep_default_na=False, na_values=[''], usecols=usecols, nrows=nrows)
+    try:
+        return pd.read_csv(file_path, encoding='utf-8-sig', **options)
+    except UnicodeDecodeError:
+        return pd.read_csv(file_path, encoding='gbk', **options)
+
+
+def read_table_file_text(file_path: str, usecols: Optional[List[int]] = None,
+                         nrows: Optional[int] = None) -> pd.DataFrame:
+    """
+    按文本读取.xlsx/.xls/.csv（所有单元格为字符串或缺失值），并转为字符串类型存储
+    :param usecols: 只读取的列索引（从0开始），为None时读取全部列
+    :param nrows: 只读取前nrows行（如只读表头区域），为None时读取全部行
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.xlsx':
+        df = read_xlsx_file_text(file_path, usecols, nrows)
+    elif file_ext == '.xls':
+        df = read_xls_file_text(file_path, usecols, nrows)
+    elif file_ext == '.csv':
+        df = read_csv_file_text(file_path, usecols, nrows)
+    else:
+        raise ValueError(f"不支持的文件格式：{file_ext}")
+    return to_string_frame(df)
+
+
+def read_table_header(file_path: str, nrows: int) -> pd.DataFrame:
+    """只读取前nrows行（表头区域，按文本），其余行不解析"""
+    try:
+        return read_table_file_text(file_path, nrows=nrows)
+    except PermissionError:
+        raise Exception("权限拒绝：文件被占用/无读取权限")
+    except Exception as e:
+        raise Exception(f"读取失败：{str(e)}")
+
+
+def read_table_columns(file_path: str, header_df: pd.DataFrame, usecols: List[int]) -> pd.DataFrame:
+    """
+    只读取指定列（按文本），再补齐为完整宽度：未读取的列在表头区域保留原表头，数据行为空
+    行号、列号与完整读取时一致，各规则无需区分
+    :param file_path: 文件路径
+    :param header_df: read_table_header读取的表头区域
+    :param usecols: 需要读取的列索引（从0开始）
+    """
+    try:
+        part = read_table_file_text(file_path, usecols=usecols)
+    except PermissionError:
+        raise Exception("权限拒绝：文件被占用/无读取权限")
+    except Exception as e:
+        raise Exception(f"读取失败：{str(e)}")
+    width = max([header_df.shape[1]] + [col + 1 for col in usecols])
+    full = pd.DataFrame(None, index=range(part.shape[0]), columns=range(width), dtype=object)
+    header_rows = min(header_df.shape[0], part.shape[0])
+    full.iloc[:header_rows, :header_df.shape[1]] = header_df.iloc[:header_rows].astype(object).to_numpy()
+    for col_idx in usecols:
+        full[col_idx] = part[col_idx].astype(object).to_numpy()
+    return to_string_frame(full.where(full.notna(), None))
+
+
 def read_table_file(file_path: str) -> pd.DataFrame:
-    """兼容读取.xlsx/.xls/.csv，彻底解决xlrd版本冲突（含HTML伪Excel+权限兼容）"""
+    """
+    兼容读取.xlsx/.xls/.csv，彻底解决xlrd版本冲突（含HTML伪Excel+权限兼容）
+    READ_CONFIG中mode为raw_text时全部按文本读取，为infer时由pandas推断类型（原有方式）
+    """
     file_ext = os.path.splitext(file_path)[1].lower()
     # 跳过无权限的文件（捕获权限错误）
     try:
+        if READ_CONFIG.get("mode", "raw_text") == "raw_text":
+            return read_table_file_text(file_path)
         if file_ext == '.xlsx':
             return pd.read_excel(file_path, header=None, engine='openpyxl')
         elif file_ext == '.xls':
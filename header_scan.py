@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List
+import pandas as pd
+from config import (SUPPORTED_FORMATS, SKIP_TEMP_FILES, TEMP_FILE_PREFIX, FIELD_RANGE_RULES, FIELD_LENGTH_RULES,
+                    FIELD_ENUM_RULES, FIELD_DATE_RULES, FIELD_REGEX_RULES, DECIMAL_PRECISION_RULES,
+                    ENCRYPT_REQUIRED_FIELDS)
+from get_excel import read_table_header
+from checker import find_valid_header_row, HEADER_SEARCH_ROWS
+from check_rules.check_header import check_duplicate_header
+from check_rules.check_null import check_header_null
+from utils import clean_header_name, build_header_clean_map, match_config_col
+
+
+def iter_table_files(path: str) -> Iterator[str]:
+    """遍历路径下的表格文件（单个文件直接返回，跳过Excel临时文件和不支持的格式）"""
+    if os.path.isfile(path):
+        candidates = [path]
+    else:
+        candidates = (os.path.join(root, file) for root, _, files in os.walk(path) for file in sorted(files))
+    for file_path in candidates:
+        if SKIP_TEMP_FILES and os.path.basename(file_path).startswith(TEMP_FILE_PREFIX):
+            continue
+        if os.path.splitext(file_path)[1].lower() in SUPPORTED_FORMATS:
+            yield file_path
+
+
+def header_fingerprint(headers: List[str]) -> str:
+    """表头指纹：按顺序拼接清理后的表头后取哈希，表头名称与顺序都相同的文件指纹相同"""
+    joined = "\x1f".join(clean_header_name(h) for h in headers)
+    return hashlib.sha1(joined.encode('utf-8')).hexdigest()[:12]
+
+
+def unmatched_config_fields(header_df: pd.DataFrame, header_row: int) -> List[str]:
+    """配置中的字段（范围/长度/枚举/时间/正则/小数精度/脱敏）在表头中未匹配到的字段名"""
+    header_clean_to_col = build_header_clean_map(header_df, header_row)
+    fields = {}
+    for keys in (FIELD_RANGE_RULES, FIELD_LENGTH_RULES, FIELD_ENUM_RULES, FIELD_REGEX_RULES,
+                 DECIMAL_PRECISION_RULES, ENCRYPT_REQUIRED_FIELDS):
+        for key in keys:
+            fields.setdefault(key, False)
+    for key in FIELD_DATE_RULES:
+        fields[key] = True  # 日期规则全量匹配
+    return [key for key, exact in fields.items()
+            if key and match_config_col(header_clean_to_col, key, exact) is None]
+
+
+def scan_file_header(file_path: str) -> Dict:
+    """
+    只读取文件前HEADER_SEARCH_ROWS行，识别表头行并执行表头规则（表头重复、表头空值）
+    :return: 扫描结果（文件、表头行、表头、指纹、表头异常、未匹配的配置字段；读取失败时含error）
+    """
+    result = {"file": file_path}
+    try:
+        header_df = read_table_header(file_path, HEADER_SEARCH_ROWS)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    if header_df.empty:
+        result["error"] = "文件为空或无法解析"
+        return result
+
+    header_row = find_valid_header_row(header_df)
+    headers = [str(v).strip() if not pd.isna(v) else "" for v in header_df.iloc[header_row]]
+    # 去掉末尾的空表头（部分文件右侧有格式但无内容的列）
+    while headers and not headers[-1]:
+        headers.pop()
+    result.update({
+        "header_row": header_row + 1,
+        "headers": headers,
+        "fingerprint": header_fingerprint(headers),
+        "errors": check_duplicate_header(header_df, header_row) + check_header_null(header_df, header_row),
+        "unmatched_fields": unmatched_config_fields(header_df, header_row),
+    })
+    return result
+
+
+def schema_drift(results: List[Dict]) -> List[Dict]:
+    """
+    按表头指纹分组，以文件数最多的一组为基准，列出其他各组缺少/多出的列及列顺序差异
+    :return: 分组列表（按文件数降序），每组含指纹、表头、文件列表及与基准的差异
+    """
+    groups = {}
+    for result in results:
+        if "fingerprint" not in result:
+            continue
+        group = groups.setdefault(result["fingerprint"], {
+            "fingerprint": result["fingerprint"], "headers": result["headers"], "files": [],
+        })
+        group["files"].append(result["file"])
+    ordered = sorted(groups.values(), key=lambda g: (-len(g["files"]), g["fingerprint"]))
+    if not ordered:
+        return ordered
+
+    base = ordered[0]
+    base_clean = [clean_header_name(h) for h in base["headers"]]
+    for group in ordered:
+        group_clean = [clean_header_name(h) for h in group["headers"]]
+        group["is_baseline"] = group is base
+        group["missing"] = [h for h, c in zip(base["headers"], base_clean) if c and c not in group_clean]
+        group["extra"] = [h for h, c in zip(group["headers"], group_clean) if c and c not in base_clean]
+        common_base = [c for c in base_clean if c in group_clean]
+        common_group = [c for c in group_clean if c in base_clean]
+        group["reordered"] = common_base != common_group
+    return ordered
+
+
+def write_header_scan_report(results: List[Dict], output_file: str, elapsed: float) -> None:
+    """写入表头扫描结果（表头异常沿用检查结果格式，可转换为Excel），并输出同名_schema.json"""
+    groups = schema_drift(results)
+    with open(output_file, 'w', encoding='utf-8') as output:
+        output.write(f"表头扫描结果 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        output.write(f"共扫描{len(results)}个文件，耗时{elapsed:.2f}s，表头结构{len(groups)}种\n\n")
+
+        for result in results:
+            if "error" in result:
+                output.write(f"\n======== 读取失败：{result['file']} ========\n")
+                output.write(f"错误原因：{result['error']}\n")
+                continue
+            if not result["errors"] and not result["unmatched_fields"]:
+                continue
+            output.write(f"\n======== 检查文件：{result['file']} ========\n")
+            output.write(f"识别到有效表头行：第{result['header_row']}行，表头指纹：{result['fingerprint']}\n")
+            if result["errors"]:
+                output.write("❌ 发现异常值：\n")
+                for row, col, content in result["errors"]:
+                    output.write(f"   行{row} 列{col}：{content}\n")
+            if result["unmatched_fields"]:
+                output.write(f"⚠️ 配置字段未在表头中找到：{'、'.join(result['unmatched_fields'])}\n")
+
+        output.write("\n======== 表头结构差异（按表头指纹分组） ========\n")
+        for index, group in enumerate(groups, 1):
+            title = "基准结构" if group["is_baseline"] else "差异结构"
+            output.write(f"\n【结构{index}：{title}】指纹{group['fingerprint']}，{len(group['files'])}个文件，"
+                         f"{len(group['headers'])}列\n")
+            output.write(f"   表头：{' | '.join(group['headers'])}\n")
+            if not group["is_baseline"]:
+                if group["missing"]:
+                    output.write(f"   缺少列：{'、'.join(group['missing'])}\n")
+                if group["extra"]:
+                    output.write(f"   多出列：{'、'.join(group['extra'])}\n")
+                if group["reordered"]:
+                    output.write("   列顺序与基准结构不同\n")
+            for file_path in group["files"]:
+                output.write(f"   - {file_path}\n")
+
+    schema_file = os.path.splitext(output_file)[0] + "_schema.json"
+    with open(schema_file, 'w', encoding='utf-8') as f:
+        json.dump({"files": results, "groups": groups}, f, ensure_ascii=False, indent=2)
+    print(f"表头结构分组已保存到 {os.path.abspath(schema_file)}")
+
+
+def run_header_scan(path: str, output_file: str) -> List[Dict]:
+    """表头结构快速扫描：逐个文件只读取表头区域，输出表头异常及跨文件的表头结构差异"""
+    start = time.perf_counter()
+    results = []
+    for file_path in iter_table_files(path):
+        results.append(scan_file_header(file_path))
+    write_header_scan_report(results, output_file, time.perf_counter() - start)
+    return results
@@ -1,14 +1,40 @@
+import argparse
 import os
+import time
 from datetime import datetime
 from check_rules.check_data_correctness import init_semantic_model
-from config import SUPPORTED_FORMATS, SKIP_TEMP_FILES, TEMP_FILE_PREFIX
-from get_excel import read_table_file
-from checker import find_valid_header_row, check_all_rules
+from config import (SUPPORTED_FORMATS, SKIP_TEMP_FILES, TEMP_FILE_PREFIX, METRICS_CONFIG, PROFILE_CONFIG,
+                    READ_CONFIG, COLUMN_PROFILE_CONFIG)
+from get_excel import read_table_file, read_table_header, read_table_columns
+from checker import find_valid_header_row, check_all_rules, plan_read_columns, needs_full_read, HEADER_SEARCH_ROWS
 from generate_excel import txt_to_excel
-
-
-def process_single_file(file_path: str, output) -> None:
-    """处理单个表格文件的校验逻辑"""
+from metrics import RunMetrics
+from profiler import FileProfiler
+from header_scan import run_header_scan
+from column_profile import TableProfile, ProfileCollector
+
+
+def read_table_for_rules(file_path: str):
+    """
+    读取表格：开启按列读取时先读表头区域，按已启用的规则只读取需要的列（其余列补为空列），否则完整读取
+    按配置必须完整读取时不读表头区域，每个文件只打开解析一次
+    :return: (DataFrame, 表头行索引)
+    """
+    if READ_CONFIG.get("mode", "raw_text") == "raw_text" and READ_CONFIG.get("column_projection", True) \
+            and not needs_full_read():
+        header_df = read_table_header(file_path, HEADER_SEARCH_ROWS)
+        if not header_df.empty:
+            header_row = find_valid_header_row(header_df)
+            usecols = plan_read_columns(header_df, header_row)
+            if usecols is not None:
+                return read_table_columns(file_path, header_df, usecols), header_row
+    df = read_table_file(file_path)
+    return df, find_valid_header_row(df)
+
+
+def process_single_file(file_path: str, output, run_metrics: RunMetrics = None,
+                        column_profiles: ProfileCollector = None) -> None:
+    """处理单个表格文件的校验逻辑（传入run_metrics时记录该文件的性能指标，传入column_profiles时记录该文件的列统计）"""
     # 跳过临时文件
     if SKIP_TEMP_FILES and os.path.basename(file_path).startswith(TEMP_FILE_PREFIX):
         print(f"跳过Excel临时文件：{file_path}")
@@ -20,38 +46,68 @@ def process_single_file(file_path: str, output) -> None:
         output.write(f"原因：不支持的文件格式（仅支持{SUPPORTED_FORMATS}）\n")
         return
 
+    file_metrics = run_metrics.new_file(file_path) if run_metrics is not None else None
+    start = time.perf_counter()
     try:
-        df = read_table_file(file_path)
+        df, header_row = read_table_for_rules(file_path)
+        if file_metrics is not None:
+            file_metrics.read_seconds = time.perf_counter() - start
+            file_metrics.rows, file_metrics.cols = df.shape
         if df.empty:
             output.write(f"\n======== 跳过文件：{file_path} ========\n")
             output.write("原因：文件为空或无法解析\n")
             return
 
-        header_row = find_valid_header_row(df)
         # 调用所有校验规则
-        errors = check_all_rules(df, header_row)
+        profile = TableProfile([file_path]) if column_profiles is not None else None
+        summaries = []
+        errors = check_all_rules(df, header_row, metrics=file_metrics, profile=profile, summaries=summaries)
+        if profile is not None:
+            column_profiles.add(file_path, profile)
         if errors:
             output.write(f"\n======== 检查文件：{file_path} ========\n")
             output.write(f"识别到有效表头行：第{header_row + 1}行\n")
             output.write("❌ 发现异常值：\n")
-            # 输出所有错误（保留原有逻辑，未做数量限制）
+            # 输出所有错误（数量受config中ERROR_BUDGET_CONFIG错误预算限制）
             for row, col, content in errors:
                 output.write(f"   行{row} 列{col}：{content}\n")
+        elif any(content.startswith("抽样模式") for _, _, content in summaries):
+            output.write(f"\n======== 检查文件：{file_path} ========\n")
+            output.write("✅ 全量执行的规则未发现异常值（抽样模式，违规率估计见统计信息）\n")
         else:
             output.write(f"\n======== 检查文件：{file_path} ========\n")
             output.write("✅ 未发现任何异常值\n")
+        if summaries:
+            # 统计信息（空值率等）单独输出，不计入异常
+            output.write("ℹ️ 统计信息：\n")
+            for row, col, content in summaries:
+                output.write(f"   行{row} 列{col}：{content}\n")
+        if file_metrics is not None:
+            file_metrics.error_count = len(errors)
+            file_metrics.total_seconds = time.perf_counter() - start
+            if METRICS_CONFIG.get("report_summary", False):
+                output.write("\n".join(file_metrics.summary_lines()) + "\n")
     except Exception as e:
         output.write(f"\n======== 读取失败：{file_path} ========\n")
         output.write(f"错误原因：{str(e)}\n")
         print(f"读取文件失败 {file_path}：{str(e)}")
 
 
-def traverse_folder(folder_path: str, output_file: str) -> None:
-    """遍历文件夹并校验所有表格文件（原有逻辑）"""
+def traverse_folder(folder_path: str, output_file: str, profiler: FileProfiler = None) -> None:
+    """遍历文件夹并校验所有表格文件（传入profiler时对每个文件做性能分析）"""
     if not os.path.exists(folder_path):
         print(f"错误：文件夹路径不存在 - {folder_path}")
         return
 
+    run_metrics = RunMetrics() if METRICS_CONFIG.get("enabled", False) else None
+    column_profiles = ProfileCollector() if COLUMN_PROFILE_CONFIG.get("enabled", False) else None
+
+    def process(file_path):
+        if profiler is not None:
+            profiler.run(file_path, process_single_file, file_path, output, run_metrics, column_profiles)
+        else:
+            process_single_file(file_path, output, run_metrics, column_profiles)
+
     with open(output_file, 'w', encoding='utf-8') as output:
         output.write(f"检查结果 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
 
@@ -61,34 +117,82 @@ def traverse_folder(folder_path: str, output_file: str) -> None:
             for root, dirs, files in os.walk(folder_path):
                 for file in files:
                     file_path = os.path.join(root, file)
-                    process_single_file(file_path, output)
+                    process(file_path)
         elif os.path.isfile(folder_path):
             # 处理单个文件
-            process_single_file(folder_path, output)
+            process(folder_path)
         else:
             output.write(f"错误：无效的路径 - {folder_path}\n")
             print(f"错误：无效的路径 - {folder_path}")
 
+    # 写入性能指标文件（与检查结果同名，后缀_metrics.json）
+    if run_metrics is not None:
+        metrics_file = os.path.splitext(output_file)[0] + "_metrics.json"
+        run_metrics.write(metrics_file)
+        print(f"性能指标已保存到 {os.path.abspath(metrics_file)}")
+
+    # 写入列统计文件（每个文件一份，每个文件夹一份合并结果）
+    if column_profiles:
+        profile_file = os.path.splitext(output_file)[0] + "_column_profile.json"
+        column_profiles.write(profile_file)
+        print(f"列统计已保存到 {os.path.abspath(profile_file)}")
+
+
+def parse_args():
+    """命令行参数（不传路径时保持原有的交互式输入）"""
+    parser = argparse.ArgumentParser(description="表格数据质量检查")
+    parser.add_argument("path", nargs="?", help="要检查的路径（文件夹/单个表格文件）")
+    parser.add_argument("--profile", action="store_true",
+                        help="对每个文件做cProfile + tracemalloc性能分析，结果保存到检查结果旁的_profiles文件夹")
+    parser.add_argument("--profile-threshold", type=float, default=None, metavar="N",
+                        help="只保留处理耗时超过N秒的文件的分析结果（指定后自动开启--profile）")
+    parser.add_argument("--header-scan", action="store_true",
+                        help="表头结构快速扫描：每个文件只读取前10行，检查表头重复/空值并按表头结构分组输出差异")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    interactive = args.path is None
     # 修改输入提示，支持文件夹/单个文件
-    input_path = input("请输入要检查的路径（文件夹/单个表格文件）：").strip('"').strip("'")
+    if interactive:
+        input_path = input("请输入要检查的路径（文件夹/单个表格文件）：").strip('"').strip("'")
+    else:
+        input_path = args.path
 
     # 校验路径是否存在
     if not os.path.exists(input_path):
         print(f"错误：路径不存在 - {input_path}")
-        input("按回车键退出...")
+        if interactive:
+            input("按回车键退出...")
         exit(1)
 
+    # 表头结构快速扫描（不做完整检查）
+    if args.header_scan:
+        output_file = datetime.now().strftime("%Y%m%d") + "表头扫描结果.txt"
+        run_header_scan(input_path, output_file)
+        print(f"\n表头扫描完成！结果已保存到 {os.path.abspath(output_file)}")
+        txt_to_excel(os.path.abspath(output_file))
+        if interactive:
+            input("按回车键退出...")
+        exit(0)
+
     # 生成输出文件名（保留原有命名规则）
     output_file = datetime.now().strftime("%Y%m%d") + "检查结果.txt"
 
+    # 性能分析：命令行参数优先，其次按config中的PROFILE_CONFIG
+    profiler = None
+    if args.profile or args.profile_threshold is not None or PROFILE_CONFIG.get("enabled", False):
+        profile_dir = os.path.splitext(os.path.abspath(output_file))[0] + "_profiles"
+        profiler = FileProfiler(profile_dir, threshold_seconds=args.profile_threshold)
+
     # 执行校验（兼容文件夹/单个文件）
-    traverse_folder(input_path, output_file)
+    traverse_folder(input_path, output_file, profiler)
 
     # 输出完成提示并转换Excel
     print(f"\n检查完成！结果已保存到 {os.path.abspath(output_file)}")
     txt_path = os.path.abspath(output_file)
     txt_to_excel(txt_path)
 
-    input("按回车键退出...")
\ No newline at end of file
+    if interactive:
+        input("按回车键退出...")
\ No newline at end of file
@@ -0,0 +1,120 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import METRICS_CONFIG
+
+
+class FileMetrics:
+    """单个文件的性能指标：读取耗时、各规则耗时/扫描单元格数/吞吐量/内存峰值增量"""
+
+    def __init__(self, file_path: str, trace_memory: bool = False):
+        self.file_path = file_path
+        self.trace_memory = trace_memory
+        self.read_seconds = None
+        self.total_seconds = None
+        self.rows = 0
+        self.cols = 0
+        self.error_count = 0
+        self.sampled = False  # 是否按抽样模式检查（SAMPLING_CONFIG）
+        self.sample_size = None  # 抽样模式下的抽样行数
+        self.rules = []  # 每个规则一条记录（dict）
+
+    @contextmanager
+    def measure(self, rule_name: str, cells: int):
+        """
+        统计代码块的耗时与内存峰值增量（trace_memory=True时），结果追加到rules
+        :param rule_name: 规则名
+        :param cells: 该规则扫描的单元格数
+        :return: 本条记录（dict），调用方可补充errors等字段
+        """
+        record = {"rule": rule_name, "cells": cells}
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.add_rule(rule_name, time.perf_counter() - start, cells, record)
+            if tracing:
+                record["peak_mem_delta_kb"] = round((tracemalloc.get_traced_memory()[1] - mem_before) / 1024, 1)
+
+    def add_rule(self, rule_name: str, seconds: float, cells: int, record: Optional[Dict] = None) -> Dict:
+        """追加一条规则记录（已知耗时时直接调用，如check_value循环中累计的各规则耗时）"""
+        record = record if record is not None else {"rule": rule_name, "cells": cells}
+        record["seconds"] = round(seconds, 6)
+        record["cells_per_sec"] = round(cells / seconds) if seconds > 0 else None
+        record.setdefault("peak_mem_delta_kb", None)
+        self.rules.append(record)
+        return record
+
+    def to_dict(self) -> Dict:
+        return {
+            "file": self.file_path,
+            "rows": self.rows,
+            "cols": self.cols,
+            "read_seconds": None if self.read_seconds is None else round(self.read_seconds, 6),
+            "total_seconds": None if self.total_seconds is None else round(self.total_seconds, 6),
+            "error_count": self.error_count,
+            "sampled": self.sampled,
+            "sample_size": self.sample_size,
+            "rules": self.rules,
+        }
+
+    def summary_lines(self) -> List[str]:
+        """生成写入检查结果的性能统计块（按耗时降序）"""
+        rule_seconds = sum(r["seconds"] for r in self.rules if r["rule"] != CELL_LOOP_NAME)
+        lines = [f"⏱ 性能统计：读取{self.read_seconds or 0:.3f}s，规则合计{rule_seconds:.3f}s"]
+        if self.sampled:
+            lines[0] += f"（抽样模式，样本{self.sample_size}行）"
+        for r in sorted(self.rules, key=lambda item: item["seconds"], reverse=True):
+            speed = f"{r['cells_per_sec']}格/秒" if r["cells_per_sec"] is not None else "-"
+            line = f"   {r['rule']}：{r['seconds']:.3f}s，扫描{r['cells']}格，{speed}"
+            if r["peak_mem_delta_kb"] is not None:
+                line += f"，内存峰值+{r['peak_mem_delta_kb']}KB"
+            lines.append(line)
+        return lines
+
+
+# check_value逐单元格循环的整体记录名（各插件规则另有单独记录，不重复计入合计）
+CELL_LOOP_NAME = "check_value循环"
+
+
+class RunMetrics:
+    """一次运行（多个文件）的性能指标，结束时写入JSON文件"""
+
+    def __init__(self, trace_memory: Optional[bool] = None):
+        self.trace_memory = METRICS_CONFIG.get("trace_memory", False) if trace_memory is None else trace_memory
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.files = []
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def new_file(self, file_path: str) -> FileMetrics:
+        file_metrics = FileMetrics(file_path, self.trace_memory)
+        self.files.append(file_metrics)
+        return file_metrics
+
+    def write(self, metrics_path: str) -> None:
+        """写入机器可读的指标文件（JSON）"""
+        data = {
+            "started_at": self.started_at,
+            "trace_memory": self.trace_memory,
+            "files": [f.to_dict() for f in self.files],
+        }
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+@contextmanager
+def measure(metrics: Optional[FileMetrics], rule_name: str, cells: int):
+    """metrics为None时不做统计，便于调用方统一写法"""
+    if metrics is None:
+        yield {}
+    else:
+        with metrics.measure(rule_name, cells) as record:
+            yield record
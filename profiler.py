@@ -0,0 +1,87 @@
+import cProfile
+import os
+import re
+import time
+import tracemalloc
+from typing import Callable
+from config import PROFILE_CONFIG
+
+
+class FileProfiler:
+    """
+    按文件进行cProfile分析（可选tracemalloc内存分析），输出 .pstats 与内存分配统计
+    设置阈值后只保留耗时超过阈值的文件的分析结果；阈值模式下默认不开启tracemalloc，只有cProfile的开销，可在生产环境长期开启
+    """
+
+    def __init__(self, output_dir: str, threshold_seconds: float = None, top_n: int = None,
+                 trace_memory: bool = None):
+        self.output_dir = output_dir
+        self.threshold_seconds = PROFILE_CONFIG.get("threshold_seconds", 0) if threshold_seconds is None else threshold_seconds
+        self.top_n = PROFILE_CONFIG.get("top_n", 20) if top_n is None else top_n
+        if trace_memory is None:
+            trace_memory = PROFILE_CONFIG.get("trace_memory")
+        # 未配置时：不设阈值（分析全部文件）开启内存分析，设置阈值时关闭
+        self.trace_memory = not self.threshold_seconds if trace_memory is None else trace_memory
+        self.kept = []  # 已保存分析结果的文件 [(文件路径, 耗时)]
+
+    def _output_prefix(self, file_path: str) -> str:
+        """分析结果文件名前缀（按表格文件名，去除不能用于文件名的字符，重名时追加序号）"""
+        base = re.sub(r'[\\/:*?"<>|]', '_', os.path.basename(file_path))
+        prefix = os.path.join(self.output_dir, base)
+        index = 1
+        while os.path.exists(prefix + ".pstats"):
+            index += 1
+            prefix = os.path.join(self.output_dir, f"{base}_{index}")
+        return prefix
+
+    def run(self, file_path: str, func: Callable, *args, **kwargs):
+        """
+        分析一次文件处理
+        :param file_path: 表格文件路径（用于命名分析结果）
+        :param func: 实际处理函数（如process_single_file）
+        :return: func的返回值
+        """
+        started_tracing = False
+        snapshot_before = None
+        if self.trace_memory:
+            # tracemalloc已由其他统计（如METRICS_CONFIG的trace_memory）开启时不重置其峰值，只统计分配增量
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            snapshot_before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold_seconds:
+                self._save(file_path, elapsed, profile, snapshot_before, started_tracing)
+            if started_tracing:
+                tracemalloc.stop()
+
+    def _save(self, file_path: str, elapsed: float, profile: cProfile.Profile,
+              snapshot_before: tracemalloc.Snapshot = None, own_tracing: bool = False) -> None:
+        """写入 .pstats；开启内存分析时另写 _alloc.txt（峰值内存 + 按代码行统计的内存分配增量前N项）"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = self._output_prefix(file_path)
+        profile.dump_stats(prefix + ".pstats")
+
+        if snapshot_before is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            stats = snapshot.compare_to(snapshot_before, 'lineno')
+            with open(prefix + "_alloc.txt", 'w', encoding='utf-8') as f:
+                f.write(f"文件：{file_path}\n")
+                f.write(f"耗时：{elapsed:.3f}s\n")
+                if own_tracing:
+                    f.write(f"内存峰值：{peak / 1024 / 1024:.1f}MB，结束时占用：{current / 1024 / 1024:.1f}MB\n")
+                else:
+                    f.write(f"结束时占用：{current / 1024 / 1024:.1f}MB（tracemalloc由其他统计开启，未单独统计本文件峰值）\n")
+                f.write(f"\n内存分配增量前{self.top_n}项（按代码行）：\n")
+                for stat in stats[:self.top_n]:
+                    f.write(f"{stat}\n")
+        self.kept.append((file_path, elapsed))
+        print(f"性能分析结果已保存：{prefix}.pstats（耗时{elapsed:.3f}s）")
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import REFERENCE_CACHE_CONFIG, get_project_root
+from get_excel import read_table_file_text
+from utils import build_header_clean_map, match_config_col, get_column_text
+
+# 进程内缓存：{(文件绝对路径, 列关键词): ((修改时间, 文件大小), ReferenceIndex)}，同一次运行中每个参照文件只读取一次
+_INDEX_CACHE: Dict[Tuple[str, Optional[str]], Tuple[Tuple[float, int], "ReferenceIndex"]] = {}
+
+
+class ReferenceIndex:
+    """参照取值的哈希索引（pd.Index，哈希表在第一次查询时建立并随索引缓存）"""
+
+    def __init__(self, values, description: str):
+        values = pd.Series(list(values), dtype=object)
+        self.index = pd.Index(pd.unique(values[values != ""]))
+        self.description = description
+
+    def contains(self, values) -> np.ndarray:
+        """批量判断取值是否在参照数据中"""
+        return self.index.get_indexer(pd.Index(values, dtype=object)) >= 0
+
+    def __len__(self):
+        return len(self.index)
+
+
+def resolve_source_path(source: str) -> str:
+    """参照文件路径：相对路径按项目根目录解析"""
+    return source if os.path.isabs(source) else os.path.join(get_project_root(), source)
+
+
+def source_signature(path: str) -> Tuple[float, int]:
+    """文件签名（修改时间, 大小），任一变化时缓存失效"""
+    stat = os.stat(path)
+    return stat.st_mtime, stat.st_size
+
+
+def read_reference_values(path: str, column: Optional[str]) -> List[str]:
+    """
+    读取参照取值：txt文件每行一个值；表格文件按表头找到column列（模糊匹配）后读取该列全部取值
+    """
+    if os.path.splitext(path)[1].lower() == ".txt":
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    # 延迟导入，避免checker导入规则时循环导入
+    from checker import find_valid_header_row
+    df = read_table_file_text(path)
+    if df.empty:
+        raise ValueError("参照文件为空或无法解析")
+    header_row = find_valid_header_row(df)
+    col_idx = match_config_col(build_header_clean_map(df, header_row), column)
+    if col_idx is None:
+        raise ValueError(f"参照文件中未找到列：{column}")
+    return get_column_text(df, col_idx, header_row + 1).tolist()
+
+
+def _cache_file(path: str, column: Optional[str]) -> str:
+    cache_dir = REFERENCE_CACHE_CONFIG.get("cache_dir", ".reference_cache")
+    if not os.path.isabs(cache_dir):
+        cache_dir = os.path.join(get_project_root(), cache_dir)
+    key = hashlib.sha1(f"{path}\x1f{column}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+
+def _load_persisted(path: str, column: Optional[str], signature: Tuple[float, int]) -> Optional[List[str]]:
+    """读取持久化缓存（文件签名一致时有效），缓存不存在或已失效返回None"""
+    cache_file = _cache_file(path, column)
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception:
+        return None
+    if cached.get("path") != path or cached.get("column") != column or tuple(cached.get("signature", ())) != signature:
+        return None
+    return cached["values"]
+
+
+def _save_persisted(path: str, column: Optional[str], signature: Tuple[float, int], values: List[str]) -> None:
+    cache_file = _cache_file(path, column)
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump({"path": path, "column": column, "signature": signature, "values": values}, f)
+    except OSError as e:
+        print(f"参照数据缓存写入失败：{e}")
+
+
+def load_reference_file(source: str, column: Optional[str] = None) -> ReferenceIndex:
+    """
+    加载参照文件的哈希索引：先查进程内缓存，再查持久化缓存（按修改时间和大小校验），都失效时重新读取文件
+    :param source: 参照文件路径（txt或表格文件）
+    :param column: 表格文件中的列关键词
+    """
+    path = os.path.abspath(resolve_source_path(source))
+    signature = source_signature(path)
+    key = (path, column)
+    cached = _INDEX_CACHE.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    persist = REFERENCE_CACHE_CONFIG.get("persist", True)
+    values = _load_persisted(path, column, signature) if persist else None
+    if values is None:
+        values = read_reference_values(path, column)
+        if persist:
+            _save_persisted(path, column, signature, values)
+    name = os.path.basename(path)
+    index = ReferenceIndex(values, f"{name}的{column}列" if column else name)
+    _INDEX_CACHE[key] = (signature, index)
+    return index
+
+
+def load_reference(rule: Dict, field_key: str) -> ReferenceIndex:
+    """按REFERENCE_RULES中的一条配置加载参照索引：values为直接列出的取值，source为参照文件"""
+    if rule.get("values"):
+        key = ("values", tuple(rule["values"]))
+        if key not in _INDEX_CACHE:
+            _INDEX_CACHE[key] = (None, ReferenceIndex(rule["values"], "配置的允许值列表"))
+        return _INDEX_CACHE[key][1]
+    column = rule.get("column")
+    if column is None and os.path.splitext(rule["source"])[1].lower() != ".txt":
+        column = field_key
+    return load_reference_file(rule["source"], column)
@@ -0,0 +1,52 @@
+import math
+from statistics import NormalDist
+from typing import Tuple
+import numpy as np
+
+
+def select_sample_rows(n_rows: int, sample_size: int, method: str = "random",
+                       chunk_size: int = 10000, seed: int = 42) -> np.ndarray:
+    """
+    抽取数据行（可复现）
+    :param n_rows: 数据行总数
+    :param sample_size: 抽样行数（不小于总行数时返回全部行）
+    :param method: random=简单随机抽样，stratified=按数据块分层抽样（每块按行数比例抽取）
+    :param chunk_size: 分层抽样时每块行数
+    :param seed: 随机种子
+    :return: 抽中行的相对位置（从0开始，升序）
+    """
+    if sample_size >= n_rows:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(seed)
+    if method != "stratified":
+        return np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+
+    # 分层抽样：按块比例分配样本量，余数依次分给前面的块
+    starts = np.arange(0, n_rows, chunk_size)
+    lengths = np.minimum(chunk_size, n_rows - starts)
+    quotas = (sample_size * lengths) // n_rows
+    remainder = sample_size - quotas.sum()
+    quotas[:remainder] += 1
+    picked = [
+        start + rng.choice(length, size=quota, replace=False)
+        for start, length, quota in zip(starts, lengths, quotas) if quota > 0
+    ]
+    return np.sort(np.concatenate(picked))
+
+
+def wilson_interval(violations: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    违规率的Wilson置信区间（样本量小或违规率接近0时仍然可靠）
+    :param violations: 样本中的违规数
+    :param n: 样本量
+    :param confidence: 置信水平
+    :return: (下限, 上限)
+    """
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = violations / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - margin), min(1.0, center + margin)
@@ -0,0 +1,190 @@
+import base64
+import math
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+# 固定哈希种子（16位字符），保证不同进程/不同次运行的哈希结果一致，摘要可以跨文件、跨运行合并
+_HASH_KEY = "setexcelrule0001"
+
+
+def hash_values(values) -> np.ndarray:
+    """批量计算文本的64位哈希（pandas向量化实现）"""
+    return pd.util.hash_array(np.asarray(values, dtype=object), hash_key=_HASH_KEY, categorize=False)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog 基数估计：固定 2^precision 个寄存器（precision=12 时 4KB），误差约 1.04/sqrt(2^precision)
+    寄存器逐位取最大值即可合并
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_many(self, values) -> None:
+        """批量加入取值（重复取值不影响结果）"""
+        if len(values) == 0:
+            return
+        hashes = hash_values(values)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # 索引之后的32位用于计算前导零个数（32位整数转浮点无精度损失）
+        rest = ((hashes << np.uint64(self.precision)) >> np.uint64(32)).astype(np.float64)
+        bit_length = np.where(rest > 0, np.floor(np.log2(np.maximum(rest, 1))) + 1, 0)
+        rank = (33 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("HyperLogLog精度不同，无法合并")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # 小基数时使用线性计数修正
+        if raw <= 2.5 * m and zeros > 0:
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    def to_dict(self) -> Dict:
+        return {"precision": self.precision, "registers": base64.b64encode(self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HyperLogLog":
+        sketch = cls(data["precision"])
+        sketch.registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8).copy()
+        return sketch
+
+
+class SpaceSaving:
+    """
+    高频取值（Top-K）摘要：最多保留capacity个计数器，超出时所有计数减去第capacity+1大的计数（可合并的Misra-Gries/Space-Saving摘要）
+    计数为下界估计，误差不超过 总数/(capacity+1)
+    """
+
+    def __init__(self, capacity: int = 50):
+        self.capacity = capacity
+        self.counters = {}  # 取值 → 计数
+        self.total = 0
+
+    def add_counts(self, values, counts) -> None:
+        """批量加入一批取值及其出现次数（如factorize得到的不同取值与bincount计数）"""
+        counts = np.asarray(counts, dtype=np.int64)
+        if len(counts) == 0:
+            return
+        self.total += int(counts.sum())
+        # 本批只需保留计数最大的capacity+1个，其余在合并时必然被减为0
+        keep = min(len(counts), self.capacity + 1)
+        top = np.argpartition(-counts, keep - 1)[:keep] if keep < len(counts) else np.arange(len(counts))
+        batch = SpaceSaving(self.capacity)
+        batch.counters = {values[i]: int(counts[i]) for i in top}
+        if keep < len(counts):
+            # 未保留取值的最大计数作为本批的误差，先从本批计数中减去
+            rest = np.delete(counts, top)
+            batch.counters = {k: v - int(rest.max()) for k, v in batch.counters.items() if v > rest.max()}
+        self._merge_counters(batch.counters)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        self.total += other.total
+        self._merge_counters(other.counters)
+
+    def _merge_counters(self, counters: Dict) -> None:
+        merged = dict(self.counters)
+        for value, count in counters.items():
+            merged[value] = merged.get(value, 0) + count
+        if len(merged) > self.capacity:
+            threshold = sorted(merged.values(), reverse=True)[self.capacity]
+            merged = {k: v - threshold for k, v in merged.items() if v > threshold}
+        self.counters = merged
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        return sorted(self.counters.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def to_dict(self) -> Dict:
+        return {"capacity": self.capacity, "total": self.total, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SpaceSaving":
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        sketch.counters = dict(data["counters"])
+        return sketch
+
+
+class TDigest:
+    """
+    t-digest 分位数摘要：按k1尺度函数把数据压缩为约compression个质心（均值+权重），两端分位数更精确
+    压缩过程按累计权重整体向量化计算，质心列表拼接后重新压缩即可合并
+    """
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = None
+        self.max = None
+
+    def add_many(self, values, weights=None) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        keep = np.isfinite(values) & (weights > 0)
+        values, weights = values[keep], weights[keep]
+        if len(values) == 0:
+            return
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+
+    def merge(self, other: "TDigest") -> None:
+        if other.min is None:
+            return
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        """按累计权重中点的k1尺度（δ/2π·asin(2q-1)）分桶，同一桶内合并为一个质心"""
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        cumulative = np.cumsum(weights)
+        q_mid = (cumulative - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q_mid - 1, -1, 1))
+        bucket = np.floor(k - k.min()).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        bucket_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / bucket_weights
+        self.weights = bucket_weights
+
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def quantile(self, q: float):
+        """估计分位数（q在0~1之间），无数据时返回None"""
+        if len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        total = self.weights.sum()
+        centers = (np.cumsum(self.weights) - self.weights / 2) / total
+        positions = np.r_[0.0, centers, 1.0]
+        values = np.r_[self.min, self.means, self.max]
+        return float(np.interp(q, positions, values))
+
+    def to_dict(self) -> Dict:
+        return {
+            "compression": self.compression, "min": self.min, "max": self.max,
+            "means": self.means.tolist(), "weights": self.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TDigest":
+        sketch = cls(data["compression"])
+        sketch.min, sketch.max = data["min"], data["max"]
+        sketch.means = np.asarray(data["means"], dtype=np.float64)
+        sketch.weights = np.asarray(data["weights"], dtype=np.float64)
+        return sketch
@@ -1,47 +1,56 @@
+import weakref
+import numpy as np
 import pandas as pd
 import re
 from typing import Tuple, Dict, List
-from config import EMPTY_PATTERN, FIELD_KEYWORDS, DECIMAL_PRECISION_RULES  # 新增DECIMAL_PRECISION_RULES
+from config import EMPTY_PATTERN, FIELD_KEYWORDS, DECIMAL_PRECISION_RULES, SKIP_FIRST_COL, SKIP_ALL_EMPTY_COLS  # 新增DECIMAL_PRECISION_RULES
 
 
-# 原有函数（不动）
-def count_non_empty_cols(row_values: pd.Series) -> int:
-    count = 0
-    for val in row_values:
-        val_str = str(val).strip() if not pd.isna(val) else ""
-        if not EMPTY_PATTERN.match(val_str):
-            count += 1
-    return count
+def non_empty_mask(df: pd.DataFrame, start_row: int = 0, end_row: int = None) -> np.ndarray:
+    """
+    非空单元格掩码（行×列，True=非空）：与逐单元格 EMPTY_PATTERN.match(str(val).strip()) 判断一致，按列向量化计算
+    :param start_row: 起始行
+    :param end_row: 结束行（不含），为None时到最后一行
+    """
+    block = df.iloc[start_row:end_row]
+    mask = np.zeros(block.shape, dtype=bool)
+    for col_idx in range(block.shape[1]):
+        col = block.iloc[:, col_idx]
+        mask[:, col_idx] = (col.notna() & col.astype(str).str.strip().ne("")).to_numpy(dtype=bool)
+    return mask
 
 
-def is_col_all_empty(df: pd.DataFrame, col_idx: int) -> bool:
-    col_values = df.iloc[:, col_idx]
-    for val in col_values:
-        val_str = str(val).strip() if not pd.isna(val) else ""
-        if not EMPTY_PATTERN.match(val_str):
-            return False
-    return True
+def get_skip_cols(df: pd.DataFrame) -> set:
+    """按配置获取跳过检查的列（第一列/全空列）；同一表格只计算一次（与列分解结果一起缓存）"""
+    cache = _table_cache(df)
+    if "skip_cols" not in cache:
+        skip_cols = set()
+        if SKIP_FIRST_COL and df.shape[1] >= 1:
+            skip_cols.add(0)
+        if SKIP_ALL_EMPTY_COLS and df.shape[0] > 0:
+            # 全表非空掩码按列判断，只扫描一遍
+            skip_cols.update(int(col_idx) for col_idx in np.flatnonzero(~non_empty_mask(df).any(axis=0)))
+        cache["skip_cols"] = frozenset(skip_cols)
+    return set(cache["skip_cols"])
 
 
-def is_empty_or_special_value(cell_value: str) -> Tuple[bool, str]:
+# 空值类特殊字符（null不区分大小写）
+SPECIAL_VALUE_TOKENS = frozenset({'null', '-', '_', '\\', '、', '~', '/', '--', '__'})
+
+
+def special_value_desc(cell_value: str) -> str:
+    """判断空值/特殊字符（单元格文本已去首尾空格），返回错误描述，正常值返回"" """
     if EMPTY_PATTERN.match(cell_value):
-        return True, "空值(空白字符)"
+        return "空值(空白字符)"
     cell_lower = cell_value.lower()
-    if cell_lower == 'null':
-        return True, "特殊字符：null"
-    elif cell_value == '-':
-        return True, "特殊字符：-"
-    elif cell_value == '_':
-        return True, "特殊字符：_"
-    elif cell_value == '\\':
-        return True, "特殊字符：\\"
-    elif cell_value == '、':
-        return True, "特殊字符：、"
-    elif cell_value == '~':
-        return True, "特殊字符：~"
-    elif cell_value == '/':
-        return True, "特殊字符：/"
-    return False, ""
+    if cell_lower in SPECIAL_VALUE_TOKENS:
+        return f"特殊字符：{cell_lower}"
+    return ""
+
+
+def is_empty_or_special_value(cell_value: str) -> Tuple[bool, str]:
+    error_desc = special_value_desc(cell_value)
+    return bool(error_desc), error_desc
 
 
 # 优化字段匹配函数：返回所有匹配的字段类型（包括小数规则）
@@ -65,3 +74,154 @@ def match_field_type(header_name: str) -> str:
             return keyword  # 返回小数规则的关键词（如"金额"）
 
     return ""
+
+
+# 表头清理规则（与各字段规则一致）：去除特殊字符+空格，转小写
+def clean_header_name(header_name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9\u4e00-\u9fa5]', '', header_name).lower()
+
+
+def build_header_clean_map(df: pd.DataFrame, header_row: int) -> Dict[str, int]:
+    """构建「清理后表头→列索引」映射（跳过空表头）"""
+    header_clean_to_col = {}
+    for col_idx in range(df.shape[1]):
+        header_val = df.iloc[header_row, col_idx]
+        header_original = str(header_val).strip() if not pd.isna(header_val) else ""
+        if not header_original:
+            continue
+        header_clean_to_col[clean_header_name(header_original)] = col_idx
+    return header_clean_to_col
+
+
+def match_config_col(header_clean_to_col: Dict[str, int], field_key: str, exact: bool = False):
+    """
+    按配置的字段关键词匹配列
+    :param header_clean_to_col: build_header_clean_map的结果
+    :param field_key: 配置中的字段关键词
+    :param exact: True=全量匹配（日期规则），False=模糊匹配（表头包含关键词或关键词包含表头）
+    :return: 列索引，未匹配返回None
+    """
+    field_clean = clean_header_name(field_key)
+    if exact:
+        return header_clean_to_col.get(field_clean, None)
+    for h_clean, col_idx in header_clean_to_col.items():
+        if field_clean in h_clean or h_clean in field_clean:
+            return col_idx
+    return None
+
+
+def get_field_type_cols(df: pd.DataFrame, header_row: int, field_type: str) -> List[int]:
+    """获取表头匹配为指定字段类型（如身份证号/手机号/邮政编码）的列索引"""
+    cols = []
+    for col_idx in range(df.shape[1]):
+        header_val = df.iloc[header_row, col_idx]
+        header_name = str(header_val).strip() if not pd.isna(header_val) else ""
+        if match_field_type(header_name) == field_type:
+            cols.append(col_idx)
+    return cols
+
+
+def get_column_text(df: pd.DataFrame, col_idx: int, start_row: int) -> pd.Series:
+    """
+    按列提取单元格文本（从start_row行开始，去首尾空格，空值为""）
+    结果与逐单元格 str(val).strip() if not pd.isna(val) else "" 一致，供按列执行的规则使用
+    """
+    col = df.iloc[start_row:, col_idx]
+    return col.astype(str).str.strip().where(col.notna(), "")
+
+
+# 列分解缓存：{id(表格): (表格弱引用, {(列索引, 起始行): (codes, uniques), "skip_cols": 跳过的列})}，同一表格上的多个规则共享
+# 检查过程中表格内容不会被修改，表格释放后对应缓存随之失效
+_FACTORIZE_CACHE = {}
+
+
+def _table_cache(df: pd.DataFrame) -> dict:
+    """取得表格对应的缓存dict（表格已释放的缓存顺带清理）"""
+    entry = _FACTORIZE_CACHE.get(id(df))
+    if entry is None or entry[0]() is not df:
+        for key in [key for key, (ref, _) in _FACTORIZE_CACHE.items() if ref() is None]:
+            del _FACTORIZE_CACHE[key]
+        entry = (weakref.ref(df), {})
+        _FACTORIZE_CACHE[id(df)] = entry
+    return entry[1]
+
+
+def factorize_column(df: pd.DataFrame, col_idx: int, start_row: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    将列（从start_row行开始）分解为不同取值：uniques为不同的单元格文本（空值为""），codes[i]为第i行对应的uniques下标
+    按值校验的规则只需处理uniques，再通过codes映射回各行，耗时与不同取值数相关而与行数无关
+    """
+    columns = _table_cache(df)
+    if (col_idx, start_row) not in columns:
+        codes, uniques = pd.factorize(get_column_text(df, col_idx, start_row))
+        columns[(col_idx, start_row)] = (codes, np.asarray(uniques, dtype=object))
+    return columns[(col_idx, start_row)]
+
+
+def flagged_rows(codes: np.ndarray, unique_flags) -> np.ndarray:
+    """将不同取值的校验结果（True=异常）映射回各行，返回异常行的位置（升序）"""
+    unique_flags = np.asarray(unique_flags, dtype=bool)
+    if not unique_flags.any():
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(unique_flags[codes])
+
+
+def column_numbers(df: pd.DataFrame, col_idx: int, start_row: int) -> np.ndarray:
+    """列转为数值数组（去除千分位逗号，空值/非数值为NaN），每个不同取值只解析一次"""
+    codes, uniques = factorize_column(df, col_idx, start_row)
+    numbers = pd.to_numeric(pd.Series(uniques, dtype=object).str.replace(',', '', regex=False), errors='coerce')
+    return numbers.to_numpy(dtype=np.float64)[codes]
+
+
+def column_datetimes(df: pd.DataFrame, col_idx: int, start_row: int, formats: List[str] = None) -> np.ndarray:
+    """
+    列转为datetime64数组（无法解析/空值为NaT），每个不同取值只解析一次
+    :param formats: 允许的日期格式列表（如FIELD_DATE_RULES中的配置），依次尝试；为空时自动识别
+    """
+    codes, uniques = factorize_column(df, col_idx, start_row)
+    texts = pd.Series(uniques, dtype=object)
+    if formats:
+        parsed = pd.Series(pd.NaT, index=texts.index, dtype='datetime64[ns]')
+        for fmt in formats:
+            missing = parsed.isna()
+            if not missing.any():
+                break
+            parsed[missing] = pd.to_datetime(texts[missing], format=fmt, errors='coerce')
+    else:
+        parsed = pd.to_datetime(texts, format='mixed', errors='coerce')
+    return parsed.to_numpy(dtype='datetime64[ns]')[codes]
+
+
+# 列类型推断：单个取值的数值（含千分位、百分号、科学计数法）、日期/时间、编号正则
+_NUMBER_VALUE = r'[+-]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?%?'
+_DATE_VALUE = r'\d{4}[-/.年]\d{1,2}[-/.月]\d{1,2}日?(?:[ T]\d{1,2}:\d{1,2}(?::\d{1,2}(?:\.\d+)?)?)?|\d{1,2}:\d{2}(?::\d{2})?'
+# 编号只认固定形态：至多4位大写字母前缀+数字及编号常用符号（末位可为X，如身份证号）、UUID、16位以上十六进制串（哈希值）
+# 小写字母与数字混写的取值（如tmd88、sb250、3p）按自由文本处理，避免其中的拼音/英文缩写敏感词被整列跳过
+_ID_VALUE = (rf'[A-Z]{{0,4}}[-_(+]?\d[\d_\-*/.:#()+,%]*[Xx]?'
+             rf'|[0-9a-fA-F]{{8}}(?:-[0-9a-fA-F]{{4}}){{3}}-[0-9a-fA-F]{{12}}'
+             rf'|(?=[a-fA-F]*\d)[0-9a-fA-F]{{16,}}|{_DATE_VALUE}')
+# 整列检查：不同取值以换行拼接后一次查找第一个不属于该类型的取值（与check_pii相同的拼接方式），找不到即全部属于该类型
+# 每行只做一次前瞻匹配（前瞻内不回溯到其他行），耗时与文本长度线性相关
+COLUMN_KIND_PATTERNS = [
+    (kind, re.compile(rf'^(?!(?:{value})$)', re.M))
+    for kind, value in (("number", _NUMBER_VALUE), ("date", _DATE_VALUE), ("id", _ID_VALUE))
+]
+
+
+def infer_column_kind(df: pd.DataFrame, col_idx: int, start_row: int) -> str:
+    """
+    推断列类型：不同取值（空值/空值类特殊字符除外）以换行拼接，依次查找不属于数值、日期、编号的取值
+    :return: "empty"=无有效取值，"number"=全部为数值，"date"=全部为日期/时间，
+             "id"=全部为数值、日期或编号（固定形态的编号，见_ID_VALUE），"text"=含自由文本
+    """
+    _, uniques = factorize_column(df, col_idx, start_row)
+    texts = [value for value in uniques if value and value.lower() not in SPECIAL_VALUE_TOKENS]
+    if not texts:
+        return "empty"
+    joined = "\n".join(texts)
+    if joined.count("\n") != len(texts) - 1:
+        return "text"  # 取值内含换行，不是单行的数值/日期/编号
+    for kind, pattern in COLUMN_KIND_PATTERNS:
+        if pattern.search(joined) is None:
+            return kind
+    return "text"